@@ -0,0 +1,83 @@
+"""Async handlers for the hot read routes, served by ``app.asgi``.
+
+Each handler mirrors the ``get`` of a ``MethodView`` -- same argument parsing,
+ETag and body -- but awaits the database through ``app.services.async_reads``.
+Handlers run inside the Flask request context that ``app.asgi`` pushes, so
+``request``, the error handlers, the request hooks (request id, metrics,
+profiling) and the JSON provider behave exactly as on the WSGI path.
+
+``ASYNC_VIEWS`` maps Flask endpoints to their async handler. A handler's
+``accepts`` check can hand a request back to the WSGI view instead: streamed
+history, routes answered by the response cache, and validity checks served by
+the coverage index (both avoid the database altogether).
+"""
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from app.api.conditional import entity_tag, is_fresh, tagged
+from app.api.errors import NotFoundError
+from app.api.routers.history import history_args, history_page
+from app.api.routers.insuranceValidation import validity_query
+from app.api.schemas import InsuranceValidityOut
+from app.api.serializers import CAR_ITEM, POLICY
+from app.api.streaming import wants_stream
+from app.services import async_reads
+from app.services.coverage_index import get_coverage_index
+from app.services.response_cache import get_response_cache, route_enabled
+
+@dataclass(frozen=True)
+class AsyncView:
+    """An async handler for one Flask endpoint, named ``route`` in ASYNC_READ_ROUTES."""
+    route: str
+    handler: Callable[..., Awaitable]
+    accepts: Callable[[], bool] = lambda: True
+
+def _uncached(route: str) -> bool:
+    return get_response_cache() is None or not route_enabled(route)
+
+def _versioned(rv_factory, etag: str, updated_at):
+    return tagged(None if is_fresh(etag, updated_at) else rv_factory(), etag, updated_at)
+
+async def insurance_valid(conn, car_id: int):
+    query = validity_query(car_id)
+    row = await async_reads.validity(conn, car_id, query.date)
+    if row is None:
+        raise NotFoundError("Car not found")
+
+    def body():
+        out = InsuranceValidityOut.model_validate({"carId": car_id, "date": query.date, "valid": row.policy_id is not None})
+        return out.model_dump(by_alias=True), 200
+    return _versioned(body, entity_tag("validity", (car_id,), row.history_version, per_query=True),
+                      row.history_updated_at)
+
+async def car_history(conn, car_id: int):
+    compact, page, bounds = history_args()
+    current = await async_reads.car_history_version(conn, car_id)
+    if current is None:
+        raise NotFoundError("Car not found")
+    version, updated_at = current
+    etag = entity_tag("history", (car_id,), version, per_query=True)
+    if is_fresh(etag, updated_at):
+        return tagged(None, etag, updated_at)
+    rows = await async_reads.history_rows(conn, car_id, limit=page.fetch, **bounds)
+    return tagged(history_page(page, rows, compact), etag, updated_at)
+
+async def car_item(conn, car_id: int):
+    row = await async_reads.car_item(conn, car_id, CAR_ITEM.columns)
+    if row is None:
+        raise NotFoundError("Car not found")
+    return _versioned(lambda: (CAR_ITEM(row[2:]), 200), entity_tag("car", (car_id,), row.version), row.updated_at)
+
+async def policy_item(conn, policy_id: int):
+    row = await async_reads.policy_item(conn, policy_id, POLICY.columns)
+    if row is None:
+        raise NotFoundError("Policy not found")
+    return _versioned(lambda: (POLICY(row[2:]), 200), entity_tag("policy", (policy_id,), row.version), row.updated_at)
+
+ASYNC_VIEWS = {
+    "insurance_validation.InsuranceValidResource": AsyncView(
+        "validity", insurance_valid, lambda: _uncached("validity") and get_coverage_index() is None),
+    "history.CarHistoryResource": AsyncView(
+        "history", car_history, lambda: _uncached("history") and not wants_stream()),
+    "cars.CarItem": AsyncView("car", car_item),
+    "policies.InsurancePolicyItem": AsyncView("policy", policy_item),
+}
@@ -0,0 +1,51 @@
+"""Per-route opt-in response caching for per-car read endpoints.
+
+``@cached("history")`` on a ``MethodView.get`` taking ``car_id`` serves the
+rendered ``200`` response from the cache backend of
+``app.services.response_cache`` when the route is listed in
+``RESPONSE_CACHE_ROUTES``. Hits skip the database entirely, including the
+version lookup of ``@conditional`` (applied inside this decorator): a cached
+response keeps its ``ETag``/``Last-Modified``, so conditional requests are
+still answered with ``304`` from the cache. Streamed responses are not cached.
+Responses carry ``X-Cache: HIT`` or ``MISS``.
+"""
+import json
+from functools import wraps
+from flask import current_app, request
+from app.api.conditional import representation_key
+from app.services.response_cache import LOOKUPS, get_response_cache, route_enabled
+
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link", "X-Next-Cursor")
+
+def _dump(resp) -> bytes:
+    headers = [(name, resp.headers[name]) for name in CACHED_HEADERS if name in resp.headers]
+    return json.dumps({"headers": headers, "body": resp.get_data(as_text=True)}).encode()
+
+def _restore(raw: bytes):
+    stored = json.loads(raw)
+    return current_app.response_class(stored["body"], status=200, headers=stored["headers"])
+
+def cached(route: str):
+    """Cache the decorated view's 200 responses under ``route`` when that route is enabled."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(self, **kwargs):
+            cache = get_response_cache()
+            if cache is None or not route_enabled(route):
+                return view(self, **kwargs)
+            car_id = kwargs["car_id"]
+            key = f"{route}:{car_id}:g{cache.generation(car_id)}:{representation_key()}"
+            raw = cache.get(key)
+            if raw is not None:
+                LOOKUPS.inc(route=route, result="hit")
+                resp = _restore(raw).make_conditional(request)
+                resp.headers["X-Cache"] = "HIT"
+                return resp
+            LOOKUPS.inc(route=route, result="miss")
+            resp = current_app.make_response(view(self, **kwargs))
+            if resp.status_code == 200 and not resp.is_streamed:
+                cache.set(key, _dump(resp))
+            resp.headers["X-Cache"] = "MISS"
+            return resp
+        return wrapper
+    return decorator
@@ -0,0 +1,91 @@
+"""Conditional GET (``ETag`` / ``Last-Modified``) for versioned resources.
+
+``@conditional(lookup, "car")`` on a ``MethodView.get`` answers requests
+carrying ``If-None-Match`` (or, without it, ``If-Modified-Since``) from
+``lookup(**view_args)``, a primary-key read returning ``(version, updated_at)``
+(see ``app.services.version_service``): while the validator still matches, a
+``304`` is returned and the view never runs. Requests without validators skip
+the lookup. Either way the view reports the version its body was built from
+with ``loaded_version(version, updated_at)`` -- read in the same query as the
+data -- and its ``200`` response gets the matching strong ``ETag`` and
+``Last-Modified``. Views answering from a cache that may lag the database (the
+coverage index) get the looked-up version via ``current_version()`` and must
+not build the body from anything older.
+
+A view that reports nothing is tagged with the looked-up version, read before
+the view, so a racing write can only make the tag older than the body, never
+newer: the next request revalidates. With ``per_query=True`` the tag also covers the query string and ``Accept``
+header, for resources whose representation depends on them. The async read
+handlers (``app.api.async_views``) build the same tags with ``entity_tag`` /
+``is_fresh`` / ``tagged`` from versions they read themselves.
+"""
+import hashlib
+from functools import wraps
+from flask import current_app, g, request
+
+def representation_key() -> str:
+    """Digest of the query string and Accept header, for representation-specific keys."""
+    raw = request.query_string + b"|" + request.headers.get("Accept", "").encode()
+    return hashlib.blake2s(raw, digest_size=6).hexdigest()
+
+def entity_tag(kind: str, ids, version: int, per_query: bool = False) -> str:
+    """Strong ETag value (unquoted) for version ``version`` of ``kind`` identified by ``ids``."""
+    parts = [kind, *map(str, ids), f"v{version}"]
+    if per_query:
+        parts.append(representation_key())
+    return "-".join(parts)
+
+def is_fresh(etag: str, updated_at) -> bool:
+    """True when the request's validators still match (``If-None-Match`` wins over ``If-Modified-Since``)."""
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    since = request.if_modified_since
+    return since is not None and updated_at.replace(microsecond=0) <= since.replace(tzinfo=None)
+
+def tagged(rv, etag: str, updated_at):
+    """Response for view return value ``rv`` (``None`` = 304) carrying ETag / Last-Modified.
+
+    Non-200 responses are returned untagged.
+    """
+    if rv is None:
+        resp = current_app.response_class(status=304)
+    else:
+        resp = current_app.make_response(rv)
+        if resp.status_code != 200:
+            return resp
+    resp.set_etag(etag)
+    resp.last_modified = updated_at
+    return resp
+
+def current_version() -> int | None:
+    """Version looked up by ``@conditional`` for the current request (None without validators or for unknown ids)."""
+    return g.get("conditional_version")
+
+def loaded_version(version: int, updated_at):
+    """Record the version the view's body was built from; ``@conditional`` tags the response with it."""
+    g.conditional_loaded = (version, updated_at)
+
+def conditional(lookup, kind: str, per_query: bool = False):
+    """Answer conditional GETs for the decorated view from ``lookup``'s version."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(self, **kwargs):
+            g.pop("conditional_version", None)
+            g.pop("conditional_loaded", None)
+            current = None
+            if request.if_none_match or request.if_modified_since:
+                current = lookup(**kwargs)
+                if current is not None:
+                    version, updated_at = current
+                    g.conditional_version = version
+                    etag = entity_tag(kind, kwargs.values(), version, per_query)
+                    if is_fresh(etag, updated_at):
+                        return tagged(None, etag, updated_at)
+            rv = view(self, **kwargs)  # unknown ids: the view raises its own 404
+            current = g.pop("conditional_loaded", None) or current
+            if current is None:
+                return rv
+            version, updated_at = current
+            return tagged(rv, entity_tag(kind, kwargs.values(), version, per_query), updated_at)
+        return wrapper
+    return decorator
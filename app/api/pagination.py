@@ -0,0 +1,109 @@
+"""Keyset (cursor) pagination helpers shared by collection routes.
+
+Collections are ordered by primary key and paged with ``WHERE id > :last_id
+ORDER BY id LIMIT :n`` so every page costs the same regardless of table size.
+The cursor handed to clients is an opaque urlsafe-base64 token; clients must
+not rely on its contents. Response bodies stay plain JSON arrays; the next
+page is advertised via a ``Link: <...>; rel="next"`` header and mirrored in
+``X-Next-Cursor`` for clients that do not parse Link headers.
+"""
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from urllib.parse import urlencode
+from flask import request
+from app.core.config import get_settings
+from app.api.errors import DomainValidationError
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def _encode_token(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode_token(token: str, key: str, field: str):
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode()))[key]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise DomainValidationError(f"Invalid {field}", field=field)
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last seen primary key into an opaque cursor token."""
+    return _encode_token({"id": last_id})
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor token back to the last seen primary key.
+
+    Raises DomainValidationError (400) for tampered or malformed tokens.
+    """
+    last_id = _decode_token(cursor, "id", "cursor")
+    if not isinstance(last_id, int):
+        raise DomainValidationError("Invalid cursor", field="cursor")
+    return last_id
+
+def encode_position(*key) -> str:
+    """Encode a composite sort key (e.g. date, type, id) into an opaque cursor token."""
+    return _encode_token({"k": list(key)})
+
+def decode_position(token: str, field: str = "cursor") -> list:
+    """Decode a composite-key cursor; shape checks are left to the caller."""
+    key = _decode_token(token, "k", field)
+    if not isinstance(key, list):
+        raise DomainValidationError(f"Invalid {field}", field=field)
+    return key
+
+@dataclass(frozen=True)
+class Page:
+    """Parsed pagination arguments for a single collection request.
+
+    ``after_id`` is the last seen primary key, or the decoded composite key for
+    routes paged with ``encode_position`` cursors.
+    """
+    after_id: int | list | None
+    limit: int
+
+    @property
+    def fetch(self) -> int:
+        """Rows to fetch: one extra row tells us whether a next page exists."""
+        return self.limit + 1
+
+    def split(self, rows, key=lambda r: r.id, encode=encode_cursor, param: str = "cursor"):
+        """Trim the look-ahead row and build the next-page headers.
+
+        ``key`` extracts the sort key of the last row, ``encode`` turns it into
+        the token sent back in query parameter ``param``.
+        Returns (rows_for_this_page, headers). Headers are empty on the last page.
+        """
+        rows = list(rows)
+        if len(rows) <= self.limit:
+            return rows, {}
+        rows = rows[:self.limit]
+        cursor = encode(key(rows[-1]))
+        args = request.args.to_dict(flat=False)
+        args[param] = [cursor]
+        args["limit"] = [str(self.limit)]
+        link = f"<{request.path}?{urlencode(args, doseq=True)}>; rel=\"next\""
+        return rows, {"Link": link, NEXT_CURSOR_HEADER: cursor}
+
+def page_args(param: str = "cursor", decode=decode_cursor) -> Page:
+    """Read ``limit`` and the cursor query parameter (``param``) for the current request.
+
+    ``limit`` defaults to PAGE_SIZE_DEFAULT and is capped at PAGE_SIZE_MAX.
+    """
+    settings = get_settings()
+    raw_limit = request.args.get("limit")
+    if raw_limit is None or raw_limit == "":
+        limit = settings.PAGE_SIZE_DEFAULT
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise DomainValidationError("limit must be an integer", field="limit")
+        if limit < 1:
+            raise DomainValidationError("limit must be >= 1", field="limit")
+    limit = min(limit, settings.PAGE_SIZE_MAX)
+    cursor = request.args.get(param)
+    after_id = decode(cursor) if cursor else None
+    return Page(after_id=after_id, limit=limit)
@@ -0,0 +1,16 @@
+from flask import request
+from flask.views import MethodView
+from flask_smorest import Blueprint
+from app.services.bulk_import_service import import_lines
+
+bulk_import_bp = Blueprint('bulk_import', __name__, url_prefix='/api/bulk-import', description='Bulk ingest of owners, cars, policies and claims from NDJSON.')
+
+@bulk_import_bp.route('')
+class BulkImportResource(MethodView):
+    """Load many records in one request."""
+    def post(self):
+        """Import an NDJSON body (one typed record per line); returns counts and per-line errors.
+
+        Invalid records are reported and skipped; valid ones are committed batch by batch.
+        """
+        return import_lines(request.stream), 200
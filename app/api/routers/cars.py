@@ -1,40 +1,55 @@
+from flask import request
 from flask.views import MethodView
 from flask_smorest import Blueprint
 from pydantic import ValidationError
-from app.api.schemas import CarCreate, CarUpdate, CarOut
-from app.services.car_service import list_cars, create_car, get_car, update_car, delete_car
+from app.api.schemas import CarCreate, CarUpdate
+from app.api.serializers import CAR_LIST, CAR_LIST_WITH_OWNER, CAR_ITEM
+from app.services.car_service import list_cars, iter_cars, create_car, get_car, update_car, delete_car
 from app.api.errors import DomainValidationError
+from app.api.pagination import page_args
+from app.api.streaming import wants_stream, stream_collection
+from app.api.conditional import conditional, loaded_version
+from app.services.version_service import car_version
 from app.core.logging import get_logger
 
+INCLUDE_CHOICES = {"owner"}
+
+def _includes():
+    """Parse the comma-separated ?include= switch (e.g. include=owner)."""
+    raw = request.args.get("include", "")
+    includes = {part.strip() for part in raw.split(",") if part.strip()}
+    unknown = includes - INCLUDE_CHOICES
+    if unknown:
+        raise DomainValidationError(f"Unsupported include: {', '.join(sorted(unknown))}", field="include")
+    return includes
+
 bp = Blueprint('cars', __name__, url_prefix='/api/cars', description='Cars resource: manage vehicles linked to owners; cascade delete related policies and claims.')
 
 @bp.route('/')
 class CarsCollection(MethodView):
     """Collection resource for listing and creating cars."""
     def get(self):
-        """Return all cars with embedded owner info (if loaded)."""
-        cars = list_cars()
-        # include owner nested if loaded
-        out = []
-        for c in cars:
-            model = CarOut.model_validate(c, from_attributes=True)
-            data = model.model_dump(by_alias=True)
-            # embed owner object manually if relationship present
-            if getattr(c, 'owner', None):
-                data['owner'] = {
-                    'id': c.owner.id,
-                    'name': c.owner.name,
-                    'email': c.owner.email
-                }
-            out.append(data)
-        return out, 200
+        """Return one page of cars; ?include=owner embeds the owner (joined in the same query).
+
+        ?stream=true or Accept: application/x-ndjson streams every car instead of a page.
+        """
+        include_owner = "owner" in _includes()
+        mapper = CAR_LIST_WITH_OWNER if include_owner else CAR_LIST
+        page = page_args()
+        if wants_stream():
+            rows = iter_cars(after_id=page.after_id, include_owner=include_owner, columns=mapper.columns)
+            return stream_collection(rows, mapper)
+        rows, headers = page.split(list_cars(
+            after_id=page.after_id, limit=page.fetch, include_owner=include_owner, columns=mapper.columns
+        ))
+        return [mapper(r) for r in rows], 200, headers
 
     def post(self):
         """Validate request body and create a new car, returning the created resource."""
         from flask import request
         json_data = request.get_json(silent=True) or {}
         logger = get_logger()
-        logger.info("car.create.request", payload=json_data)
+        logger.debug("car.create.request", payload=json_data)
         try:
             body = CarCreate.model_validate(json_data)
         except ValidationError as ve:
@@ -47,19 +62,7 @@ class CarsCollection(MethodView):
             "year_of_manufacture": body.year_of_manufacture,
             "owner_id": body.owner_id
         })
-        model = CarOut.model_validate(car, from_attributes=True)
-        data = model.model_dump(by_alias=True)
-        # Ensure camelCase keys for output consistency
-        if 'year_of_manufacture' in data and 'yearOfManufacture' not in data:
-            data['yearOfManufacture'] = data.pop('year_of_manufacture')
-        if 'owner_id' in data and 'ownerId' not in data:
-            data['ownerId'] = data.pop('owner_id')
-        if getattr(car, 'owner', None):
-            data['owner'] = {
-                'id': car.owner.id,
-                'name': car.owner.name,
-                'email': car.owner.email
-            }
+        data = CAR_ITEM.from_object(car)
         logger.info("car.create.success", car_id=car.id)
         from flask import jsonify
         resp = jsonify(data)
@@ -70,22 +73,12 @@ class CarsCollection(MethodView):
 @bp.route('/<int:car_id>')
 class CarItem(MethodView):
     """Item resource for retrieving, updating and deleting a specific car."""
+    @conditional(car_version, "car")
     def get(self, car_id):
-        """Fetch a single car by id."""
-        car = get_car(car_id)
-        model = CarOut.model_validate(car, from_attributes=True)
-        data = model.model_dump(by_alias=True)
-        if 'year_of_manufacture' in data and 'yearOfManufacture' not in data:
-            data['yearOfManufacture'] = data.pop('year_of_manufacture')
-        if 'owner_id' in data and 'ownerId' not in data:
-            data['ownerId'] = data.pop('owner_id')
-        if getattr(car, 'owner', None):
-            data['owner'] = {
-                'id': car.owner.id,
-                'name': car.owner.name,
-                'email': car.owner.email
-            }
-        return data, 200
+        """Fetch a single car by id (owner joined in the same query); ETag from the car's version."""
+        car = get_car(car_id, include_owner=True)
+        loaded_version(car.version, car.updated_at)
+        return CAR_ITEM.from_object(car), 200
 
     def put(self, car_id):
         """Update mutable car fields; ignores None values."""
@@ -102,15 +95,7 @@ class CarItem(MethodView):
             model=body.model,
             year_of_manufacture=body.year_of_manufacture
         )
-        model = CarOut.model_validate(car, from_attributes=True)
-        data = model.model_dump(by_alias=True)
-        if getattr(car, 'owner', None):
-            data['owner'] = {
-                'id': car.owner.id,
-                'name': car.owner.name,
-                'email': car.owner.email
-            }
-        return data, 200
+        return CAR_LIST_WITH_OWNER.from_object(car), 200
 
     def delete(self, car_id):
         """Delete the car (cascades to policies/claims via ORM configuration)."""
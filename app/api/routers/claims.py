@@ -1,12 +1,15 @@
 from flask import request, url_for
 from flask.views import MethodView
 from flask_smorest import Blueprint
-from app.api.schemas import ClaimCreate, ClaimOut
-from app.services.claim_service import list_claims, create_claim, get_claims_for_car, get_claim
-from app.api.errors import NotFoundError
-
-def _to_json(c):
-    return ClaimOut.model_validate(c, from_attributes=True).model_dump(by_alias=False)
+from pydantic import ValidationError
+from app.api.schemas import ClaimCreate, ClaimStatsQuery
+from app.api.serializers import CLAIM
+from app.services.claim_service import list_claims, iter_claims, create_claim, get_claims_for_car, get_claim
+from app.api.errors import DomainValidationError, NotFoundError
+from app.core.config import get_settings
+from app.services.claim_stats_service import claim_stats
+from app.api.pagination import page_args
+from app.api.streaming import wants_stream, stream_collection
 
 claims_bp = Blueprint('claims', __name__, url_prefix='/api/claims', description='Claims resource: create, list, retrieve and delete insurance claims associated with cars.')
 
@@ -14,9 +17,12 @@ claims_bp = Blueprint('claims', __name__, url_prefix='/api/claims', description=
 class ClaimsCollection(MethodView):
     """Collection resource for listing all claims or creating a new one."""
     def get(self):
-        """Return all claims."""
-        claims = list_claims()
-        return [ClaimOut.model_validate(c, from_attributes=True).model_dump(by_alias=False) for c in claims], 200
+        """Return one page of claims ordered by id (or stream all with ?stream=true / NDJSON)."""
+        page = page_args()
+        if wants_stream():
+            return stream_collection(iter_claims(after_id=page.after_id, columns=CLAIM.columns), CLAIM)
+        rows, headers = page.split(list_claims(after_id=page.after_id, limit=page.fetch, columns=CLAIM.columns))
+        return [CLAIM(r) for r in rows], 200, headers
 
     def post(self):
         """Validate and create a new claim for a car."""
@@ -34,16 +40,34 @@ class ClaimsCollection(MethodView):
             return {"status": 404, "title": "Not Found", "detail": nf.message}, 404
         except Exception as e:
             return {"status": 500, "title": "Internal Server Error", "detail": str(e)}, 500
-        data_out = ClaimOut.model_validate(c, from_attributes=True).model_dump(by_alias=False)
+        data_out = CLAIM.from_object(c)
         headers = {'Location': f"/api/claims/{c.id}"}
         return data_out, 201, headers
 
+@claims_bp.route('/stats')
+class ClaimStats(MethodView):
+    """Claim amount statistics grouped in SQL."""
+    def get(self):
+        """Count, sum, avg, p50 and p95 of claim amounts per ?groupBy=car,owner,provider,month,make,model within ?from/?to."""
+        try:
+            q = ClaimStatsQuery.model_validate(request.args.to_dict())
+        except ValidationError as ve:
+            raise DomainValidationError("Invalid stats query", field="query", detail=ve.errors(include_url=False, include_context=False))
+        groups, truncated = claim_stats(q.groupBy, q.dateFrom, q.dateTo, max_groups=get_settings().CLAIM_STATS_MAX_GROUPS)
+        return {
+            "groupBy": q.groupBy,
+            "from": q.dateFrom.isoformat() if q.dateFrom else None,
+            "to": q.dateTo.isoformat() if q.dateTo else None,
+            "groups": groups,
+            "truncated": truncated,
+        }, 200
+
 @claims_bp.route('/<int:claim_id>')
 class ClaimItem(MethodView):
     """Item resource for a single claim."""
     def get(self, claim_id: int):
         c = get_claim(claim_id)
-        return ClaimOut.model_validate(c, from_attributes=True).model_dump(by_alias=False), 200
+        return CLAIM.from_object(c), 200
 
     def delete(self, claim_id: int):
         from app.services.claim_service import delete_claim
@@ -55,8 +79,7 @@ class ClaimItem(MethodView):
 class CarClaimsCollection(MethodView):
     """List or create claims nested under a car resource."""
     def get(self, car_id: int):
-        claims = get_claims_for_car(car_id)
-        return [ClaimOut.model_validate(c, from_attributes=True).model_dump(by_alias=False) for c in claims], 200
+        return [CLAIM(r) for r in get_claims_for_car(car_id, columns=CLAIM.columns)], 200
 
     def post(self, car_id: int):
         data = request.get_json(force=True, silent=True) or {}
@@ -76,6 +99,6 @@ class CarClaimsCollection(MethodView):
             return {"status": 404, "title": "Not Found", "detail": nf.message}, 404
         except Exception as e:
             return {"status": 500, "title": "Internal Server Error", "detail": str(e)}, 500
-        data_out = ClaimOut.model_validate(c, from_attributes=True).model_dump(by_alias=False)
+        data_out = CLAIM.from_object(c)
         headers = {'Location': f"/api/claims/{c.id}"}
         return data_out, 201, headers
\ No newline at end of file
@@ -0,0 +1,16 @@
+from flask.views import MethodView
+from flask_smorest import Blueprint
+from app.api.serializers import COVERAGE_SUMMARY
+from app.services.coverage_summary_service import get_summary
+
+coverage_summary_bp = Blueprint('coverage_summary', __name__, url_prefix='/api/cars', description='Coverage summary: current policy, coverage end, next gap and claim totals of a car in one read.')
+
+@coverage_summary_bp.route('/<int:car_id>/coverage-summary')
+class CoverageSummaryResource(MethodView):
+    """GET resource serving a car's row of the car_coverage_summary projection."""
+    def get(self, car_id):
+        """Return the car's coverage and claim summary as of today (404 for unknown cars)."""
+        summary = get_summary(car_id)
+        out = COVERAGE_SUMMARY.from_object(summary)
+        out["insured"] = summary.current_policy_id is not None
+        return out, 200
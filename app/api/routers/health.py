@@ -1,8 +1,28 @@
+from time import perf_counter
 from flask import jsonify
 from flask_smorest import Blueprint
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.base import datab as db
+from app.core.logging import get_logger
 
 health_bp = Blueprint('health', __name__)
+log = get_logger()
 
 @health_bp.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "ok"}), 200
\ No newline at end of file
+    """Liveness: the process is up (no dependencies checked)."""
+    return jsonify({"status": "ok"}), 200
+
+@health_bp.route('/health/ready', methods=['GET'])
+def readiness_check():
+    """Readiness: a pooled primary connection can be obtained and answers ``SELECT 1``; 503 otherwise."""
+    started = perf_counter()
+    try:
+        db.session.execute(text("SELECT 1"), bind_arguments={"bind": db.engine})
+    except SQLAlchemyError as exc:
+        db.session.rollback()
+        log.warning("health.ready.failed", error=str(exc))
+        return jsonify({"status": "unavailable", "checks": {"database": {"status": "error", "error": type(exc).__name__}}}), 503
+    latency_ms = round((perf_counter() - started) * 1000, 2)
+    return jsonify({"status": "ok", "checks": {"database": {"status": "ok", "latencyMs": latency_ms}}}), 200
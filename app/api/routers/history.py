@@ -1,28 +1,70 @@
+from datetime import date
 from flask.views import MethodView
 from flask_smorest import Blueprint
 from flask import request
-from app.services.history_service import car_history
-from app.api.schemas import HistoryEntryOut
+from pydantic import ValidationError
+from app.services.history_service import history_rows, iter_history_rows, history_entry, POLICY, CLAIM
+from app.api.schemas import HistoryQuery
+from app.api.errors import DomainValidationError
+from app.api.pagination import page_args, encode_position, decode_position
+from app.api.streaming import wants_stream, stream_collection
+from app.api.conditional import conditional, loaded_version
+from app.api.caching import cached
+from app.services.version_service import car_history_version
 
 history_bp = Blueprint('history', __name__, url_prefix='/api/history', description='History resource: unified chronological timeline of policies and claims for a car.')
 
+def _decode_after(token: str):
+    """Decode an ``?after=`` cursor into its (date, type, id) timeline position."""
+    key = decode_position(token, field="after")
+    try:
+        raw_date, kind, entry_id = key
+        position = (date.fromisoformat(raw_date), kind, entry_id)
+    except (TypeError, ValueError):
+        raise DomainValidationError("Invalid after", field="after")
+    if kind not in (POLICY, CLAIM) or not isinstance(entry_id, int):
+        raise DomainValidationError("Invalid after", field="after")
+    return position
+
+def _position(row):
+    return row.date.isoformat(), row.type, row.id
+
+def history_args():
+    """Parse a history request: (compact, page, bounds for the history_rows services)."""
+    try:
+        q = HistoryQuery.model_validate(request.args.to_dict())
+    except ValidationError as ve:
+        raise DomainValidationError("Invalid history filter", field="query", detail=ve.errors(include_url=False, include_context=False))
+    page = page_args(param="after", decode=_decode_after)
+    return q.format == "compact", page, dict(after=page.after_id, date_from=q.dateFrom, date_to=q.dateTo)
+
+def history_page(page, rows, compact: bool):
+    """View return value for one page of timeline rows fetched with ``page.fetch``."""
+    rows, headers = page.split(
+        rows,
+        key=_position,
+        encode=lambda k: encode_position(*k),
+        param="after",
+    )
+    return [history_entry(r, compact) for r in rows], 200, headers
+
 @history_bp.route('/<int:car_id>')
 class CarHistoryResource(MethodView):
     """Retrieve chronological policy/claim history for a single car."""
+    @cached("history")
+    @conditional(car_history_version, "history", per_query=True)
     def get(self, car_id):
-        """Return sorted merged entries (ISO date strings)."""
-        fmt = request.args.get("format")
-        compact = fmt == "compact"
-        entries = car_history(car_id, compact=compact)
-        if compact:
-            # Compact entries already pruned; return as-is
-            return entries, 200
-        # Normal (full) format: validate via pydantic then prune None keys for cleaner output
-        cleaned = []
-        for e in entries:
-            model = HistoryEntryOut.model_validate(e)
-            dumped = model.model_dump(by_alias=True)
-            # Remove keys whose value is None
-            pruned = {k: v for k, v in dumped.items() if v is not None}
-            cleaned.append(pruned)
-        return cleaned, 200
\ No newline at end of file
+        """Return one page of merged entries (ISO date strings) ordered by date, then type.
+
+        ?from=&to= bound the entry dates; the next page is requested with the
+        ``after`` cursor from the Link / X-Next-Cursor headers. ?stream=true or
+        Accept: application/x-ndjson streams the whole (bounded) timeline.
+        """
+        compact, page, bounds = history_args()
+        if wants_stream():
+            rows, version = iter_history_rows(car_id, **bounds)
+            loaded_version(*version)
+            return stream_collection(rows, lambda r: history_entry(r, compact))
+        rows, version = history_rows(car_id, limit=page.fetch, **bounds)
+        loaded_version(*version)
+        return history_page(page, rows, compact)
@@ -2,27 +2,63 @@ from flask.views import MethodView
 from flask_smorest import Blueprint
 from flask import request
 from pydantic import ValidationError
-from app.api.schemas import InsuranceValidityQuery, InsuranceValidityOut
-from app.services.validity_service import check_insurance
+from app.api.schemas import InsuranceValidityQuery, InsuranceValidityOut, InsuranceValidityBatchQuery
+from app.services.validity_service import check_insurance, check_insurance_batch
+from app.core.config import get_settings
 from app.api.errors import DomainValidationError
+from app.api.conditional import conditional, current_version, loaded_version
+from app.api.caching import cached
+from app.services.version_service import car_history_version
+
+def validity_query(car_id: int) -> InsuranceValidityQuery:
+    """Validate the ``?date=`` parameter of a validity request."""
+    date_str = request.args.get("date")
+    if not date_str:
+        raise DomainValidationError("Missing query parameter 'date'", field="date")
+    try:
+        return InsuranceValidityQuery(carId=car_id, date=date_str)
+    except ValidationError:
+        raise DomainValidationError("Invalid date", field="date")
+    except ValueError as ve:
+        # year range validator raises ValueError
+        raise DomainValidationError(str(ve), field="date")
 
 insurance_validation_bp = Blueprint('insurance_validation', __name__, url_prefix='/api/cars', description='Insurance validity: check if a car is insured on a specific date.')
 
 @insurance_validation_bp.route('/<int:car_id>/insurance-valid')
 class InsuranceValidResource(MethodView):
     """GET resource for validating insurance coverage on a given date."""
+    @cached("validity")
+    @conditional(car_history_version, "validity", per_query=True)
     def get(self, car_id):
         """Validate query date parameter and respond with validity boolean."""
-        date_str = request.args.get("date")
-        if not date_str:
-            raise DomainValidationError("Missing query parameter 'date'", field="date")
-        try:
-            model = InsuranceValidityQuery(carId=car_id, date=date_str)
-        except ValidationError:
-            raise DomainValidationError("Invalid date", field="date")
-        except ValueError as ve:
-            # year range validator raises ValueError
-            raise DomainValidationError(str(ve), field="date")
-        result = check_insurance(model.carId, model.date)
+        model = validity_query(car_id)
+        result = check_insurance(model.carId, model.date, history_version=current_version())
+        loaded_version(*result["version"])
         out = InsuranceValidityOut.model_validate(result)
-        return out.model_dump(by_alias=True), 200
\ No newline at end of file
+        return out.model_dump(by_alias=True), 200
+
+@insurance_validation_bp.route('/insurance-valid:batch')
+class InsuranceValidBatchResource(MethodView):
+    """POST resource resolving many (carId, date) validity checks in one call."""
+    def post(self):
+        """Validate the items list and return results in input order.
+
+        Unknown cars are reported per item (status 404) rather than failing the batch.
+        """
+        data = request.get_json(force=True, silent=True) or {}
+        try:
+            body = InsuranceValidityBatchQuery.model_validate(data)
+        except ValidationError as ve:
+            raise DomainValidationError("Invalid validity batch", field="items", detail=ve.errors(include_url=False, include_context=False))
+        max_items = get_settings().VALIDITY_BATCH_MAX
+        if len(body.items) > max_items:
+            raise DomainValidationError(f"At most {max_items} items per batch", field="items")
+        results = check_insurance_batch([(q.carId, q.date) for q in body.items])
+        out = []
+        for r in results:
+            if r["found"]:
+                out.append(InsuranceValidityOut.model_validate(r).model_dump(by_alias=True))
+            else:
+                out.append({"carId": r["carId"], "date": r["date"], "status": 404, "detail": "Car not found"})
+        return {"results": out}, 200
@@ -0,0 +1,12 @@
+from flask_smorest import Blueprint
+from app.core.config import get_settings
+from app.core.metrics import render_latest
+
+metrics_bp = Blueprint('metrics', __name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus scrape endpoint; merges all workers when METRICS_MULTIPROC_DIR is set."""
+    return render_latest(get_settings().METRICS_MULTIPROC_DIR), 200, {"Content-Type": CONTENT_TYPE}
@@ -2,9 +2,12 @@ from flask import request
 from flask.views import MethodView
 from flask_smorest import Blueprint
 from pydantic import ValidationError
-from app.api.schemas import OwnerCreate, OwnerOut
-from app.services.owners_service import list_owners, create_owner
+from app.api.schemas import OwnerCreate
+from app.api.serializers import OWNER
+from app.services.owners_service import list_owners, iter_owners, create_owner
 from app.api.errors import DomainValidationError
+from app.api.pagination import page_args
+from app.api.streaming import wants_stream, stream_collection
 
 owner_bp = Blueprint('owners', __name__, url_prefix='/api/owners', description='Owners resource: list and create owners; future item endpoint will allow retrieval.')
 
@@ -12,9 +15,15 @@ owner_bp = Blueprint('owners', __name__, url_prefix='/api/owners', description='
 class OwnersResource(MethodView):
     """List existing owners or create new ones."""
     def get(self):
-        """Return all owners serialized with OwnerOut."""
-        owners = list_owners()
-        return [OwnerOut.model_validate(o, from_attributes=True).model_dump(by_alias=True) for o in owners], 200
+        """Return one page of owners.
+
+        With ?stream=true or an NDJSON Accept header every owner is streamed instead.
+        """
+        page = page_args()
+        if wants_stream():
+            return stream_collection(iter_owners(after_id=page.after_id, columns=OWNER.columns), OWNER)
+        rows, headers = page.split(list_owners(after_id=page.after_id, limit=page.fetch, columns=OWNER.columns))
+        return [OWNER(r) for r in rows], 200, headers
 
     def post(self):
         """Create a new owner.
@@ -28,5 +37,4 @@ class OwnersResource(MethodView):
         except ValidationError:
             raise DomainValidationError("Invalid owner payload", field="body")
         owner = create_owner(body.model_dump())
-        out = OwnerOut.model_validate(owner, from_attributes=True)
-        return out.model_dump(by_alias=True), 201
+        return OWNER.from_object(owner), 201
@@ -1,30 +1,35 @@
 from flask.views import MethodView
 from flask_smorest import Blueprint
 from flask import request, url_for
-from app.db.models import InsurancePolicy
-from app.api.schemas import PolicyCreate, PolicyUpdate, PolicyOut
-from app.services.policies_service import list_policies, create_policy, update_policy, get_policy
+from pydantic import ValidationError
+from app.api.schemas import PolicyCreate, PolicyUpdate, CarPoliciesQuery
+from app.api.serializers import POLICY
+from app.services.policies_service import list_policies, iter_policies, list_policies_for_car, create_policy, update_policy, get_policy, delete_policy
 from app.api.errors import ConflictError, DomainValidationError, NotFoundError
+from app.api.pagination import page_args
+from app.api.streaming import wants_stream, stream_collection
+from app.api.conditional import conditional, loaded_version
+from app.services.version_service import policy_version
 
 policies_bp = Blueprint('policies', __name__, url_prefix='/api', description='Insurance policies: global listing, creation, per-car listing, update and deletion.')
 
-def _to_json(p: InsurancePolicy):
-    """Serialize an InsurancePolicy ORM instance to primitive dict via Pydantic model.
-
-    Pydantic v2 requires from_attributes=True for ORM objects; omission was causing 500s in tests.
-    """
-    return PolicyOut.model_validate(p, from_attributes=True).model_dump(by_alias=False)
+_to_json = POLICY.from_object
 
 # Canonical global collection: /api/policies (list all or create for a car by carId in body)
 @policies_bp.route('/policies')
 class InsurancePolicyCollection(MethodView):
     """Global policies collection.
 
-    GET returns all policies (pagination TBD).
+    GET returns one page of policies (keyset pagination via ?limit=&cursor=),
+    or streams all of them with ?stream=true / Accept: application/x-ndjson.
     POST creates a policy; body must include carId.
     """
     def get(self):
-        return [_to_json(p) for p in list_policies()], 200
+        page = page_args()
+        if wants_stream():
+            return stream_collection(iter_policies(after_id=page.after_id, columns=POLICY.columns), POLICY)
+        rows, headers = page.split(list_policies(after_id=page.after_id, limit=page.fetch, columns=POLICY.columns))
+        return [POLICY(r) for r in rows], 200, headers
 
     def post(self):
         data = request.get_json(force=True, silent=True) or {}
@@ -53,8 +58,20 @@ class InsurancePolicyCollection(MethodView):
 @policies_bp.route('/cars/<int:car_id>/policies')
 class CarPoliciesCollection(MethodView):
     def get(self, car_id: int):
-        # Filter manually from list_policies (simple for now)
-        return [_to_json(p) for p in list_policies() if p.car_id == car_id], 200
+        """Stream the car's policies; optional ?activeOn=, ?from=&to= and ?provider= filters run in SQL."""
+        try:
+            q = CarPoliciesQuery.model_validate(request.args.to_dict())
+        except ValidationError as ve:
+            raise DomainValidationError("Invalid policy filter", field="query", detail=ve.errors(include_url=False, include_context=False))
+        policies = list_policies_for_car(
+            car_id,
+            active_on=q.activeOn,
+            provider=q.provider,
+            date_from=q.dateFrom,
+            date_to=q.dateTo,
+            columns=POLICY.columns
+        )
+        return stream_collection(policies, POLICY)
 
     def post(self, car_id: int):
         data = request.get_json(force=True, silent=True) or {}
@@ -83,8 +100,10 @@ class CarPoliciesCollection(MethodView):
 
 @policies_bp.route('/policies/<int:policy_id>')
 class InsurancePolicyItem(MethodView):
+    @conditional(policy_version, "policy")
     def get(self, policy_id: int):
         p = get_policy(policy_id)
+        loaded_version(p.version, p.updated_at)
         return _to_json(p), 200
 
     def put(self, policy_id: int):
@@ -108,8 +127,5 @@ class InsurancePolicyItem(MethodView):
         return _to_json(p), 200
 
     def delete(self, policy_id: int):
-        from app.db.base import datab as db
-        p = get_policy(policy_id)
-        db.session.delete(p)
-        db.session.commit()
+        delete_policy(policy_id)
         return {"status": 200, "title": "Deleted", "detail": f"Policy {policy_id} deleted"}, 200
@@ -0,0 +1,26 @@
+from flask import request
+from flask.views import MethodView
+from flask_smorest import Blueprint
+from pydantic import ValidationError
+from app.api.errors import DomainValidationError
+from app.api.schemas import MonthlyRollupQuery
+from app.services.monthly_rollup_service import get_rollups, refreshed_through
+
+rollups_bp = Blueprint('rollups', __name__, url_prefix='/api/rollups', description='Monthly rollups: insured car-days, claim frequency and severity per month, provider and make.')
+
+@rollups_bp.route('/monthly')
+class MonthlyRollupResource(MethodView):
+    """GET resource answering from the monthly_rollup table (never scans claims or policies)."""
+    def get(self):
+        """Rows for ?from=YYYY-MM&to=YYYY-MM, optionally one ?provider= / ?make=, with frequency and severity."""
+        try:
+            q = MonthlyRollupQuery.model_validate(request.args.to_dict())
+        except ValidationError as ve:
+            raise DomainValidationError("Invalid rollup query", field="query", detail=ve.errors(include_url=False, include_context=False))
+        through = refreshed_through()
+        return {
+            "from": q.monthFrom.strftime("%Y-%m") if q.monthFrom else None,
+            "to": q.monthTo.strftime("%Y-%m") if q.monthTo else None,
+            "refreshedThrough": through.isoformat() if through else None,
+            "rows": get_rollups(q.monthFrom, q.monthTo, q.provider, q.make),
+        }, 200
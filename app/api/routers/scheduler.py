@@ -0,0 +1,22 @@
+from flask.views import MethodView
+from flask_smorest import Blueprint
+from app.services.lease_service import list_leases, utcnow
+
+scheduler_bp = Blueprint('scheduler', __name__, url_prefix='/api/scheduler', description='Scheduled jobs: current leader lease and last run of each job.')
+
+def _iso(dt):
+    return dt.isoformat() + "Z" if dt else None
+
+@scheduler_bp.route('/jobs')
+class SchedulerJobsResource(MethodView):
+    def get(self):
+        """List scheduled jobs with their lease holder and last-run time, duration and row count."""
+        now = utcnow()
+        return [{
+            "job": lease.name,
+            "leader": lease.holder if lease.expires_at >= now else None,
+            "leaseExpiresAt": _iso(lease.expires_at),
+            "lastRunAt": _iso(lease.last_run_at),
+            "lastRunSeconds": lease.last_run_seconds,
+            "lastRunRows": lease.last_run_rows,
+        } for lease in list_leases()], 200
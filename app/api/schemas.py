@@ -93,6 +93,105 @@ class InsuranceValidityQuery(BaseModel):
     def range_validity(cls, v: date):
         return _range(v)
 
+class CarPoliciesQuery(BaseModel):
+    """Optional filters for GET /api/cars/<car_id>/policies."""
+    model_config = ConfigDict(strict=False, populate_by_name=True)
+    activeOn: date | None = None
+    dateFrom: date | None = Field(default=None, alias="from")
+    dateTo: date | None = Field(default=None, alias="to")
+    provider: str | None = None
+
+    @field_validator("activeOn", "dateFrom", "dateTo")
+    def range_filter(cls, v: date | None):
+        return _range(v) if v else v
+
+    @field_validator("dateTo")
+    def order_filter(cls, v: date | None, info):
+        df = info.data.get("dateFrom")
+        if v and df and v < df:
+            raise ValueError("to must be >= from")
+        return v
+
+class HistoryQuery(BaseModel):
+    """Optional date bounds and output format for GET /api/history/<car_id>."""
+    model_config = ConfigDict(strict=False, populate_by_name=True)
+    format: str | None = None
+    dateFrom: date | None = Field(default=None, alias="from")
+    dateTo: date | None = Field(default=None, alias="to")
+
+    @field_validator("dateFrom", "dateTo")
+    def range_filter(cls, v: date | None):
+        return _range(v) if v else v
+
+    @field_validator("dateTo")
+    def order_filter(cls, v: date | None, info):
+        df = info.data.get("dateFrom")
+        if v and df and v < df:
+            raise ValueError("to must be >= from")
+        return v
+
+CLAIM_STATS_DIMENSIONS = ("car", "owner", "provider", "month", "make", "model")
+
+class ClaimStatsQuery(BaseModel):
+    """Grouping (comma-separated dimensions) and claim-date bounds for GET /api/claims/stats."""
+    model_config = ConfigDict(strict=False, populate_by_name=True)
+    groupBy: list[str] = Field(default_factory=list)
+    dateFrom: date | None = Field(default=None, alias="from")
+    dateTo: date | None = Field(default=None, alias="to")
+
+    @field_validator("groupBy", mode="before")
+    def split_dimensions(cls, v):
+        if isinstance(v, str):
+            v = [part.strip() for part in v.split(",") if part.strip()]
+        unknown = [d for d in v if d not in CLAIM_STATS_DIMENSIONS]
+        if unknown:
+            raise ValueError(f"Unsupported groupBy: {', '.join(unknown)} (one of {', '.join(CLAIM_STATS_DIMENSIONS)})")
+        return list(dict.fromkeys(v))
+
+    @field_validator("dateFrom", "dateTo")
+    def range_filter(cls, v: date | None):
+        return _range(v) if v else v
+
+    @field_validator("dateTo")
+    def order_filter(cls, v: date | None, info):
+        df = info.data.get("dateFrom")
+        if v and df and v < df:
+            raise ValueError("to must be >= from")
+        return v
+
+def _month(v):
+    """Parse ``YYYY-MM`` into the first day of that month."""
+    if isinstance(v, str):
+        try:
+            year, month = (int(part) for part in v.split("-"))
+            v = date(year, month, 1)
+        except ValueError:
+            raise ValueError("month must be YYYY-MM") from None
+    return _range(v.replace(day=1))
+
+class MonthlyRollupQuery(BaseModel):
+    """Month range (``YYYY-MM``, inclusive) and optional provider / make for GET /api/rollups/monthly."""
+    model_config = ConfigDict(strict=False, populate_by_name=True)
+    monthFrom: date | None = Field(default=None, alias="from")
+    monthTo: date | None = Field(default=None, alias="to")
+    provider: str | None = None
+    make: str | None = None
+
+    @field_validator("monthFrom", "monthTo", mode="before")
+    def month_filter(cls, v):
+        return _month(v) if v else None
+
+    @field_validator("monthTo")
+    def order_filter(cls, v: date | None, info):
+        mf = info.data.get("monthFrom")
+        if v and mf and v < mf:
+            raise ValueError("to must be >= from")
+        return v
+
+class InsuranceValidityBatchQuery(BaseModel):
+    model_config = ConfigDict(strict=False)
+    items: list[InsuranceValidityQuery]
+
 # ---- Pydantic output models ----
 class PolicyOut(BaseModel):
     id: int
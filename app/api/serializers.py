@@ -0,0 +1,113 @@
+"""Fast-path output serializers.
+
+Each ``RowMapper`` pairs output keys with the ORM columns that feed them. List
+routes pass ``mapper.columns`` to the service so only those columns are
+selected, then turn each result row into a dict with a single ``zip`` over the
+precompiled keys -- no ORM identity-map work and no Pydantic round-trip per
+row. ``mapper.from_object`` does the same for ORM instances returned by item
+and write endpoints.
+
+Values are handed to the app JSON provider untouched (dates, Decimals), so
+responses are byte-identical to the former ``*Out.model_validate(...).model_dump()``
+output. Pydantic models in ``app.api.schemas`` remain the input validators.
+"""
+from operator import attrgetter
+from app.db.models import Car, CarCoverageSummary, Claim, InsurancePolicy, Owner
+
+class RowMapper:
+    """Precompiled mapping from selected columns (plus optional nested groups) to a dict."""
+
+    def __init__(self, fields: dict, nested: dict | None = None):
+        self.keys = tuple(fields)
+        self._columns = tuple(fields.values())
+        self._get = attrgetter(*(c.key for c in self._columns))
+        self.nested = dict(nested or {})
+        self._nested_plan = []
+        offset = len(self.keys)
+        for name, mapper in self.nested.items():
+            width = len(mapper.columns)
+            self._nested_plan.append((name, mapper, offset, offset + width))
+            offset += width
+
+    @property
+    def columns(self) -> tuple:
+        """Columns to select, flat fields first then each nested group in order."""
+        cols = self._columns
+        for mapper in self.nested.values():
+            cols += mapper.columns
+        return cols
+
+    def with_nested(self, name: str, mapper: "RowMapper") -> "RowMapper":
+        """Return a copy that also embeds ``mapper``'s columns under key ``name``."""
+        return RowMapper(dict(zip(self.keys, self._columns)), {**self.nested, name: mapper})
+
+    def __call__(self, row) -> dict:
+        out = dict(zip(self.keys, row))
+        for name, mapper, start, stop in self._nested_plan:
+            out[name] = dict(zip(mapper.keys, row[start:stop]))
+        return out
+
+    def from_object(self, obj) -> dict:
+        """Serialize an ORM instance; nested groups read the relationship named by their key."""
+        values = self._get(obj)
+        out = dict(zip(self.keys, values if len(self.keys) > 1 else (values,)))
+        for name, mapper, _, _ in self._nested_plan:
+            related = getattr(obj, name)
+            if related is not None:
+                out[name] = mapper.from_object(related)
+        return out
+
+OWNER = RowMapper({
+    "id": Owner.id,
+    "name": Owner.name,
+    "email": Owner.email,
+})
+
+# Collection and PUT responses have always used the ORM attribute names for
+# these two fields; item GET/POST responses use camelCase. Both are kept as-is.
+CAR_LIST = RowMapper({
+    "id": Car.id,
+    "vin": Car.vin,
+    "make": Car.make,
+    "model": Car.model,
+    "year_of_manufacture": Car.year_of_manufacture,
+    "owner_id": Car.owner_id,
+})
+CAR_LIST_WITH_OWNER = CAR_LIST.with_nested("owner", OWNER)
+
+CAR_ITEM = RowMapper({
+    "id": Car.id,
+    "vin": Car.vin,
+    "make": Car.make,
+    "model": Car.model,
+    "yearOfManufacture": Car.year_of_manufacture,
+    "ownerId": Car.owner_id,
+}).with_nested("owner", OWNER)
+
+POLICY = RowMapper({
+    "id": InsurancePolicy.id,
+    "provider": InsurancePolicy.provider,
+    "startDate": InsurancePolicy.start_date,
+    "endDate": InsurancePolicy.end_date,
+    "carId": InsurancePolicy.car_id,
+})
+
+CLAIM = RowMapper({
+    "id": Claim.id,
+    "claimDate": Claim.claim_date,
+    "description": Claim.description,
+    "amount": Claim.amount,
+    "carId": Claim.car_id,
+})
+
+COVERAGE_SUMMARY = RowMapper({
+    "carId": CarCoverageSummary.car_id,
+    "asOf": CarCoverageSummary.as_of,
+    "currentPolicyId": CarCoverageSummary.current_policy_id,
+    "provider": CarCoverageSummary.provider,
+    "coverageEnd": CarCoverageSummary.coverage_end,
+    "nextGap": CarCoverageSummary.next_gap,
+    "claimCount": CarCoverageSummary.claim_count,
+    "claimTotal": CarCoverageSummary.claim_total,
+    "lastClaimDate": CarCoverageSummary.last_claim_date,
+})
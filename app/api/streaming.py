@@ -0,0 +1,78 @@
+"""Incremental JSON response helpers.
+
+Routes that may return many rows hand an iterator (e.g. a ``yield_per`` result)
+to these helpers instead of materializing a list. Items are encoded with the
+app's JSON provider so output matches ``jsonify`` (sorted keys, compact
+separators, same date/Decimal handling) byte for byte.
+
+Flask pops the view's app/request context (removing the scoped SQLAlchemy
+session) before a streamed body is iterated, then re-pushes it for the
+generator. ``items`` must therefore be lazy -- a generator that executes its
+query on first ``next()`` -- never a result obtained inside the view.
+
+Two wire formats are supported and chosen from the ``Accept`` header:
+a JSON array (``application/json``, default) or newline-delimited JSON
+(``application/x-ndjson``), one object per line.
+"""
+from flask import current_app, request, stream_with_context
+
+CHUNK_ITEMS = 100
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+def wants_ndjson() -> bool:
+    """True when the client prefers NDJSON over a JSON array."""
+    best = request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+def wants_stream() -> bool:
+    """True when a collection should be streamed in full instead of paginated.
+
+    Triggered by ``?stream=true`` (JSON array) or an NDJSON ``Accept`` header.
+    """
+    return request.args.get("stream", "").lower() in {"1", "true", "yes"} or wants_ndjson()
+
+def _chunks(parts):
+    buf = []
+    for part in parts:
+        buf.append(part)
+        if len(buf) >= CHUNK_ITEMS:
+            yield "".join(buf)
+            buf = []
+    if buf:
+        yield "".join(buf)
+
+def stream_json_array(items, to_json, status: int = 200, headers=None):
+    """Stream ``items`` as a JSON array, serializing each with ``to_json``."""
+    dumps = current_app.json.dumps
+
+    def parts():
+        yield "["
+        first = True
+        for item in items:
+            if not first:
+                yield ","
+            yield dumps(to_json(item), separators=(",", ":"))
+            first = False
+        yield "]\n"
+
+    return current_app.response_class(
+        stream_with_context(_chunks(parts())), status=status, headers=headers, mimetype="application/json"
+    )
+
+def stream_ndjson(items, to_json, status: int = 200, headers=None):
+    """Stream ``items`` as newline-delimited JSON objects."""
+    dumps = current_app.json.dumps
+
+    def parts():
+        for item in items:
+            yield dumps(to_json(item), separators=(",", ":")) + "\n"
+
+    return current_app.response_class(
+        stream_with_context(_chunks(parts())), status=status, headers=headers, mimetype=NDJSON_MIMETYPE
+    )
+
+def stream_collection(items, to_json, status: int = 200, headers=None):
+    """Stream ``items`` in the format negotiated from the Accept header."""
+    if wants_ndjson():
+        return stream_ndjson(items, to_json, status=status, headers=headers)
+    return stream_json_array(items, to_json, status=status, headers=headers)
@@ -0,0 +1,168 @@
+"""ASGI entry point with an async read path.
+
+``create_asgi_app()`` wraps the Flask app. ``GET``/``HEAD`` requests to the
+routes listed in ASYNC_READ_ROUTES (``validity``, ``history``, ``car``,
+``policy``) are served by the handlers of ``app.api.async_views`` on a
+SQLAlchemy async engine (asyncpg / aiosqlite), so a single worker keeps many
+database waits in flight without a thread each. Every other request -- writes,
+other routes, streamed history -- goes unchanged to the WSGI app through
+asgiref's WSGI adapter, run on a pool of ``ASGI_WSGI_THREADS`` threads per
+worker (asgiref's default would run them all on one shared thread).
+
+An async request runs in a Flask request context built from the ASGI scope:
+``before_request`` hooks, error handlers and ``after_request`` hooks all run,
+and the response is rendered by Flask, so headers and bodies match the WSGI
+path byte for byte.
+
+The async engine reads from ``SQLALCHEMY_DATABASE_URI`` (the primary; replica
+routing applies to the WSGI path only) with its own pool, ``ASYNC_DB_POOL_SIZE``
++ ``ASYNC_DB_MAX_OVERFLOW`` connections per worker; requests beyond that wait
+on the pool without holding a thread. It is disposed on lifespan shutdown. With SCHEDULER_ENABLED the
+background jobs are started on lifespan startup and stopped on shutdown.
+
+Serve with ``uvicorn --factory app.asgi:create_asgi_app``.
+"""
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgiInstance
+from sqlalchemy.ext.asyncio import create_async_engine
+from werkzeug.exceptions import HTTPException
+from app.api.async_views import ASYNC_VIEWS
+from app.core.config import get_settings
+from app.core.metrics import counter
+from app.core.scheduling import start_expiry_scheduler, shutdown_expiry_scheduler
+from app.db.pool import async_database_url, async_engine_options
+from app.main import create_app
+
+READ_METHODS = {"GET", "HEAD"}
+
+ASYNC_READS = counter("http_async_requests_total", "Requests served by the async read path, by route", ("route",))
+
+def _environ(scope) -> dict:
+    """WSGI environ for a body-less ASGI HTTP request."""
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if path.startswith(root_path):
+        path = path[len(root_path):]
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode("utf8").decode("latin1"),
+        "PATH_INFO": path.encode("utf8").decode("latin1"),
+        "QUERY_STRING": scope["query_string"].decode("latin1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+    for raw_name, raw_value in scope.get("headers", []):
+        name = raw_name.decode("latin1").upper().replace("-", "_")
+        if name not in ("CONTENT_LENGTH", "CONTENT_TYPE"):
+            name = f"HTTP_{name}"
+        value = raw_value.decode("latin1")
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+class _PooledWsgiInstance(WsgiToAsgiInstance):
+    """asgiref's per-request WSGI adapter, running the app on ``executor`` instead of the shared sync thread."""
+
+    def __init__(self, wsgi_application, executor):
+        super().__init__(wsgi_application)
+        run = WsgiToAsgiInstance.__dict__["run_wsgi_app"].__wrapped__.__get__(self)
+        self.run_wsgi_app = sync_to_async(run, thread_sensitive=False, executor=executor)
+
+class PooledWsgiToAsgi:
+    """ASGI wrapper for a WSGI app whose requests run concurrently on a bounded thread pool."""
+
+    def __init__(self, wsgi_application, threads: int):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="wsgi")
+
+    async def __call__(self, scope, receive, send):
+        await _PooledWsgiInstance(self.wsgi_application, self.executor)(scope, receive, send)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+
+class AsyncReadApp:
+    """ASGI app: async handlers for the read routes, the WSGI app for everything else."""
+
+    def __init__(self, flask_app):
+        settings = get_settings()
+        self.flask_app = flask_app
+        self.wsgi = PooledWsgiToAsgi(flask_app, settings.ASGI_WSGI_THREADS)
+        self.routes = {r.strip() for r in settings.ASYNC_READ_ROUTES.split(",") if r.strip()}
+        url = flask_app.config["SQLALCHEMY_DATABASE_URI"]
+        self.engine = create_async_engine(async_database_url(url), **async_engine_options(settings, url))
+        self._urls = flask_app.url_map.bind("localhost")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        view = self._match(scope) if scope["type"] == "http" else None
+        if view is None or not await self._serve(view, scope, send):
+            await self.wsgi(scope, receive, send)
+
+    def _match(self, scope):
+        if scope["method"] not in READ_METHODS:
+            return None
+        try:
+            endpoint, _ = self._urls.match(scope["path"], scope["method"])
+        except HTTPException:  # 404, 405, or a redirect to the canonical URL
+            return None
+        view = ASYNC_VIEWS.get(endpoint)
+        return view if view is not None and view.route in self.routes else None
+
+    async def _serve(self, view, scope, send) -> bool:
+        """Serve the request with ``view``; False hands it to the WSGI app untouched."""
+        app = self.flask_app
+        environ = _environ(scope)
+        with app.request_context(environ) as ctx:
+            if not view.accepts():
+                return False
+            ASYNC_READS.inc(route=view.route)
+            try:
+                rv = app.preprocess_request()
+                if rv is None:
+                    async with self.engine.connect() as conn:
+                        rv = await view.handler(conn, **ctx.request.view_args)
+            except Exception as exc:
+                rv = app.handle_user_exception(exc)
+            resp = app.finalize_request(rv)
+            headers = resp.get_wsgi_headers(environ)
+            body = b"".join(resp.get_app_iter(environ))
+            resp.close()
+        await send({
+            "type": "http.response.start",
+            "status": resp.status_code,
+            "headers": [(k.lower().encode("latin1"), v.encode("latin1")) for k, v in headers.items()],
+        })
+        await send({"type": "http.response.body", "body": body})
+        return True
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                start_expiry_scheduler(self.flask_app)
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                shutdown_expiry_scheduler()
+                await self.engine.dispose()
+                self.wsgi.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+def create_asgi_app(db_url=None) -> AsyncReadApp:
+    """Create the Flask app and wrap it for ASGI serving."""
+    return AsyncReadApp(create_app(db_url))
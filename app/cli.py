@@ -0,0 +1,43 @@
+"""Flask CLI commands (``flask <command>``)."""
+import json
+import click
+from app.core.logging import console_logs_to_stderr
+from app.services.bulk_import_service import import_lines
+from app.services import coverage_summary_service, monthly_rollup_service
+
+def register_cli(app):
+    """Attach the project's commands to ``app.cli``."""
+
+    @app.cli.command("bulk-import")
+    @click.argument("source", type=click.File("rb"))
+    @click.option("--batch-size", type=int, default=None, help="Records per transaction (default BULK_IMPORT_BATCH_SIZE).")
+    def bulk_import_command(source, batch_size):
+        """Load owners, cars, policies and claims from an NDJSON file ('-' for stdin).
+
+        The JSON report is the only output on stdout; logs go to stderr.
+        """
+        console_logs_to_stderr()
+        report = import_lines(source, batch_size=batch_size)
+        click.echo(json.dumps(report, indent=2, default=str))
+
+    @app.cli.group("coverage-summary")
+    def coverage_summary_group():
+        """Maintain the car_coverage_summary projection."""
+
+    @coverage_summary_group.command("rebuild")
+    @click.option("--batch-size", type=int, default=1000, show_default=True, help="Cars recomputed per INSERT.")
+    def coverage_summary_rebuild_command(batch_size):
+        """Recompute every car's coverage summary from policies and claims."""
+        rows = coverage_summary_service.rebuild(batch_size=batch_size)
+        click.echo(f"Rebuilt {rows} coverage summaries")
+
+    @app.cli.group("rollups")
+    def rollups_group():
+        """Maintain the monthly claim and exposure rollups."""
+
+    @rollups_group.command("refresh")
+    @click.option("--full", is_flag=True, help="Recompute every month instead of those changed since the watermark.")
+    def rollups_refresh_command(full):
+        """Recompute the monthly rollups changed since the last refresh."""
+        months = monthly_rollup_service.rebuild() if full else monthly_rollup_service.refresh()
+        click.echo(f"Refreshed {months} months")
@@ -1,20 +1,47 @@
 from functools import lru_cache
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field
+from app.db.pool import engine_options
 
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(env_file='.env', env_file_encoding='utf-8', extra='ignore')
 
     APP_ENV: str = Field(default='dev')
     DATABASE_URL: str = Field(default='sqlite:///data.db')
+    # Optional read replicas (comma-separated URLs) used by GET/HEAD requests
+    DATABASE_REPLICA_URLS: str | None = Field(default=None)
+    REPLICA_EJECT_SECONDS: float = Field(default=30.0)
+    # After a write, the client reads from the primary for this long (X-Read-After / cookie)
+    READ_YOUR_WRITES_SECONDS: float = Field(default=5.0)
     SECRET_KEY: str = Field(default='change-me')
 
+    # Connection pool (server databases; SQLite only honours pre-ping)
+    DB_POOL_SIZE: int = Field(default=5)
+    DB_MAX_OVERFLOW: int = Field(default=10)
+    DB_POOL_TIMEOUT: float = Field(default=10.0)
+    DB_POOL_RECYCLE: int = Field(default=1800)
+    DB_POOL_PRE_PING: bool = Field(default=True)
+    # Postgres statement_timeout per connection (unset = server default)
+    DB_STATEMENT_TIMEOUT_MS: int | None = Field(default=None)
+
+    # ASGI serving mode (app.asgi): read routes served by async handlers, and their engine's pool
+    ASYNC_READ_ROUTES: str = Field(default='validity,history,car,policy')
+    ASYNC_DB_POOL_SIZE: int = Field(default=20)
+    ASYNC_DB_MAX_OVERFLOW: int = Field(default=20)
+    # Threads per ASGI worker running requests that fall back to the WSGI app
+    ASGI_WSGI_THREADS: int = Field(default=8)
+
     # Logging
     LOG_LEVEL: str = Field(default='INFO')
     LOG_FILE: str = Field(default='app.log')
     LOG_MAX_BYTES: int = Field(default=2_097_152)
     LOG_BACKUP_COUNT: int = Field(default=10)
     LOG_TO_FILE: bool = Field(default=True)
+    # Async logging: records go through a bounded queue to a writer thread (full queue = drop)
+    LOG_ASYNC: bool = Field(default=False)
+    LOG_QUEUE_SIZE: int = Field(default=10_000)
+    # Fraction of requests whose request.start/request.end lines are logged (5xx always are)
+    LOG_REQUEST_SAMPLE_RATE: float = Field(default=1.0)
 
     # Swagger / OpenAPI (needed by flask-smorest)
     API_TITLE: str = Field(default='Cars Insurance API')
@@ -22,19 +49,67 @@ class Settings(BaseSettings):
     OPENAPI_VERSION: str = Field(default='3.0.3')
     ENABLE_SWAGGER: bool = Field(default=True)
 
+    # Pagination (keyset cursors on list endpoints)
     PAGE_SIZE_DEFAULT: int = Field(default=50)
+    PAGE_SIZE_MAX: int = Field(default=500)
+    # Rows per fetch when streaming full collections (?stream=true / NDJSON)
+    STREAM_BATCH_SIZE: int = Field(default=1000)
+
+    # Maximum (carId, date) pairs accepted by POST /api/cars/insurance-valid:batch
+    VALIDITY_BATCH_MAX: int = Field(default=1000)
+
+    # Maximum groups returned by GET /api/claims/stats (the response says when it was truncated)
+    CLAIM_STATS_MAX_GROUPS: int = Field(default=1000)
+
+    # Metrics: shared directory for aggregating gunicorn workers (unset = single process)
+    METRICS_MULTIPROC_DIR: str | None = Field(default=None)
+    METRICS_FLUSH_SECONDS: float = Field(default=5.0)
+
+    # Opt-in SQL profiling: always on, or per request via X-Profile: <PROFILING_TOKEN>
+    PROFILING_ENABLED: bool = Field(default=False)
+    PROFILING_TOKEN: str | None = Field(default=None)
+    PROFILING_N_PLUS_ONE_THRESHOLD: int = Field(default=5)
+    PROFILING_SLOW_REQUEST_MS: float = Field(default=500.0)
+    PROFILING_TOP_STATEMENTS: int = Field(default=5)
+
+    # Per-process interval index for validity / overlap checks
+    COVERAGE_INDEX_ENABLED: bool = Field(default=False)
+    COVERAGE_INDEX_TTL_SECONDS: int = Field(default=300)
+    COVERAGE_INDEX_MAX_CARS: int = Field(default=100_000)
+
+    # Response cache for per-car reads: none | memory (per-process LRU+TTL) | shared (RESPONSE_CACHE_URL)
+    RESPONSE_CACHE_BACKEND: str = Field(default='none')
+    RESPONSE_CACHE_URL: str | None = Field(default=None)
+    RESPONSE_CACHE_TTL_SECONDS: int = Field(default=60)
+    RESPONSE_CACHE_MAX_ENTRIES: int = Field(default=10_000)
+    RESPONSE_CACHE_ROUTES: str = Field(default='history,validity')
+
+    # Bulk import (POST /api/bulk-import, flask bulk-import)
+    BULK_IMPORT_BATCH_SIZE: int = Field(default=1000)
+    BULK_IMPORT_MAX_ERRORS: int = Field(default=1000)
 
     # Scheduler
     SCHEDULER_ENABLED: bool = Field(default=False)
     EXPIRY_JOB_INTERVAL_MINUTES: int = Field(default=10)
+    # Interval of the monthly rollup refresh job (same lease mechanism as the expiry job)
+    ROLLUP_JOB_INTERVAL_MINUTES: int = Field(default=20)
+    # Lease held by the worker running the expiry job; another worker takes over once it
+    # expires, so keep it longer than the job interval
+    SCHEDULER_LEASE_TTL_SECONDS: int = Field(default=1500)
+    # Policies marked per UPDATE ... RETURNING (one commit per chunk)
+    EXPIRY_CHUNK_SIZE: int = Field(default=500)
+    # Days before today covered by the very first expiry run (later runs resume from the watermark)
+    EXPIRY_INITIAL_LOOKBACK_DAYS: int = Field(default=1)
 
 @lru_cache
 def get_settings() -> Settings:
     return Settings()
 
-def apply_flask_config(app, settings: Settings):
+def apply_flask_config(app, settings: Settings, database_url: str | None = None):
+    database_url = database_url or settings.DATABASE_URL
     app.config['SECRET_KEY'] = settings.SECRET_KEY
-    app.config['SQLALCHEMY_DATABASE_URI'] = settings.DATABASE_URL
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(settings, database_url)
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['API_TITLE'] = settings.API_TITLE
     app.config['API_VERSION'] = settings.API_VERSION
@@ -0,0 +1,122 @@
+"""HTTP and database instrumentation feeding the ``/metrics`` registry.
+
+Requests are labelled by their URL rule template (``/api/cars/<int:car_id>``),
+never the concrete path, to keep label cardinality bounded. SQL statements are
+timed with engine-level ``before_cursor_execute``/``after_cursor_execute``
+listeners (registered on ``Engine`` so every engine, including replicas, is
+covered) and attributed to the current request's route, or to ``background``
+for scheduler jobs and CLI commands; profiled requests (``app.core.profiling``)
+also receive each statement. Latency and the per-request histograms cover
+producing the response object; statements run while a streamed body is
+generated count toward the route's ``db_queries_total`` only.
+"""
+import atexit
+import os
+from time import perf_counter
+from flask import g, request, has_request_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import get_settings
+from app.core.metrics import counter, gauge, histogram, SnapshotWriter
+
+HTTP_REQUESTS = counter("http_requests_total", "HTTP requests by route, method and status", ("method", "endpoint", "status"))
+HTTP_LATENCY = histogram("http_request_duration_seconds", "Time to produce the response", ("method", "endpoint"))
+HTTP_IN_FLIGHT = gauge("http_requests_in_flight", "Requests currently being handled", ("method", "endpoint"), multiprocess_mode="sum")
+DB_QUERIES = counter("db_queries_total", "SQL statements executed, by route (background outside requests)", ("endpoint",))
+DB_SECONDS = counter("db_query_seconds_total", "Time spent executing SQL statements", ("endpoint",))
+REQUEST_DB_QUERIES = histogram(
+    "http_request_db_queries", "SQL statements per request", ("endpoint",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100, 500),
+)
+REQUEST_DB_SECONDS = histogram("http_request_db_seconds", "Time spent in SQL per request", ("endpoint",))
+
+BACKGROUND = "background"
+_listening = False
+_writer = None
+
+def _endpoint() -> str:
+    rule = request.url_rule
+    return rule.rule if rule is not None else "unmatched"
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = perf_counter() - starts.pop()
+    if has_request_context() and "metrics_endpoint" in g:
+        endpoint = g.metrics_endpoint
+        # Without metrics_start the request has been observed: a streamed body is being generated
+        if "metrics_start" in g:
+            g.db_queries += 1
+            g.db_seconds += elapsed
+            profile = g.get("sql_profile")
+            if profile is not None:
+                profile.record(statement, elapsed, cursor.rowcount)
+    else:
+        endpoint = BACKGROUND
+    DB_QUERIES.inc(endpoint=endpoint)
+    DB_SECONDS.inc(elapsed, endpoint=endpoint)
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+def _listen_engines():
+    global _listening
+    if _listening:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+    _listening = True
+
+def _start_snapshot_writer(directory: str, interval: float):
+    global _writer
+    if _writer is not None:
+        return
+    os.makedirs(directory, exist_ok=True)
+    _writer = SnapshotWriter(directory, interval)
+    _writer.start()
+    atexit.register(_writer.stop)
+
+def init_instrumentation(app):
+    """Register request hooks and SQL listeners; start the snapshot writer in multi-process mode."""
+    _listen_engines()
+    settings = get_settings()
+    if settings.METRICS_MULTIPROC_DIR:
+        _start_snapshot_writer(settings.METRICS_MULTIPROC_DIR, settings.METRICS_FLUSH_SECONDS)
+
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_start = perf_counter()
+        g.metrics_endpoint = _endpoint()
+        g.db_queries = 0
+        g.db_seconds = 0.0
+        HTTP_IN_FLIGHT.inc(method=request.method, endpoint=g.metrics_endpoint)
+
+    def _observe(status: int):
+        endpoint = g.metrics_endpoint
+        HTTP_REQUESTS.inc(method=request.method, endpoint=endpoint, status=status)
+        HTTP_LATENCY.observe(perf_counter() - g.metrics_start, method=request.method, endpoint=endpoint)
+        REQUEST_DB_QUERIES.observe(g.db_queries, endpoint=endpoint)
+        REQUEST_DB_SECONDS.observe(g.db_seconds, endpoint=endpoint)
+        g.metrics_observed = True
+
+    @app.after_request
+    def _record_request_metrics(resp):
+        if "metrics_start" in g:
+            _observe(resp.status_code)
+        return resp
+
+    @app.teardown_request
+    def _finish_request_metrics(exc=None):
+        if "metrics_start" not in g:
+            return
+        if not g.get("metrics_observed"):
+            _observe(500)
+        HTTP_IN_FLIGHT.dec(method=request.method, endpoint=g.metrics_endpoint)
+        g.pop("metrics_start")
@@ -1,7 +1,26 @@
+"""Structured logging setup.
+
+By default log lines are written synchronously by the calling thread. With
+``LOG_ASYNC=1`` every record (structlog events included) is rendered by the
+caller and handed to a bounded in-memory queue (``LOG_QUEUE_SIZE``) through a
+``QueueHandler``; a background ``QueueListener`` thread writes it to the console
+and rotating file handlers, so request threads never wait on handler locks,
+file I/O or rotation. When the queue is full records are dropped rather than
+blocking, and counted in ``log_records_dropped_total``. The listener is stopped
+(flushing what is queued) at interpreter exit.
+
+Console output goes to stdout in both modes; CLI commands that print data on
+stdout call ``console_logs_to_stderr()`` first.
+"""
 import os
+import sys
+import atexit
 import logging
+import queue
 import structlog
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from app.core.config import get_settings
+from app.core.metrics import counter, gauge
 
 try:
     from dotenv import load_dotenv
@@ -9,6 +28,47 @@ try:
 except ImportError:
     pass
 
+LOG_DROPPED = counter("log_records_dropped_total", "Log records dropped because the async log queue was full")
+LOG_QUEUE_DEPTH = gauge("log_queue_depth", "Records waiting in the async log queue", multiprocess_mode="sum")
+
+_listener = None
+
+class _ConsoleStream:
+    """Console log target: stdout, or stderr after ``console_logs_to_stderr()``; resolved per write."""
+
+    to_stderr = False
+
+    def write(self, text):
+        return (sys.stderr if self.to_stderr else sys.stdout).write(text)
+
+    def flush(self):
+        (sys.stderr if self.to_stderr else sys.stdout).flush()
+
+_console = _ConsoleStream()
+
+def console_logs_to_stderr():
+    """Send console logs to stderr for the rest of the process (CLI commands whose stdout is data)."""
+    _console.to_stderr = True
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler for a bounded queue: drops and counts records instead of blocking when full."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_DROPPED.inc()
+
+def _start_queue_logging(root, sinks, maxsize: int):
+    """Route root records through a bounded queue to ``sinks`` written by a listener thread."""
+    global _listener
+    log_queue = queue.Queue(maxsize=maxsize)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    LOG_QUEUE_DEPTH.set_function(log_queue.qsize)
+    _listener = QueueListener(log_queue, *sinks, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
 def setup_logging():
     env = os.getenv("APP_ENV", "dev").lower()
     log_level_name = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -20,13 +80,16 @@ def setup_logging():
     # In container we default to console logging unless explicitly enabled AND not in docker env.
     log_to_file_env = os.getenv("LOG_TO_FILE", "0") == "1"
     log_to_file = log_to_file_env and env not in {"docker"}
+    settings = get_settings()
 
     root = logging.getLogger()
     if not root.handlers:
         root.setLevel(log_level)
-        console = logging.StreamHandler()
+        sinks = []
+        # Same stream structlog prints to in synchronous mode
+        console = logging.StreamHandler(_console)
         console.setFormatter(logging.Formatter("%(message)s"))
-        root.addHandler(console)
+        sinks.append(console)
         if log_to_file:
             # Ensure writable path (create directory if specified like logs/app.log)
             log_dir = os.path.dirname(log_file)
@@ -35,14 +98,20 @@ def setup_logging():
                     os.makedirs(log_dir, exist_ok=True)
                 except Exception:
                     # Fallback to console only if we cannot create directory
-                    return
+                    log_to_file = False
             try:
-                fh = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
-                fh.setFormatter(logging.Formatter("%(message)s"))
-                root.addHandler(fh)
+                if log_to_file:
+                    fh = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count)
+                    fh.setFormatter(logging.Formatter("%(message)s"))
+                    sinks.append(fh)
             except PermissionError:
                 # Ignore file handler if path unwritable in container
                 pass
+        if settings.LOG_ASYNC:
+            _start_queue_logging(root, sinks, settings.LOG_QUEUE_SIZE)
+        else:
+            for handler in sinks:
+                root.addHandler(handler)
 
     shared = [
         structlog.contextvars.merge_contextvars,        # if contextvars used
@@ -60,11 +129,18 @@ def setup_logging():
             ConsoleRenderer()
         ]
 
+    # In async mode structlog hands its rendered line to stdlib logging (and so to
+    # the queue) instead of printing it from the calling thread.
+    if _listener is not None:
+        factory = structlog.stdlib.LoggerFactory()
+    else:
+        factory = structlog.PrintLoggerFactory(_console)
     structlog.configure(
         processors=processors,
         wrapper_class=structlog.make_filtering_bound_logger(log_level),
         context_class=dict,
         cache_logger_on_first_use=True,
+        logger_factory=factory,
     )
 
 def get_logger():
@@ -0,0 +1,341 @@
+"""Lightweight in-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are created once at import time by the modules that own
+them (``counter("name", "help")``) and rendered by the ``/metrics`` endpoint.
+Label values are passed as keyword arguments: ``HITS.inc(route="cars")``.
+
+Multi-process servers (gunicorn workers) share a directory
+(``METRICS_MULTIPROC_DIR``): each process periodically writes a JSON snapshot
+of its registry there (``write_process_snapshot``) and the worker answering a
+scrape merges every snapshot. Counters and histograms are summed, including
+those of exited workers so totals stay monotonic; gauges of dead processes are
+dropped and live ones are combined per their ``multiprocess_mode`` (``all``
+keeps one series per pid, ``sum``/``max``/``min`` aggregate). A process
+whose pid was used by an exited worker folds that worker's counters and
+histograms into its own snapshot instead of overwriting them.
+"""
+import glob
+import json
+import os
+import threading
+import uuid
+from bisect import bisect_left
+
+_lock = threading.Lock()
+_registry: dict = {}
+_instance = None    # (pid, token) identifying this process's snapshots
+_inherited: dict = {}   # directory -> {name: snapshot} left there by an exited process with our pid
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[n]) for n in labelnames)
+
+def _fmt_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ""
+    inner = ",".join('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in pairs)
+    return "{" + inner + "}"
+
+class _Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: dict = {}
+        self._lock = threading.Lock()
+
+    def samples(self):
+        """Yield (suffix, label_key, extra_labels, value) tuples for exposition."""
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield "", key, (), value
+
+class Counter(_Metric):
+    """Monotonically increasing value (e.g. requests, cache hits)."""
+    type_name = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+class Gauge(_Metric):
+    """Value that can go up and down; may be backed by a callback."""
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), multiprocess_mode: str = "all"):
+        super().__init__(name, documentation, labelnames)
+        self._function = None
+        self.multiprocess_mode = multiprocess_mode
+
+    def set(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn):
+        """Compute the (unlabelled) value lazily at scrape time."""
+        self._function = fn
+
+    def value(self, **labels) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(_label_key(self.labelnames, labels), 0)
+
+    def samples(self):
+        if self._function is not None:
+            yield "", (), (), self._function()
+            return
+        yield from super().samples()
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram(_Metric):
+    """Distribution of observed values (e.g. latencies in seconds) over fixed buckets."""
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if idx < len(self.buckets):
+                state[0][idx] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        state = self._values.get(_label_key(self.labelnames, labels))
+        return state[2] if state else 0
+
+    def sum(self, **labels) -> float:
+        state = self._values.get(_label_key(self.labelnames, labels))
+        return state[1] if state else 0.0
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(state[0]), state[1], state[2])) for key, state in self._values.items()]
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                yield "_bucket", key, (("le", repr(float(bound))),), cumulative
+            yield "_bucket", key, (("le", "+Inf"),), n
+            yield "_sum", key, (), total
+            yield "_count", key, (), n
+
+def _get_or_create(cls, name, documentation, labelnames, **kwargs):
+    with _lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = cls(name, documentation, labelnames, **kwargs)
+            _registry[name] = metric
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric {name} already registered as {metric.type_name}")
+        return metric
+
+def counter(name: str, documentation: str, labelnames=()) -> Counter:
+    """Return the registered Counter called name, creating it on first use."""
+    return _get_or_create(Counter, name, documentation, labelnames)
+
+def gauge(name: str, documentation: str, labelnames=(), multiprocess_mode: str = "all") -> Gauge:
+    """Return the registered Gauge called name, creating it on first use.
+
+    multiprocess_mode says how values from several workers are combined:
+    ``all`` (one series per pid), ``sum``, ``max`` or ``min``.
+    """
+    return _get_or_create(Gauge, name, documentation, labelnames, multiprocess_mode=multiprocess_mode)
+
+def histogram(name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+    """Return the registered Histogram called name, creating it on first use."""
+    return _get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+def _render(metrics) -> str:
+    lines = []
+    for m in sorted(metrics, key=lambda m: m.name):
+        lines.append(f"# HELP {m.name} {m.documentation}")
+        lines.append(f"# TYPE {m.name} {m.type_name}")
+        for suffix, key, extra, value in m.samples():
+            lines.append(f"{m.name}{suffix}{_fmt_labels(m.labelnames, key, extra)} {value}")
+    return "\n".join(lines) + "\n"
+
+def _snapshot(metric) -> dict:
+    if isinstance(metric, Gauge) and metric._function is not None:
+        values = [[[], metric._function()]]
+    else:
+        with metric._lock:
+            values = [
+                [list(key), [list(v[0]), v[1], v[2]] if isinstance(metric, Histogram) else v]
+                for key, v in metric._values.items()
+            ]
+    return {
+        "type": metric.type_name,
+        "doc": metric.documentation,
+        "labels": list(metric.labelnames),
+        "mode": getattr(metric, "multiprocess_mode", None),
+        "buckets": list(getattr(metric, "buckets", ())),
+        "values": values,
+    }
+
+def _token() -> str:
+    global _instance
+    if _instance is None or _instance[0] != os.getpid():
+        _instance = (os.getpid(), uuid.uuid4().hex)
+        _inherited.clear()
+    return _instance[1]
+
+def _read_inherited(path: str, token: str) -> dict:
+    """Counter and histogram snapshots in ``path`` written by another process (an earlier holder of our pid)."""
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    if data.get("token") == token:
+        return {}
+    return {name: snap for name, snap in data["metrics"].items() if snap["type"] != "gauge"}
+
+def _fold(into: dict, snap: dict):
+    """Add the values of ``snap`` to the snapshot ``into`` of the same counter or histogram."""
+    values = {tuple(key): value for key, value in into["values"]}
+    for key, value in snap["values"]:
+        key, current = tuple(key), values.get(tuple(key))
+        if current is None:
+            values[key] = value
+        elif snap["type"] == "histogram":
+            values[key] = [[a + b for a, b in zip(current[0], value[0])], current[1] + value[1], current[2] + value[2]]
+        else:
+            values[key] = current + value
+    into["values"] = [[list(key), value] for key, value in values.items()]
+
+def write_process_snapshot(directory: str):
+    """Atomically write this process's registry to ``directory/metrics_<pid>.json``."""
+    path = os.path.join(directory, f"metrics_{os.getpid()}.json")
+    with _lock:
+        token = _token()
+        metrics = list(_registry.values())
+        if directory not in _inherited:
+            _inherited[directory] = _read_inherited(path, token)
+        inherited = _inherited[directory]
+    snapshots = {m.name: _snapshot(m) for m in metrics}
+    for name, snap in inherited.items():
+        if name in snapshots:
+            _fold(snapshots[name], snap)
+        else:
+            snapshots[name] = snap
+    data = {"pid": os.getpid(), "token": token, "metrics": snapshots}
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _merged_metric(snap: dict, name: str):
+    if snap["type"] == "counter":
+        return Counter(name, snap["doc"], snap["labels"])
+    if snap["type"] == "histogram":
+        return Histogram(name, snap["doc"], snap["labels"], buckets=snap["buckets"])
+    labels = snap["labels"] + (["pid"] if snap["mode"] == "all" else [])
+    return Gauge(name, snap["doc"], labels, multiprocess_mode=snap["mode"])
+
+def _merge_value(metric, key: tuple, value, pid: int):
+    current = metric._values.get(key)
+    if isinstance(metric, Histogram):
+        if current is None:
+            metric._values[key] = [list(value[0]), value[1], value[2]]
+        else:
+            current[0] = [a + b for a, b in zip(current[0], value[0])]
+            current[1] += value[1]
+            current[2] += value[2]
+    elif isinstance(metric, Counter) or metric.multiprocess_mode == "sum":
+        metric._values[key] = (current or 0) + value
+    elif metric.multiprocess_mode == "all":
+        metric._values[key + (str(pid),)] = value
+    elif current is None:
+        metric._values[key] = value
+    else:
+        metric._values[key] = max(current, value) if metric.multiprocess_mode == "max" else min(current, value)
+
+def collect_multiprocess(directory: str) -> list:
+    """Merge the snapshots of every process that wrote to ``directory``."""
+    merged = {}
+    for path in glob.glob(os.path.join(directory, "metrics_*.json")):
+        try:
+            with open(path, encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (OSError, ValueError):
+            continue
+        pid = data["pid"]
+        alive = _pid_alive(pid)
+        for name, snap in data["metrics"].items():
+            if snap["type"] == "gauge" and not alive:
+                continue
+            metric = merged.get(name)
+            if metric is None:
+                metric = merged[name] = _merged_metric(snap, name)
+            for key, value in snap["values"]:
+                _merge_value(metric, tuple(key), value, pid)
+    return list(merged.values())
+
+def render_latest(multiproc_dir: str | None = None) -> str:
+    """Render metrics in Prometheus text format (version 0.0.4).
+
+    With ``multiproc_dir`` this process's snapshot is refreshed first and the
+    merged view of all workers is rendered; otherwise just this process.
+    """
+    if multiproc_dir:
+        write_process_snapshot(multiproc_dir)
+        return _render(collect_multiprocess(multiproc_dir))
+    with _lock:
+        metrics = list(_registry.values())
+    return _render(metrics)
+
+class SnapshotWriter(threading.Thread):
+    """Daemon thread writing this process's snapshot every ``interval`` seconds."""
+
+    def __init__(self, directory: str, interval: float):
+        super().__init__(name="metrics-snapshot", daemon=True)
+        self.directory = directory
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                write_process_snapshot(self.directory)
+            except OSError:
+                pass
+
+    def stop(self):
+        self._stop_event.set()
+        write_process_snapshot(self.directory)
@@ -0,0 +1,138 @@
+"""Opt-in per-request SQL profiling.
+
+A request is profiled when ``PROFILING_ENABLED`` is set, or when it carries
+``X-Profile: <PROFILING_TOKEN>`` (only callers that know the token are trusted;
+without a configured token the header is ignored). For a profiled request:
+
+- every SQL statement's duration and driver row count is recorded (fed by the
+  cursor-execute listener in ``app.core.instrumentation``);
+- statement shapes (whitespace and ``IN (...)`` lists normalised) repeated more
+  than ``PROFILING_N_PLUS_ONE_THRESHOLD`` times are flagged as likely N+1 loads;
+- a ``Server-Timing`` header splits the request into ``db``, ``serialize``
+  (building the response from the view's return value) and ``total``;
+- requests slower than ``PROFILING_SLOW_REQUEST_MS`` are logged as
+  ``request.slow`` with their top statements; header-triggered ones are always
+  logged as ``request.profile``.
+
+Row counts come from ``cursor.rowcount``; drivers that do not know it before
+fetching (SQLite for SELECT) report ``None``.
+"""
+import hmac
+import re
+from collections import defaultdict
+from time import perf_counter
+from flask import g, request
+from app.core.config import get_settings
+from app.core.logging import get_logger
+
+PROFILE_HEADER = "X-Profile"
+log = get_logger()
+
+_WS = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*(?:\?|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%\(\w+\)s|:\w+))*\s*\)")
+
+def statement_shape(statement: str) -> str:
+    """Normalise a statement so repeats with different IN-list lengths compare equal."""
+    return _IN_LIST.sub("(?)", _WS.sub(" ", statement).strip())
+
+class SqlProfile:
+    """Statements executed during one request."""
+
+    def __init__(self):
+        self.statements = []
+        self.serialize_seconds = 0.0
+
+    def record(self, statement: str, seconds: float, rows: int | None):
+        self.statements.append((statement, seconds, rows if rows is not None and rows >= 0 else None))
+
+    @property
+    def db_seconds(self) -> float:
+        return sum(s for _, s, _ in self.statements)
+
+    def shapes(self) -> dict:
+        """Map statement shape -> [count, total seconds]."""
+        out = defaultdict(lambda: [0, 0.0])
+        for statement, seconds, _ in self.statements:
+            entry = out[statement_shape(statement)]
+            entry[0] += 1
+            entry[1] += seconds
+        return dict(out)
+
+    def n_plus_one(self, threshold: int) -> list:
+        """Shapes executed more than ``threshold`` times, most frequent first."""
+        repeated = [
+            {"statement": shape, "count": count, "ms": round(seconds * 1000, 2)}
+            for shape, (count, seconds) in self.shapes().items() if count > threshold
+        ]
+        return sorted(repeated, key=lambda r: -r["count"])
+
+    def top(self, n: int) -> list:
+        """The ``n`` slowest individual statements."""
+        ranked = sorted(self.statements, key=lambda s: -s[1])[:n]
+        return [{"statement": _WS.sub(" ", st).strip(), "ms": round(sec * 1000, 2), "rows": rows}
+                for st, sec, rows in ranked]
+
+def _requested() -> bool:
+    settings = get_settings()
+    if settings.PROFILING_ENABLED:
+        return True
+    provided = request.headers.get(PROFILE_HEADER)
+    token = settings.PROFILING_TOKEN
+    return bool(provided and token) and hmac.compare_digest(provided, token)
+
+def _server_timing(profile: SqlProfile, total: float) -> str:
+    return ", ".join([
+        f'db;dur={profile.db_seconds * 1000:.2f};desc="{len(profile.statements)} queries"',
+        f"serialize;dur={profile.serialize_seconds * 1000:.2f}",
+        f"total;dur={total * 1000:.2f}",
+    ])
+
+def init_profiling(app):
+    """Register the profiling hooks on ``app``."""
+    make_response = app.make_response
+
+    def timed_make_response(rv):
+        profile = g.get("sql_profile")
+        if profile is None:
+            return make_response(rv)
+        started = perf_counter()
+        try:
+            return make_response(rv)
+        finally:
+            profile.serialize_seconds += perf_counter() - started
+
+    app.make_response = timed_make_response
+
+    @app.before_request
+    def _start_profile():
+        if _requested():
+            g.sql_profile = SqlProfile()
+            g.profile_started = perf_counter()
+            g.profile_by_header = PROFILE_HEADER in request.headers
+
+    @app.after_request
+    def _finish_profile(resp):
+        profile = g.pop("sql_profile", None)
+        if profile is None:
+            return resp
+        settings = get_settings()
+        total = perf_counter() - g.profile_started
+        resp.headers["Server-Timing"] = _server_timing(profile, total)
+        n_plus_one = profile.n_plus_one(settings.PROFILING_N_PLUS_ONE_THRESHOLD)
+        fields = dict(
+            method=request.method,
+            path=request.path,
+            status=resp.status_code,
+            total_ms=round(total * 1000, 2),
+            db_ms=round(profile.db_seconds * 1000, 2),
+            serialize_ms=round(profile.serialize_seconds * 1000, 2),
+            queries=len(profile.statements),
+            top_statements=profile.top(settings.PROFILING_TOP_STATEMENTS),
+            n_plus_one=n_plus_one,
+            request_id=g.get("request_id"),
+        )
+        if total * 1000 >= settings.PROFILING_SLOW_REQUEST_MS:
+            log.warning("request.slow", **fields)
+        elif g.get("profile_by_header") or n_plus_one:
+            log.info("request.profile", **fields)
+        return resp
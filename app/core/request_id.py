@@ -1,24 +1,37 @@
+import random
 import uuid
+from time import perf_counter
 from flask import g, request
+from app.core.config import get_settings
 from app.core.logging import get_logger
 
 REQUEST_ID_HEADER = "X-Request-ID"
 log = get_logger()
 
+def _sampled() -> bool:
+    rate = get_settings().LOG_REQUEST_SAMPLE_RATE
+    return rate >= 1 or random.random() < rate
+
 def init_request_id(app, logger):
     @app.before_request
     def assign_request_id():
         rid = request.headers.get(REQUEST_ID_HEADER) or str(uuid.uuid4())
         g.request_id = rid
-        logger.info("request.start", method=request.method, path=request.path, request_id=rid)
+        g.request_started = perf_counter()
+        # start and end are sampled together so a logged request always has both lines.
+        g.request_logged = _sampled()
+        if g.request_logged:
+            logger.info("request.start", method=request.method, path=request.path, request_id=rid)
 
     @app.after_request
     def add_header(resp):
         if hasattr(g, "request_id"):
             resp.headers[REQUEST_ID_HEADER] = g.request_id
-            logger.info("request.end",
-                        method=request.method,
-                        path=request.path,
-                        status=resp.status_code,
-                        request_id=g.request_id)
-        return resp
\ No newline at end of file
+            if g.request_logged or resp.status_code >= 500:
+                logger.info("request.end",
+                            method=request.method,
+                            path=request.path,
+                            status=resp.status_code,
+                            duration_ms=round((perf_counter() - g.request_started) * 1000, 2),
+                            request_id=g.request_id)
+        return resp
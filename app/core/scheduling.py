@@ -1,35 +1,151 @@
+"""Background scheduler for the policy expiry and monthly rollup jobs.
+
+Every worker process starts a ``BackgroundScheduler``; on each tick the job
+first takes the ``policy_expiry_job`` lease (see ``app.services.lease_service``)
+and only the holder does any work. The leader renews its lease on every tick,
+releases it on clean shutdown, and a crashed leader is replaced once its lease
+expires (``SCHEDULER_LEASE_TTL_SECONDS``). While a job runs it renews the
+lease before each commit (the ``heartbeat`` passed to the work), so a job
+longer than the TTL keeps it, and a worker that lost it stops before writing
+anything more. After logging expired policies the job rolls the coverage
+summaries forward to today (``coverage_summary_service.roll_forward``). The
+``monthly_rollup_job`` runs the same way under its own lease and refreshes the
+monthly rollups (``monthly_rollup_service.refresh``).
+"""
+import os
+import socket
+import uuid
+from datetime import timezone
+from time import perf_counter
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from app.core.config import get_settings
-from app.services.expiry_service import log_today_expiring_policies
 from app.core.logging import get_logger
+from app.core.metrics import counter, gauge
+from app.db.base import datab as db
+from app.services.expiry_service import log_expiring_policies
+from app.services.coverage_summary_service import roll_forward
+from app.services.monthly_rollup_service import refresh as refresh_rollups
+from app.services.lease_service import LeaseLost, try_acquire, release, renew, record_run, utcnow
+
+JOB_ID = "policy_expiry_job"
+ROLLUP_JOB_ID = "monthly_rollup_job"
 
 _scheduler = None
+_app = None
+_holder = None
 log = get_logger()
 
-def start_expiry_scheduler():
-    global _scheduler
+JOB_RUNS = counter("scheduler_job_runs_total", "Scheduler ticks by outcome (ran, skipped, failed)", ("job", "outcome"))
+JOB_LEADER = gauge("scheduler_job_leader", "1 while this worker holds the job's lease", ("job",))
+JOB_LAST_RUN = gauge("scheduler_job_last_run_timestamp_seconds", "Unix time the job last ran", ("job",), multiprocess_mode="max")
+JOB_LAST_DURATION = gauge("scheduler_job_last_duration_seconds", "Duration of the job's last run on this worker", ("job",))
+
+def holder_id() -> str:
+    """Identity used on the lease row: host, pid and a per-process nonce."""
+    global _holder
+    if _holder is None:
+        _holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    return _holder
+
+def _heartbeat(job_id: str, holder: str, ttl_seconds: int):
+    """Callable renewing the lease (at most every third of the TTL); raises LeaseLost when taken over."""
+    last = perf_counter()
+
+    def beat():
+        nonlocal last
+        if perf_counter() - last < ttl_seconds / 3:
+            return  # renewed recently enough that no other worker can hold the lease
+        if not renew(job_id, holder, ttl_seconds):
+            raise LeaseLost(job_id)
+        last = perf_counter()
+    return beat
+
+def _run_leased(job_id: str, app, work):
+    """Run ``work(heartbeat)`` if this worker holds (or can take) ``job_id``'s lease; returns its rows or None."""
+    app = app or _app
+    with app.app_context():
+        holder = holder_id()
+        ttl = get_settings().SCHEDULER_LEASE_TTL_SECONDS
+        if not try_acquire(job_id, holder, ttl):
+            JOB_LEADER.set(0, job=job_id)
+            JOB_RUNS.inc(job=job_id, outcome="skipped")
+            return None
+        JOB_LEADER.set(1, job=job_id)
+        started_at = utcnow()
+        started = perf_counter()
+        rows = None
+        try:
+            rows = work(_heartbeat(job_id, holder, ttl))
+            JOB_RUNS.inc(job=job_id, outcome="ran")
+            return rows
+        except LeaseLost:
+            db.session.rollback()
+            JOB_LEADER.set(0, job=job_id)
+            JOB_RUNS.inc(job=job_id, outcome="lost")
+            log.warning("scheduler.lease_lost", job=job_id, holder=holder)
+            return None
+        except Exception:
+            db.session.rollback()
+            JOB_RUNS.inc(job=job_id, outcome="failed")
+            raise
+        finally:
+            seconds = perf_counter() - started
+            JOB_LAST_RUN.set(started_at.replace(tzinfo=timezone.utc).timestamp(), job=job_id)
+            JOB_LAST_DURATION.set(seconds, job=job_id)
+            record_run(job_id, holder, started_at, seconds, rows)
+            log.info("scheduler.job_run", job=job_id, rows=rows, seconds=round(seconds, 3))
+
+def _expire_policies(heartbeat):
+    rows = log_expiring_policies(heartbeat=heartbeat)
+    roll_forward(heartbeat=heartbeat)
+    return rows
+
+def _refresh_rollups(heartbeat):
+    return refresh_rollups(heartbeat=heartbeat)
+
+def policy_expiry_job(app=None):
+    """Run the expiry job if this worker holds (or can take) the lease; returns rows logged or None."""
+    return _run_leased(JOB_ID, app, _expire_policies)
+
+def monthly_rollup_job(app=None):
+    """Refresh the monthly rollups if this worker holds (or can take) the lease; returns months refreshed or None."""
+    return _run_leased(ROLLUP_JOB_ID, app, _refresh_rollups)
+
+def start_expiry_scheduler(app):
+    global _scheduler, _app
     settings = get_settings()
     if not settings.SCHEDULER_ENABLED or _scheduler:
         return
+    _app = app
     # Remove invalid timezone="local"
     _scheduler = BackgroundScheduler()
     interval = settings.EXPIRY_JOB_INTERVAL_MINUTES
-    _scheduler.add_job(
-        log_today_expiring_policies,
-        trigger=IntervalTrigger(minutes=interval),
-        id="policy_expiry_job",
-        max_instances=1,
-        coalesce=True,
-        replace_existing=True,
-        misfire_grace_time=120
-    )
+    for job, job_id, minutes in ((policy_expiry_job, JOB_ID, interval),
+                                 (monthly_rollup_job, ROLLUP_JOB_ID, settings.ROLLUP_JOB_INTERVAL_MINUTES)):
+        _scheduler.add_job(
+            job,
+            trigger=IntervalTrigger(minutes=minutes),
+            args=[app],
+            id=job_id,
+            max_instances=1,
+            coalesce=True,
+            replace_existing=True,
+            misfire_grace_time=120
+        )
     _scheduler.start()
-    log.info("scheduler.started", interval_minutes=interval)
+    log.info("scheduler.started", interval_minutes=interval,
+             rollup_interval_minutes=settings.ROLLUP_JOB_INTERVAL_MINUTES, holder=holder_id())
 
 def shutdown_expiry_scheduler():
     global _scheduler
     if _scheduler:
         _scheduler.shutdown(wait=False)
-        log.info("scheduler.stopped", job="policy_expiry_job")
-        _scheduler = None
\ No newline at end of file
+        _scheduler = None
+        for job_id in (JOB_ID, ROLLUP_JOB_ID):
+            try:
+                with _app.app_context():
+                    release(job_id, holder_id())
+            except Exception as exc:  # shutdown must not fail; the lease will expire on its own
+                log.warning("scheduler.release_failed", job=job_id, error=str(exc))
+            log.info("scheduler.stopped", job=job_id)
@@ -1,3 +1,4 @@
 from flask_sqlalchemy import SQLAlchemy
+from app.db.routing import RoutingSession
 
-datab = SQLAlchemy()
+datab = SQLAlchemy(session_options={"class_": RoutingSession})
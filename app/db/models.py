@@ -1,7 +1,19 @@
 """SQLAlchemy ORM models for the Car Insurance domain.
 
-Defines Owner, Car, InsurancePolicy, and Claim with relationships and indexes.
+Defines Owner, Car, InsurancePolicy, and Claim with relationships and indexes,
+plus SchedulerLease / JobWatermark for coordinating background jobs across workers,
+the CarCoverageSummary projection and the MonthlyRollup tables.
 Cascade rules on Car ensure dependent policies and claims are removed on delete.
+Car and InsurancePolicy carry ``version``/``updated_at`` for conditional GETs;
+``Car.history_version``/``history_updated_at`` version the car's policies and
+claims as a whole (see ``app.services.version_service``).
+
+A car's policies may not overlap. The database enforces it: on Postgres with the
+``ex_policy_car_period`` exclusion constraint (GiST over car_id and the
+inclusive date range), on SQLite with triggers that run under the database's
+single-writer lock and also check the car exists (SQLite does not enforce
+foreign keys by default). Both raise IntegrityError, which policies_service
+maps to ConflictError / NotFoundError.
 """
 from __future__ import annotations
 from app.db.base import datab as db
@@ -9,7 +21,8 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import List, Optional
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import Integer, String, Date, ForeignKey, Numeric, Text, DateTime, Index
+from sqlalchemy import Integer, String, Date, ForeignKey, Numeric, Text, DateTime, Index, Float, DDL, event, func, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 
 YEAR_MIN = 1900
 YEAR_MAX = 2100
@@ -37,11 +50,35 @@ class Car(db.Model):
     model: Mapped[Optional[str]] = mapped_column(String(120), nullable=True)
     year_of_manufacture: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     owner_id: Mapped[int] = mapped_column(ForeignKey("owner.id"), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.current_timestamp())
+    # Aggregate version of the car's policies and claims (history / validity responses)
+    history_version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    history_updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.current_timestamp())
 
     owner: Mapped["Owner"] = relationship(back_populates="cars")
     insurance_policies: Mapped[List["InsurancePolicy"]] = relationship(back_populates="car", cascade="all, delete-orphan")
     claims: Mapped[List["Claim"]] = relationship(back_populates="car", cascade="all, delete-orphan")
 
+POLICY_OVERLAP_CONSTRAINT = "ex_policy_car_period"
+POLICY_CAR_MISSING = "fk_policy_car"
+
+# SQLite stand-in for the exclusion constraint (and the car foreign key).
+SQLITE_POLICY_TRIGGERS = [
+    f"""
+    CREATE TRIGGER trg_policy_no_overlap_{op.lower()} BEFORE {op}{columns} ON insurance_policy
+    BEGIN
+        SELECT RAISE(ABORT, '{POLICY_CAR_MISSING}')
+        WHERE NOT EXISTS (SELECT 1 FROM car WHERE car.id = NEW.car_id);
+        SELECT RAISE(ABORT, '{POLICY_OVERLAP_CONSTRAINT}')
+        WHERE EXISTS (SELECT 1 FROM insurance_policy p
+                      WHERE p.car_id = NEW.car_id AND p.id IS NOT NEW.id
+                        AND p.start_date <= NEW.end_date AND p.end_date >= NEW.start_date);
+    END
+    """
+    for op, columns in (("INSERT", ""), ("UPDATE", " OF car_id, start_date, end_date"))
+]
+
 class InsurancePolicy(db.Model):
     """Insurance coverage period for a car (start/end inclusive)."""
     __tablename__ = "insurance_policy"
@@ -52,14 +89,32 @@ class InsurancePolicy(db.Model):
     end_date: Mapped[date] = mapped_column(Date, nullable=False, index=True)
     # Idempotent expiry logging (Task D)
     logged_expiry_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, server_default=func.current_timestamp())
 
     car: Mapped["Car"] = relationship(back_populates="insurance_policies")
 
     __table_args__ = (
         Index("ix_policy_car_start_end", "car_id", "start_date", "end_date"),
         Index("ix_policy_car_end", "car_id", "end_date"),
+        # Expiry catch-up scans unlogged policies by end date (see expiry_service)
+        Index("ix_policy_unlogged_end", "end_date", "id",
+              postgresql_where=text("logged_expiry_at IS NULL"), sqlite_where=text("logged_expiry_at IS NULL")),
+        # Policies written since the monthly rollup watermark
+        Index("ix_policy_updated_at", "updated_at"),
+        ExcludeConstraint(
+            ("car_id", "="),
+            (func.daterange(text("start_date"), text("end_date"), text("'[]'")), "&&"),
+            name=POLICY_OVERLAP_CONSTRAINT,
+            using="gist",
+        ).ddl_if(dialect="postgresql"),
     )
 
+# btree_gist provides the GiST "=" operator on car_id used by the exclusion constraint.
+event.listen(db.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"))
+for _trigger in SQLITE_POLICY_TRIGGERS:
+    event.listen(InsurancePolicy.__table__, "after_create", DDL(_trigger).execute_if(dialect="sqlite"))
+
 class Claim(db.Model):
     """Insurance claim filed against a car's active or past policy."""
     __tablename__ = "claim"
@@ -74,4 +129,67 @@ class Claim(db.Model):
 
     __table_args__ = (
         Index("ix_claim_car_claim_date", "car_id", "claim_date"),
-    )
\ No newline at end of file
+        # Covers date-bounded claim aggregates (GET /api/claims/stats) without heap reads
+        Index("ix_claim_date_car_amount", "claim_date", "car_id", "amount"),
+    )
+
+class CarCoverageSummary(db.Model):
+    """Per-car projection of coverage and claim totals (see app.services.coverage_summary_service).
+
+    The policy columns describe the car as of ``as_of``: the policy covering that
+    day (with its provider and end date) and ``next_gap``, the first uncovered
+    day after the chain of back-to-back policies (NULL when not insured).
+    """
+    __tablename__ = "car_coverage_summary"
+    car_id: Mapped[int] = mapped_column(ForeignKey("car.id", ondelete="CASCADE"), primary_key=True)
+    as_of: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    current_policy_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    provider: Mapped[Optional[str]] = mapped_column(String(120), nullable=True)
+    coverage_end: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    next_gap: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    claim_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    claim_total: Mapped[Decimal] = mapped_column(Numeric(14, 2), nullable=False, default=0, server_default="0")
+    last_claim_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class MonthlyRollup(db.Model):
+    """Insured car-days and claims per month x provider x make (see app.services.monthly_rollup_service).
+
+    ``month`` is the first day of the month. ``provider`` is '' for claims made
+    while no policy covered the car and ``make`` is '' for cars without one, so
+    both can be part of the primary key.
+    """
+    __tablename__ = "monthly_rollup"
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    provider: Mapped[str] = mapped_column(String(120), primary_key=True)
+    make: Mapped[str] = mapped_column(String(120), primary_key=True)
+    insured_car_days: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    claim_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    claim_total: Mapped[Decimal] = mapped_column(Numeric(16, 2), nullable=False, default=0, server_default="0")
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+
+class RollupRefreshQueue(db.Model):
+    """A month whose rollups the next refresh must recompute, queued by writes its watermark cannot see."""
+    __tablename__ = "rollup_refresh_queue"
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    month: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+
+class SchedulerLease(db.Model):
+    """Time-limited leadership lease for a scheduled job, with its last-run stats.
+
+    Exactly one worker holds an unexpired lease per job name; others skip the run.
+    """
+    __tablename__ = "scheduler_lease"
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(255), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    last_run_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_run_seconds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    last_run_rows: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+class JobWatermark(db.Model):
+    """Last date a background job has fully processed; the next run resumes after it."""
+    __tablename__ = "job_watermark"
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    watermark: Mapped[date] = mapped_column(Date, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
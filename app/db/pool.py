@@ -0,0 +1,100 @@
+"""Engine pool configuration and pool metrics.
+
+``engine_options`` turns the ``DB_*`` settings into ``SQLALCHEMY_ENGINE_OPTIONS``.
+Server databases get an ``InstrumentedQueuePool`` sized by ``DB_POOL_SIZE`` /
+``DB_MAX_OVERFLOW`` with ``DB_POOL_TIMEOUT``, ``DB_POOL_RECYCLE`` and pre-ping,
+plus a Postgres ``statement_timeout`` when ``DB_STATEMENT_TIMEOUT_MS`` is set.
+SQLite keeps Flask-SQLAlchemy's driver defaults (a static pool for in-memory
+databases) and only gets pre-ping. ``async_engine_options`` does the same for
+the async engine of the ASGI read path (``ASYNC_DB_*`` sizes, asyncpg's
+``server_settings`` for the statement timeout).
+
+``InstrumentedQueuePool`` times every checkout (waiting for a free connection,
+or opening a new one) and exposes connections in use, capacity and overflow,
+summed over all live pools of the process.
+"""
+import weakref
+from time import perf_counter
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.metrics import counter, gauge, histogram
+
+POOL_WAIT = histogram(
+    "db_pool_checkout_seconds", "Time to obtain a pooled connection (waiting or connecting)",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0),
+)
+POOL_TIMEOUTS = counter("db_pool_checkout_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT")
+POOL_CHECKED_OUT = gauge("db_pool_checked_out", "Pooled connections currently in use", multiprocess_mode="sum")
+POOL_SIZE = gauge("db_pool_size", "Configured persistent connections per pool", multiprocess_mode="sum")
+POOL_OVERFLOW = gauge("db_pool_overflow", "Connections open beyond the pool size", multiprocess_mode="sum")
+
+_pools = weakref.WeakSet()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool recording checkout latency and timeouts."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _pools.add(self)
+
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT.observe(perf_counter() - started)
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """The instrumented pool for asyncio engines."""
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def async_database_url(database_url: str) -> str:
+    """``database_url`` with its driver swapped for the asyncio one (asyncpg / aiosqlite)."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+def engine_options(settings, database_url: str) -> dict:
+    """SQLALCHEMY_ENGINE_OPTIONS for ``database_url`` from the DB_* settings."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+def async_engine_options(settings, database_url: str) -> dict:
+    """``create_async_engine`` options for ``database_url`` from the ASYNC_DB_* / DB_* settings."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.ASYNC_DB_POOL_SIZE,
+        max_overflow=settings.ASYNC_DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return options
+
+POOL_CHECKED_OUT.set_function(lambda: sum(p.checkedout() for p in list(_pools)))
+POOL_SIZE.set_function(lambda: sum(p.size() for p in list(_pools)))
+POOL_OVERFLOW.set_function(lambda: sum(max(p.overflow(), 0) for p in list(_pools)))
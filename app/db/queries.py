@@ -0,0 +1,17 @@
+"""Small helpers shared by services that can return ORM entities or column rows."""
+from sqlalchemy import select
+from app.db.base import datab as db
+
+def projection(model, columns=None):
+    """Start a SELECT of ``model`` entities, or of just ``columns`` when given."""
+    return select(*columns) if columns else select(model)
+
+def fetch_all(stmt, columns=None):
+    """Execute stmt; entities come back as scalars, projections as Row tuples."""
+    result = db.session.execute(stmt)
+    return result.all() if columns else result.scalars().all()
+
+def fetch_stream(stmt, batch_size: int, columns=None):
+    """Lazily yield results of stmt in yield_per batches (server-side cursor on Postgres)."""
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    yield from (result if columns else result.scalars())
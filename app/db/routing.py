@@ -0,0 +1,157 @@
+"""Read-replica routing for the Flask-SQLAlchemy session.
+
+With ``DATABASE_REPLICA_URLS`` set (comma-separated), ``GET``/``HEAD`` requests
+read from a replica; everything else -- other methods, background jobs, CLI
+commands, and any statement that writes -- uses the primary.
+
+- Replicas are picked round-robin once per request, on the first query, and
+  the request keeps that connection so it reads one consistent replica. A
+  replica that fails to connect, or whose connection errors, is ejected for
+  ``REPLICA_EJECT_SECONDS`` and the next one (ultimately the primary) is used.
+- Once a request flushes or executes a write, its remaining reads go to the
+  primary (read-after-write within a request).
+- A request that wrote returns ``X-Read-After`` and a ``db_read_after`` cookie
+  holding a Unix timestamp ``READ_YOUR_WRITES_SECONDS`` in the future; a
+  request presenting a later timestamp (cookie or header) reads from the
+  primary, so a client sees its own writes while replicas catch up. The window
+  should exceed the replicas' normal replication lag.
+"""
+import itertools
+import threading
+import time
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.sql.dml import UpdateBase
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.core.metrics import counter, gauge
+from app.db.pool import engine_options
+
+READ_AFTER_HEADER = "X-Read-After"
+READ_AFTER_COOKIE = "db_read_after"
+READ_METHODS = {"GET", "HEAD"}
+
+READS = counter("db_read_requests_total", "Requests that queried, by the database they read from", ("target",))
+EJECTIONS = counter("db_replica_ejections_total", "Replicas taken out of rotation after an error")
+HEALTHY = gauge("db_replicas_healthy", "Replicas currently in rotation")
+
+log = get_logger()
+
+class ReplicaSet:
+    """Round-robin over replica engines, skipping ones ejected after errors."""
+
+    def __init__(self, engines, eject_seconds: float):
+        self.engines = list(engines)
+        self.eject_seconds = eject_seconds
+        self._ejected_until = [0.0] * len(self.engines)
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        for engine in self.engines:
+            event.listen(engine, "handle_error", self._on_error)
+
+    def candidates(self):
+        """Healthy engines in round-robin order, starting after the previous pick."""
+        now = time.monotonic()
+        start = next(self._next)
+        n = len(self.engines)
+        order = [(start + i) % n for i in range(n)]
+        return [self.engines[i] for i in order if self._ejected_until[i] <= now]
+
+    def eject(self, engine):
+        """Take ``engine`` out of rotation (no-op while it is already ejected)."""
+        now = time.monotonic()
+        with self._lock:
+            i = self.engines.index(engine)
+            if self._ejected_until[i] > now:
+                return
+            self._ejected_until[i] = now + self.eject_seconds
+        EJECTIONS.inc()
+        log.warning("db.replica.ejected", replica=engine.url.render_as_string(hide_password=True),
+                    seconds=self.eject_seconds)
+
+    def healthy(self) -> int:
+        now = time.monotonic()
+        return sum(1 for until in self._ejected_until if until <= now)
+
+    def _on_error(self, context):
+        if context.is_disconnect or isinstance(context.sqlalchemy_exception, OperationalError):
+            self.eject(context.engine)
+
+_replicas: ReplicaSet | None = None
+
+def _is_write(clause) -> bool:
+    return isinstance(clause, UpdateBase)
+
+def _mark_write():
+    if has_request_context():
+        g.db_wrote = True
+
+def _read_after() -> float:
+    raw = request.headers.get(READ_AFTER_HEADER) or request.cookies.get(READ_AFTER_COOKIE)
+    try:
+        return float(raw) if raw else 0.0
+    except ValueError:
+        return 0.0
+
+def _replica_connection():
+    """This request's replica connection, connecting on first use; None means use the primary."""
+    if "replica_conn" in g:
+        return g.replica_conn
+    conn = None
+    if request.method in READ_METHODS and _read_after() <= time.time():
+        for engine in _replicas.candidates():
+            try:
+                conn = engine.connect()
+                break
+            except DBAPIError:
+                _replicas.eject(engine)
+    g.replica_conn = conn
+    READS.inc(target="replica" if conn is not None else "primary")
+    return conn
+
+class RoutingSession(Session):
+    """Session sending safe reads of GET/HEAD requests to a replica connection."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and _replicas is not None and has_request_context():
+            if self._flushing or _is_write(clause):
+                _mark_write()
+            elif not g.get("db_wrote"):
+                conn = _replica_connection()
+                if conn is not None:
+                    return conn
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    _mark_write()
+
+def init_replicas(app, db):
+    """Create replica engines from DATABASE_REPLICA_URLS and register the request hooks."""
+    global _replicas
+    settings = get_settings()
+    urls = [u.strip() for u in (settings.DATABASE_REPLICA_URLS or "").split(",") if u.strip()]
+    if not urls:
+        _replicas = None
+        return
+    _replicas = ReplicaSet([create_engine(u, **engine_options(settings, u)) for u in urls],
+                           settings.REPLICA_EJECT_SECONDS)
+    HEALTHY.set_function(lambda: _replicas.healthy() if _replicas is not None else 0)
+
+    @app.after_request
+    def _set_read_after(resp):
+        if g.get("db_wrote"):
+            until = f"{time.time() + settings.READ_YOUR_WRITES_SECONDS:.3f}"
+            resp.headers[READ_AFTER_HEADER] = until
+            resp.set_cookie(READ_AFTER_COOKIE, until, max_age=int(settings.READ_YOUR_WRITES_SECONDS) + 1,
+                            httponly=True, samesite="Lax")
+        return resp
+
+    @app.teardown_request
+    def _release_replica(exc=None):
+        conn = g.pop("replica_conn", None)
+        if conn is not None:
+            db.session.remove()
+            conn.close()
@@ -2,51 +2,71 @@ from flask import Flask
 from flask_smorest import Api
 from flask_migrate import Migrate
 from app.db.base import datab as db
+from app.db.routing import init_replicas
 from app.core.logging import setup_logging, get_logger
 from app.core.request_id import init_request_id
+from app.core.instrumentation import init_instrumentation
+from app.core.profiling import init_profiling
 from app.core.config import get_settings, apply_flask_config
 from app.core.scheduling import start_expiry_scheduler, shutdown_expiry_scheduler
 from app.api.errors import register_error_handlers
-import os
+from app.cli import register_cli
+import atexit
 from sqlalchemy import inspect
 
 from app.api.routers.health import health_bp
+from app.api.routers.metrics import metrics_bp
 from app.api.routers.cars import bp as cars_bp
 from app.api.routers.owner import owner_bp
 from app.api.routers.policies import policies_bp
 from app.api.routers.claims import claims_bp
 from app.api.routers.history import history_bp
 from app.api.routers.insuranceValidation import insurance_validation_bp
+from app.api.routers.coverage_summary import coverage_summary_bp
+from app.api.routers.rollups import rollups_bp
+from app.api.routers.bulk_import import bulk_import_bp
+from app.api.routers.scheduler import scheduler_bp
 
-def create_app(db_url=None):
+def create_app(db_url=None, start_scheduler=False):
+    """Build the Flask app.
+
+    Only server processes pass ``start_scheduler=True`` (gunicorn via
+    entrypoint.sh; the ASGI app starts it on lifespan startup), so CLI commands,
+    migrations and benchmarks never compete for the job leases.
+    """
     setup_logging()
     logger = get_logger()
     settings = get_settings()
 
     app = Flask(__name__)
-    apply_flask_config(app, settings)
-    if db_url:
-        app.config['SQLALCHEMY_DATABASE_URI'] = db_url
+    apply_flask_config(app, settings, db_url)
     db.init_app(app)
+    init_replicas(app, db)
     Migrate(app, db)
     register_error_handlers(app)
     init_request_id(app, logger)
+    init_instrumentation(app)
+    init_profiling(app)
 
     api = Api(app)
     api.register_blueprint(health_bp)
+    api.register_blueprint(metrics_bp)
     api.register_blueprint(cars_bp)
     api.register_blueprint(owner_bp)
     api.register_blueprint(policies_bp)
     api.register_blueprint(claims_bp)
     api.register_blueprint(history_bp)
     api.register_blueprint(insurance_validation_bp)
+    api.register_blueprint(coverage_summary_bp)
+    api.register_blueprint(rollups_bp)
+    api.register_blueprint(bulk_import_bp)
+    api.register_blueprint(scheduler_bp)
+    register_cli(app)
 
-    if settings.SCHEDULER_ENABLED and os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-        start_expiry_scheduler()
-
-    @app.teardown_appcontext
-    def _shutdown(_exc=None):
-        shutdown_expiry_scheduler()
+    if start_scheduler and settings.SCHEDULER_ENABLED:
+        # Every server worker schedules the job; the DB lease lets only one of them run it.
+        start_expiry_scheduler(app)
+        atexit.register(shutdown_expiry_scheduler)
 
     logger.info("app.started", env=settings.APP_ENV)
     return app
\ No newline at end of file
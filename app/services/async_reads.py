@@ -0,0 +1,67 @@
+"""Async counterparts of the hot read services, for the ASGI serving mode (``app.asgi``).
+
+Each function takes an ``AsyncConnection`` of the async engine and runs core
+SELECTs over the same models (history reuses ``history_service._timeline``).
+The synchronous services stay in use for the WSGI app, writes, the CLI and
+background jobs.
+
+Lookups select the row's version columns together with its data, so one
+round-trip both answers a conditional request and feeds the response.
+"""
+from datetime import date
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from app.core.logging import get_logger
+from app.db.models import Car, InsurancePolicy, Owner
+from app.services.history_service import _timeline
+
+log = get_logger()
+
+async def car_history_version(conn: AsyncConnection, car_id: int):
+    """(history_version, history_updated_at) of a car, or None if it does not exist."""
+    result = await conn.execute(select(Car.history_version, Car.history_updated_at).where(Car.id == car_id))
+    return result.first()
+
+async def validity(conn: AsyncConnection, car_id: int, target_date: date):
+    """(history_version, history_updated_at, policy_id) for a car on ``target_date``, or None if unknown.
+
+    ``policy_id`` is the covering policy, None when the car is not insured that day.
+    """
+    covering = (select(InsurancePolicy.id)
+                .where(InsurancePolicy.car_id == car_id,
+                       InsurancePolicy.start_date <= target_date,
+                       InsurancePolicy.end_date >= target_date)
+                .limit(1)
+                .scalar_subquery())
+    result = await conn.execute(
+        select(Car.history_version, Car.history_updated_at, covering.label("policy_id")).where(Car.id == car_id)
+    )
+    row = result.first()
+    if row is not None:
+        log.info("insurance.check", car_id=car_id, date=target_date.isoformat(),
+                 valid=row.policy_id is not None, policy_id=row.policy_id)
+    return row
+
+async def history_rows(conn: AsyncConnection, car_id: int, after=None, limit: int | None = None,
+                       date_from: date | None = None, date_to: date | None = None):
+    """Timeline rows of a car (same shape as ``history_service.history_rows``); no existence check."""
+    stmt = _timeline(car_id, after, date_from, date_to)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return (await conn.execute(stmt)).all()
+
+async def car_item(conn: AsyncConnection, car_id: int, columns):
+    """(version, updated_at, *columns) of a car joined to its owner, or None if it does not exist."""
+    result = await conn.execute(
+        select(Car.version, Car.updated_at, *columns)
+        .join_from(Car, Owner, Car.owner_id == Owner.id)
+        .where(Car.id == car_id)
+    )
+    return result.first()
+
+async def policy_item(conn: AsyncConnection, policy_id: int, columns):
+    """(version, updated_at, *columns) of a policy, or None if it does not exist."""
+    result = await conn.execute(
+        select(InsurancePolicy.version, InsurancePolicy.updated_at, *columns).where(InsurancePolicy.id == policy_id)
+    )
+    return result.first()
@@ -0,0 +1,258 @@
+"""Bulk ingest of owners, cars, policies and claims from NDJSON.
+
+Each non-blank input line is one JSON object with a ``type`` (``owner``,
+``car``, ``policy`` or ``claim``) plus the fields the single-record endpoints
+accept, validated with the same ``*Create`` schemas. Two extras make a file
+self-contained:
+
+- an owner may carry a ``ref``; cars may then give ``ownerRef`` instead of ``ownerId``;
+- policies and claims may give the car's ``vin`` instead of ``carId``.
+
+Lines are processed in batches of ``BULK_IMPORT_BATCH_SIZE``. Within a batch
+records are loaded owners -> cars -> policies -> claims, existence, VIN
+uniqueness and policy overlap are checked with one query per check for the
+whole batch, and each table gets a single multi-row ``INSERT``. A batch is one
+transaction; a record that fails validation or a rule is reported with its
+line number and skipped, the rest of the load carries on.
+"""
+import json
+from collections import defaultdict
+from itertools import islice
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from app.db.base import datab as db
+from app.db.models import Owner, Car, InsurancePolicy, Claim
+from app.api.schemas import OwnerCreate, CarCreate, PolicyCreate, ClaimCreate
+from app.core.config import get_settings
+from app.core.logging import get_logger
+from app.services.coverage_index import invalidate_car
+from app.services.version_service import touch_car_history
+from app.services import coverage_summary_service
+from app.services.response_cache import invalidate_car_responses
+
+RECORD_TYPES = ("owner", "car", "policy", "claim")
+
+class ImportReport:
+    """Running totals and per-line errors for one bulk import."""
+
+    def __init__(self, max_errors: int):
+        self.processed = 0
+        self.inserted = {"owners": 0, "cars": 0, "policies": 0, "claims": 0}
+        self.errors = []
+        self.error_count = 0
+        self._max_errors = max_errors
+
+    def error(self, line: int, kind: str | None, message: str, detail=None):
+        self.error_count += 1
+        if len(self.errors) < self._max_errors:
+            entry = {"line": line, "type": kind, "detail": message}
+            if detail:
+                entry["errors"] = detail
+            self.errors.append(entry)
+
+    def as_dict(self) -> dict:
+        return {
+            "processed": self.processed,
+            "inserted": self.inserted,
+            "errorCount": self.error_count,
+            "errors": self.errors,
+        }
+
+class _Batch:
+    """Records of one batch grouped by type, plus what was accepted so far."""
+
+    def __init__(self, report: ImportReport, refs: dict):
+        self.report = report
+        self.refs = refs
+        self.new_refs = {}
+        self.groups = defaultdict(list)
+        self.accepted = []
+        self.counts = defaultdict(int)
+        self.touched_cars = set()      # policies added (coverage index)
+        self.history_cars = set()      # policies or claims added (history version)
+
+    def validate(self, schema, line: int, kind: str, record: dict):
+        try:
+            return schema.model_validate(record)
+        except ValidationError as ve:
+            self.report.error(line, kind, "Validation failed", ve.errors(include_url=False, include_context=False))
+            return None
+
+    def accept(self, line: int, kind: str):
+        self.accepted.append((line, kind))
+
+def _parse(batch: _Batch, lines):
+    for line_no, raw in lines:
+        try:
+            record = json.loads(raw)
+        except ValueError:
+            batch.report.error(line_no, None, "Invalid JSON")
+            continue
+        kind = record.get("type") if isinstance(record, dict) else None
+        if kind not in RECORD_TYPES:
+            batch.report.error(line_no, None, f"type must be one of: {', '.join(RECORD_TYPES)}")
+            continue
+        batch.groups[kind].append((line_no, record))
+
+def _load_owners(batch: _Batch):
+    rows, refs = [], []
+    for line_no, record in batch.groups["owner"]:
+        ref = record.get("ref")
+        if ref is not None and (ref in batch.refs or ref in batch.new_refs):
+            batch.report.error(line_no, "owner", f"Duplicate ref {ref!r}")
+            continue
+        body = batch.validate(OwnerCreate, line_no, "owner", record)
+        if body is None:
+            continue
+        if ref is not None:
+            batch.new_refs[ref] = None
+        rows.append(body.model_dump())
+        refs.append(ref)
+        batch.accept(line_no, "owner")
+    if not rows:
+        return
+    ids = db.session.scalars(insert(Owner).returning(Owner.id, sort_by_parameter_order=True), rows).all()
+    for ref, owner_id in zip(refs, ids):
+        if ref is not None:
+            batch.new_refs[ref] = owner_id
+    batch.counts["owners"] = len(rows)
+
+def _load_cars(batch: _Batch):
+    candidates = []
+    for line_no, record in batch.groups["car"]:
+        if record.get("ownerId") is None and record.get("owner_id") is None and "ownerRef" in record:
+            ref = record["ownerRef"]
+            owner_id = batch.new_refs.get(ref, batch.refs.get(ref))
+            if owner_id is None:
+                batch.report.error(line_no, "car", f"Unknown ownerRef {ref!r}")
+                continue
+            record = {**record, "ownerId": owner_id}
+        body = batch.validate(CarCreate, line_no, "car", record)
+        if body is not None:
+            candidates.append((line_no, body))
+    if not candidates:
+        return
+    owner_ids = {b.owner_id for _, b in candidates}
+    known_owners = set(db.session.scalars(select(Owner.id).where(Owner.id.in_(owner_ids))))
+    taken = set(db.session.scalars(select(Car.vin).where(Car.vin.in_({b.vin for _, b in candidates}))))
+    rows = []
+    for line_no, body in candidates:
+        if body.owner_id not in known_owners:
+            batch.report.error(line_no, "car", "Owner not found")
+        elif body.vin in taken:
+            batch.report.error(line_no, "car", "VIN already exists")
+        else:
+            taken.add(body.vin)
+            rows.append(body.model_dump())
+            batch.accept(line_no, "car")
+    if rows:
+        db.session.execute(insert(Car), rows)
+        batch.counts["cars"] = len(rows)
+
+def _validated_with_car(batch: _Batch, kind: str, schema):
+    """Resolve ``vin`` references, validate, and drop records whose car does not exist."""
+    items = batch.groups[kind]
+    by_vin = {r["vin"] for _, r in items if r.get("carId") is None and r.get("car_id") is None and r.get("vin")}
+    vin_ids = dict(db.session.execute(select(Car.vin, Car.id).where(Car.vin.in_(by_vin))).all()) if by_vin else {}
+    candidates = []
+    for line_no, record in items:
+        if record.get("carId") is None and record.get("car_id") is None and record.get("vin"):
+            car_id = vin_ids.get(record["vin"])
+            if car_id is None:
+                batch.report.error(line_no, kind, "Car not found")
+                continue
+            record = {**record, "carId": car_id}
+        body = batch.validate(schema, line_no, kind, record)
+        if body is not None:
+            candidates.append((line_no, body))
+    if not candidates:
+        return []
+    known = set(db.session.scalars(select(Car.id).where(Car.id.in_({b.carId for _, b in candidates}))))
+    found = []
+    for line_no, body in candidates:
+        if body.carId in known:
+            found.append((line_no, body))
+        else:
+            batch.report.error(line_no, kind, "Car not found")
+    return found
+
+def _load_policies(batch: _Batch):
+    candidates = _validated_with_car(batch, "policy", PolicyCreate)
+    if not candidates:
+        return
+    # One range query for every car in the batch, then an in-memory sweep that
+    # also catches overlaps between records of the same file.
+    intervals = defaultdict(list)
+    existing = db.session.execute(
+        select(InsurancePolicy.car_id, InsurancePolicy.start_date, InsurancePolicy.end_date).where(
+            InsurancePolicy.car_id.in_({b.carId for _, b in candidates}),
+            InsurancePolicy.start_date <= max(b.endDate for _, b in candidates),
+            InsurancePolicy.end_date >= min(b.startDate for _, b in candidates),
+        )
+    )
+    for car_id, start, end in existing:
+        intervals[car_id].append((start, end))
+    rows = []
+    for line_no, body in candidates:
+        taken = intervals[body.carId]
+        if any(start <= body.endDate and end >= body.startDate for start, end in taken):
+            batch.report.error(line_no, "policy", "Policy dates overlap existing policy")
+            continue
+        taken.append((body.startDate, body.endDate))
+        rows.append({"provider": body.provider, "start_date": body.startDate, "end_date": body.endDate, "car_id": body.carId})
+        batch.touched_cars.add(body.carId)
+        batch.accept(line_no, "policy")
+    if rows:
+        db.session.execute(insert(InsurancePolicy), rows)
+        batch.counts["policies"] = len(rows)
+
+def _load_claims(batch: _Batch):
+    rows = []
+    for line_no, body in _validated_with_car(batch, "claim", ClaimCreate):
+        rows.append({"claim_date": body.claimDate, "description": body.description, "amount": body.amount, "car_id": body.carId})
+        batch.history_cars.add(body.carId)
+        batch.accept(line_no, "claim")
+    if rows:
+        db.session.execute(insert(Claim), rows)
+        batch.counts["claims"] = len(rows)
+
+def _import_batch(lines, report: ImportReport, refs: dict):
+    batch = _Batch(report, refs)
+    _parse(batch, lines)
+    try:
+        _load_owners(batch)
+        _load_cars(batch)
+        _load_policies(batch)
+        _load_claims(batch)
+        history_cars = batch.history_cars | batch.touched_cars
+        if history_cars:
+            touch_car_history(*history_cars)
+            coverage_summary_service.refresh_cars(*history_cars)
+        db.session.commit()
+    except SQLAlchemyError as exc:
+        db.session.rollback()
+        reason = str(getattr(exc, "orig", None) or exc)
+        for line_no, kind in batch.accepted:
+            report.error(line_no, kind, "Batch rejected by database", reason)
+        get_logger().warning("bulk_import.batch_failed", first_line=lines[0][0], error=reason)
+        return
+    refs.update(batch.new_refs)
+    for key, n in batch.counts.items():
+        report.inserted[key] += n
+    for car_id in batch.touched_cars:
+        invalidate_car(car_id)
+    invalidate_car_responses(*history_cars)
+
+def import_lines(lines, batch_size: int | None = None) -> dict:
+    """Import NDJSON ``lines`` (str or bytes) and return a summary with per-line errors."""
+    settings = get_settings()
+    batch_size = batch_size or settings.BULK_IMPORT_BATCH_SIZE
+    report = ImportReport(settings.BULK_IMPORT_MAX_ERRORS)
+    refs = {}
+    numbered = ((n, line) for n, line in enumerate(lines, start=1) if line.strip())
+    while batch := list(islice(numbered, batch_size)):
+        report.processed += len(batch)
+        _import_batch(batch, report, refs)
+    get_logger().info("bulk_import.done", processed=report.processed, errors=report.error_count, **report.inserted)
+    return report.as_dict()
@@ -2,10 +2,44 @@ from app.db.base import datab as db
 from app.db.models import Car, Owner
 from app.api.errors import NotFoundError, ConflictError
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
+from app.services.coverage_index import invalidate_car
+from app.services.version_service import bump
+from app.services.response_cache import invalidate_car_responses
+from app.services import coverage_summary_service, monthly_rollup_service
+from app.core.config import get_settings
+from app.db.queries import projection, fetch_all, fetch_stream
 
-def list_cars():
-    """Return all cars (no pagination yet)."""
-    return Car.query.all()
+def _cars_stmt(after_id, include_owner, columns):
+    stmt = projection(Car, columns).order_by(Car.id)
+    if include_owner:
+        # Projections join owner for its columns; entities get it eager-loaded.
+        stmt = stmt.join(Car.owner) if columns else stmt.options(joinedload(Car.owner, innerjoin=True))
+    if after_id is not None:
+        stmt = stmt.where(Car.id > after_id)
+    return stmt
+
+def list_cars(after_id: int | None = None, limit: int | None = None, include_owner: bool = False, columns=None):
+    """Return cars ordered by id; keyset-paginated when after_id/limit are given.
+
+    include_owner fetches each car's owner in the same SELECT (inner join) so
+    serializing the owner does not issue one lazy load per row. With columns,
+    Row tuples of just those columns (Car and, if joined, Owner) are returned.
+    """
+    stmt = _cars_stmt(after_id, include_owner, columns)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return fetch_all(stmt, columns)
+
+def iter_cars(after_id: int | None = None, include_owner: bool = False, batch_size: int | None = None, columns=None):
+    """Yield cars ordered by id, fetched batch_size rows at a time.
+
+    Uses yield_per (a server-side cursor on Postgres) so full-table exports
+    keep memory flat; intended for streaming responses. The query runs on
+    first iteration, i.e. inside the streaming context.
+    """
+    stmt = _cars_stmt(after_id, include_owner, columns)
+    return fetch_stream(stmt, batch_size or get_settings().STREAM_BATCH_SIZE, columns)
 
 def create_car(data: dict):
     """Create a new car ensuring the referenced owner exists.
@@ -32,9 +66,10 @@ def create_car(data: dict):
         raise ConflictError("VIN already exists")
     return car
 
-def get_car(car_id):
-    """Fetch a car by id or raise NotFoundError."""
-    car = db.session.get(Car, car_id)
+def get_car(car_id, include_owner: bool = False):
+    """Fetch a car by id or raise NotFoundError; include_owner joins the owner in the same query."""
+    options = [joinedload(Car.owner, innerjoin=True)] if include_owner else None
+    car = db.session.get(Car, car_id, options=options)
     if not car:
         raise NotFoundError("Car not found")
     return car
@@ -42,14 +77,21 @@ def get_car(car_id):
 def update_car(car_id, **fields):
     """Update provided (non-None) fields of a car."""
     car = get_car(car_id)
+    if fields.get("make") is not None and fields["make"] != car.make:
+        monthly_rollup_service.queue_car(car_id)
     for k, v in fields.items():
         if v is not None:
             setattr(car, k, v)
+    bump(car)
     db.session.commit()
     return car
 
 def delete_car(car_id):
     """Delete a car and cascade related policies/claims due to model relationship settings."""
     car = get_car(car_id)
+    coverage_summary_service.delete_for_car(car_id)
+    monthly_rollup_service.queue_car(car_id)
     db.session.delete(car)
-    db.session.commit()
\ No newline at end of file
+    db.session.commit()
+    invalidate_car(car_id)
+    invalidate_car_responses(car_id)
\ No newline at end of file
@@ -1,10 +1,30 @@
 from app.db.base import datab as db
 from app.db.models import Claim, Car
 from app.api.errors import NotFoundError
+from app.core.config import get_settings
+from app.db.queries import projection, fetch_all, fetch_stream
+from app.services.version_service import touch_car_history
+from app.services.response_cache import invalidate_car_responses
+from app.services import coverage_summary_service, monthly_rollup_service
 
-def list_claims():
-    """Return all claims (unfiltered)."""
-    return Claim.query.all()
+def list_claims(after_id: int | None = None, limit: int | None = None, columns=None):
+    """Return claims ordered by id; keyset-paginated when after_id/limit are given.
+
+    With columns, only those columns are selected and Row tuples are returned.
+    """
+    stmt = projection(Claim, columns).order_by(Claim.id)
+    if after_id is not None:
+        stmt = stmt.where(Claim.id > after_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return fetch_all(stmt, columns)
+
+def iter_claims(after_id: int | None = None, batch_size: int | None = None, columns=None):
+    """Yield claims (or column rows) ordered by id in yield_per batches (streamed exports)."""
+    stmt = projection(Claim, columns).order_by(Claim.id)
+    if after_id is not None:
+        stmt = stmt.where(Claim.id > after_id)
+    return fetch_stream(stmt, batch_size or get_settings().STREAM_BATCH_SIZE, columns)
 
 def create_claim(claim_date, description, amount, car_id):
     """Validate car existence and persist a new claim."""
@@ -13,7 +33,10 @@ def create_claim(claim_date, description, amount, car_id):
         raise NotFoundError("Car not found")
     c = Claim(claim_date=claim_date, description=description, amount=amount, car_id=car_id)
     db.session.add(c)
+    touch_car_history(car_id)
+    coverage_summary_service.claim_added(car_id, claim_date, amount)
     db.session.commit()
+    invalidate_car_responses(car_id)
     return c
 
 def get_claim(claim_id: int):
@@ -27,11 +50,16 @@ def delete_claim(claim_id: int):
     """Delete a claim by id."""
     c = get_claim(claim_id)
     db.session.delete(c)
+    car_id, amount = c.car_id, c.amount
+    touch_car_history(car_id)
+    coverage_summary_service.claim_removed(car_id, amount)
+    monthly_rollup_service.queue_months(c.claim_date)
     db.session.commit()
+    invalidate_car_responses(car_id)
 
-def get_claims_for_car(car_id: int):
-    """Return all claims for a given car id."""
+def get_claims_for_car(car_id: int, columns=None):
+    """Return all claims for a given car id (Row tuples of columns when given)."""
     car = db.session.get(Car, car_id)
     if not car:
         raise NotFoundError("Car not found")
-    return Claim.query.filter_by(car_id=car_id).all()
\ No newline at end of file
+    return fetch_all(projection(Claim, columns).where(Claim.car_id == car_id).order_by(Claim.id), columns)
\ No newline at end of file
@@ -0,0 +1,105 @@
+"""Claim analytics computed in SQL (GET /api/claims/stats).
+
+Claims within an optional claim-date range are grouped by any combination of
+``car``, ``owner``, ``make``, ``model`` (make and model), ``provider`` (of the
+policy covering the claim date; null for uninsured claims -- policies never
+overlap, so a claim joins at most one) and ``month`` (``YYYY-MM``). Each group
+reports count, sum, average and the p50 / p95 amount.
+
+Percentiles are nearest-rank (``percentile_disc``): Postgres computes them with
+ordered-set aggregates, other databases pick the same ranks from
+``ROW_NUMBER``/``COUNT`` windows. Date-bounded scans read
+``ix_claim_date_car_amount`` (claim_date, car_id, amount), which covers the
+claim side of every grouping; ``owner``/``make``/``model`` join car by primary
+key and ``provider`` probes ``ix_policy_car_start_end``.
+"""
+from datetime import date
+from decimal import ROUND_HALF_UP, Decimal
+from sqlalchemy import and_, case, func, select
+from app.db.base import datab as db
+from app.db.models import Car, Claim, InsurancePolicy
+
+PERCENTILES = (("p50", 50), ("p95", 95))  # whole percents
+CENTS = Decimal("0.01")
+
+def _dimensions(dialect: str) -> dict:
+    if dialect == "postgresql":
+        month = func.to_char(Claim.claim_date, "YYYY-MM")
+    else:
+        month = func.strftime("%Y-%m", Claim.claim_date)
+    return {
+        "car": [Claim.car_id.label("carId")],
+        "owner": [Car.owner_id.label("ownerId")],
+        "make": [Car.make.label("make")],
+        "model": [Car.make.label("make"), Car.model.label("model")],
+        "provider": [InsurancePolicy.provider.label("provider")],
+        "month": [month.label("month")],
+    }
+
+def _source(group_by):
+    src = Claim.__table__
+    if {"owner", "make", "model"} & set(group_by):
+        src = src.join(Car, Car.id == Claim.car_id)
+    if "provider" in group_by:
+        src = src.outerjoin(InsurancePolicy, and_(
+            InsurancePolicy.car_id == Claim.car_id,
+            InsurancePolicy.start_date <= Claim.claim_date,
+            InsurancePolicy.end_date >= Claim.claim_date,
+        ))
+    return src
+
+def _ordered_set_stmt(keys, src, where):
+    amount = Claim.amount
+    return (select(*keys, func.count().label("count"), func.sum(amount).label("sum"), func.avg(amount).label("avg"),
+                   *(func.percentile_disc(pct / 100).within_group(amount).label(name) for name, pct in PERCENTILES))
+            .select_from(src).where(*where).group_by(*keys))
+
+def _window_stmt(keys, src, where):
+    partition = keys or None
+    ranked = (select(*keys, Claim.amount.label("amount"),
+                     func.row_number().over(partition_by=partition, order_by=Claim.amount).label("rn"),
+                     func.count().over(partition_by=partition).label("n"))
+              .select_from(src).where(*where).subquery("ranked"))
+    group_keys = [ranked.c[k.name] for k in keys]
+
+    def nearest_rank(pct: int):
+        # ceil(n * pct / 100) with integer arithmetic only
+        rank = (ranked.c.n * pct + 99) // 100
+        return func.max(case((ranked.c.rn == rank, ranked.c.amount)))
+
+    return (select(*group_keys, func.count().label("count"), func.sum(ranked.c.amount).label("sum"),
+                   func.avg(ranked.c.amount).label("avg"),
+                   *(nearest_rank(pct).label(name) for name, pct in PERCENTILES))
+            .group_by(*group_keys))
+
+def _money(value):
+    return None if value is None else Decimal(str(value)).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+def claim_stats(group_by: list[str], date_from: date | None = None, date_to: date | None = None,
+                max_groups: int = 1000):
+    """Aggregate claims per group; returns (groups ordered by key, truncated flag).
+
+    Each group is a dict of its key fields plus count, sum, avg, p50 and p95.
+    """
+    dialect = db.engine.dialect.name
+    dimensions = _dimensions(dialect)
+    keys = list({c.name: c for dim in group_by for c in dimensions[dim]}.values())
+    where = []
+    if date_from:
+        where.append(Claim.claim_date >= date_from)
+    if date_to:
+        where.append(Claim.claim_date <= date_to)
+    build = _ordered_set_stmt if dialect == "postgresql" else _window_stmt
+    stmt = build(keys, _source(group_by), where)
+    names = [k.name for k in keys]
+    stmt = stmt.order_by(*(stmt.selected_columns[n] for n in names)).limit(max_groups + 1)
+    rows = db.session.execute(stmt).all()
+    groups = []
+    for row in rows[:max_groups]:
+        if not row.count:
+            continue  # ungrouped totals over no claims
+        group = {n: getattr(row, n) for n in names}
+        group.update(count=row.count, sum=_money(row.sum), avg=_money(row.avg),
+                     **{name: _money(getattr(row, name)) for name, _ in PERCENTILES})
+        groups.append(group)
+    return groups, len(rows) > max_groups
@@ -0,0 +1,213 @@
+"""Optional per-process interval index answering "is car X covered on day D".
+
+When COVERAGE_INDEX_ENABLED is set, each car's policies are cached as three
+parallel arrays sorted by start date (starts, ends, policy ids). A car's
+policies never overlap, so ends are sorted too and a single bisect answers
+both validity lookups and overlap checks without a database round-trip.
+
+Entries are warmed lazily with one query per car (which also proves the car
+exists and records its ``history_version``), evicted LRU beyond COVERAGE_INDEX_MAX_CARS and expire after
+COVERAGE_INDEX_TTL_SECONDS. Writes through policies_service / car_service
+update or invalidate the affected car. A load runs outside the lock, so a
+write landing while a car is being loaded bumps that car's load generation and
+the (possibly pre-write) result is not stored. The index is per process:
+writes made by another worker become visible here only after the TTL elapses,
+unless the caller passes the car's current ``history_version`` (as the
+validity route does for conditional requests): an entry older than that is
+reloaded. Responses are tagged with the version an entry was loaded at
+(``validity``), never one newer than the data they were built from.
+"""
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date
+from sqlalchemy import select
+from app.db.base import datab as db
+from app.db.models import Car, InsurancePolicy
+from app.core.config import get_settings
+from app.core.metrics import counter, gauge
+
+HITS = counter("coverage_index_hits_total", "Coverage index lookups served from memory")
+MISSES = counter("coverage_index_misses_total", "Coverage index lookups that loaded the car from the database")
+CARS = gauge("coverage_index_cars", "Cars currently cached in the coverage index")
+INTERVALS = gauge("coverage_index_intervals", "Policy intervals currently cached in the coverage index")
+
+class _CarIntervals:
+    __slots__ = ("loaded_at", "history_version", "history_updated_at", "starts", "ends", "ids")
+
+    def __init__(self, loaded_at: float, history_version: int, history_updated_at):
+        self.loaded_at = loaded_at
+        self.history_version = history_version
+        self.history_updated_at = history_updated_at
+        self.starts: list[date] = []
+        self.ends: list[date] = []
+        self.ids: list[int] = []
+
+class CoverageIndex:
+    """car_id -> sorted (start, end, policy_id) arrays with bisect lookups."""
+
+    def __init__(self, ttl_seconds: float, max_cars: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_cars = max_cars
+        self._cars: OrderedDict[int, _CarIntervals] = OrderedDict()
+        # car_id -> [generation, loaders] for cars being loaded; writes bump the generation
+        self._loading: dict[int, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, car_id: int) -> _CarIntervals | None:
+        stmt = (select(Car.history_version, Car.history_updated_at,
+                       InsurancePolicy.start_date, InsurancePolicy.end_date, InsurancePolicy.id)
+                .outerjoin(InsurancePolicy, InsurancePolicy.car_id == Car.id)
+                .where(Car.id == car_id)
+                .order_by(InsurancePolicy.start_date))
+        rows = db.session.execute(stmt).all()
+        if not rows:
+            return None
+        entry = _CarIntervals(time.monotonic(), rows[0].history_version, rows[0].history_updated_at)
+        for _, _, start, end, policy_id in rows:
+            if policy_id is not None:
+                entry.starts.append(start)
+                entry.ends.append(end)
+                entry.ids.append(policy_id)
+        return entry
+
+    def _entry(self, car_id: int, history_version: int | None = None) -> _CarIntervals | None:
+        """Return the cached intervals for car_id, loading them on a miss; None if the car does not exist.
+
+        An entry loaded before ``history_version`` (when given) counts as a miss.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cars.get(car_id)
+            if (entry is not None and now - entry.loaded_at < self.ttl_seconds
+                    and (history_version is None or entry.history_version >= history_version)):
+                self._cars.move_to_end(car_id)
+                HITS.inc()
+                return entry
+        MISSES.inc()
+        with self._lock:
+            pending = self._loading.setdefault(car_id, [0, 0])
+            pending[1] += 1
+            generation = pending[0]
+        entry = None
+        try:
+            entry = self._load(car_id)
+        finally:
+            with self._lock:
+                pending = self._loading[car_id]
+                pending[1] -= 1
+                if not pending[1]:
+                    del self._loading[car_id]
+                # Only cache the load if no write to the car happened while it ran
+                if entry is not None and pending[0] == generation:
+                    self._cars[car_id] = entry
+                    self._cars.move_to_end(car_id)
+                    while len(self._cars) > self.max_cars:
+                        self._cars.popitem(last=False)
+        return entry
+
+    def _written(self, car_id: int):
+        """Mark loads of car_id in flight as stale; called with the lock held."""
+        pending = self._loading.get(car_id)
+        if pending is not None:
+            pending[0] += 1
+
+    @staticmethod
+    def _covering(entry: _CarIntervals, day: date) -> int | None:
+        i = bisect_right(entry.starts, day) - 1
+        if i >= 0 and entry.ends[i] >= day:
+            return entry.ids[i]
+        return None
+
+    def covering_policy(self, car_id: int, day: date, history_version: int | None = None):
+        """Return (car_exists, policy_id covering day or None), as of at least ``history_version``."""
+        entry = self._entry(car_id, history_version)
+        if entry is None:
+            return False, None
+        return True, self._covering(entry, day)
+
+    def validity(self, car_id: int, day: date, history_version: int | None = None):
+        """(history_version, history_updated_at, covering policy_id or None) of the entry answering, or None if unknown.
+
+        The version is the one the entry was loaded at; policies added since by
+        this process make the data newer than it, never older.
+        """
+        entry = self._entry(car_id, history_version)
+        if entry is None:
+            return None
+        return entry.history_version, entry.history_updated_at, self._covering(entry, day)
+
+    def overlapping_policy(self, car_id: int, start: date, end: date, exclude_id: int | None = None):
+        """Return (car_exists, id of a policy overlapping [start, end] other than exclude_id, or None)."""
+        entry = self._entry(car_id)
+        if entry is None:
+            return False, None
+        i = bisect_right(entry.starts, end) - 1
+        while i >= 0 and entry.ends[i] >= start:
+            if entry.ids[i] != exclude_id:
+                return True, entry.ids[i]
+            i -= 1
+        return True, None
+
+    def add(self, car_id: int, start: date, end: date, policy_id: int):
+        """Insert a newly committed policy if the car is cached (otherwise the next lookup loads it)."""
+        with self._lock:
+            self._written(car_id)
+            entry = self._cars.get(car_id)
+            if entry is None:
+                return
+            i = bisect_right(entry.starts, start)
+            entry.starts.insert(i, start)
+            entry.ends.insert(i, end)
+            entry.ids.insert(i, policy_id)
+
+    def invalidate(self, car_id: int):
+        with self._lock:
+            self._written(car_id)
+            self._cars.pop(car_id, None)
+
+    def clear(self):
+        with self._lock:
+            for car_id in self._loading:
+                self._written(car_id)
+            self._cars.clear()
+
+    def size(self):
+        """Return (cars, intervals) currently cached."""
+        with self._lock:
+            return len(self._cars), sum(len(e.ids) for e in self._cars.values())
+
+_index: CoverageIndex | None = None
+_index_lock = threading.Lock()
+
+def get_coverage_index() -> CoverageIndex | None:
+    """Return the process-wide index, or None when COVERAGE_INDEX_ENABLED is off."""
+    global _index
+    settings = get_settings()
+    if not settings.COVERAGE_INDEX_ENABLED:
+        return None
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = CoverageIndex(settings.COVERAGE_INDEX_TTL_SECONDS, settings.COVERAGE_INDEX_MAX_CARS)
+    return _index
+
+def reset_coverage_index():
+    """Drop the process-wide index (used by tests and after bulk changes)."""
+    global _index
+    with _index_lock:
+        _index = None
+
+def note_policy_added(car_id: int, start: date, end: date, policy_id: int):
+    idx = get_coverage_index()
+    if idx is not None:
+        idx.add(car_id, start, end, policy_id)
+
+def invalidate_car(car_id: int):
+    idx = get_coverage_index()
+    if idx is not None:
+        idx.invalidate(car_id)
+
+CARS.set_function(lambda: _index.size()[0] if _index is not None else 0)
+INTERVALS.set_function(lambda: _index.size()[1] if _index is not None else 0)
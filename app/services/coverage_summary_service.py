@@ -0,0 +1,200 @@
+"""Per-car coverage summary projection (``car_coverage_summary``).
+
+One row per car answers "is car X insured today, until when, with which
+provider, how many claims and for how much" with a single primary-key read.
+Rows are maintained in the same transaction as the writes they reflect:
+
+- policy create / update / delete (``policies_service``) and bulk imports
+  recompute the car's policy columns as of today;
+- claim create / delete (``claim_service``) adjust ``claim_count`` /
+  ``claim_total`` in place (``last_claim_date`` is re-read on delete);
+- the scheduled expiry job calls ``roll_forward`` once per tick: rows whose
+  ``as_of`` day is past are moved to today, recomputing only cars where a
+  policy started or ended in between.
+
+A write for a car without a row (created before the first ``rebuild``)
+inserts the full row instead. ``flask coverage-summary rebuild`` recomputes
+the whole table from policies and claims.
+"""
+from datetime import date, timedelta
+from itertools import groupby
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from app.api.errors import NotFoundError
+from app.core.logging import get_logger
+from app.db.base import datab as db
+from app.db.models import Car, CarCoverageSummary, Claim, InsurancePolicy
+
+S = CarCoverageSummary
+log = get_logger()
+
+POLICY_COLUMNS = ("current_policy_id", "provider", "coverage_end", "next_gap")
+NOT_INSURED = dict.fromkeys(POLICY_COLUMNS)
+
+def _today() -> date:
+    return date.today()
+
+def _chunks(ids, size: int):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+def policy_states(car_ids, today: date) -> dict:
+    """Policy columns for each of ``car_ids`` insured on ``today`` (cars not insured are absent).
+
+    Reads the policies ending today or later in start order; the first one
+    covers today if it has started, and back-to-back successors extend
+    ``next_gap`` (policies never overlap).
+    """
+    rows = db.session.execute(
+        select(InsurancePolicy.car_id, InsurancePolicy.id, InsurancePolicy.provider,
+               InsurancePolicy.start_date, InsurancePolicy.end_date)
+        .where(InsurancePolicy.car_id.in_(car_ids), InsurancePolicy.end_date >= today)
+        .order_by(InsurancePolicy.car_id, InsurancePolicy.start_date)
+    )
+    states = {}
+    for car_id, policies in groupby(rows, key=lambda r: r.car_id):
+        current = next(policies)
+        if current.start_date > today:
+            continue
+        gap = current.end_date + timedelta(days=1)
+        for p in policies:
+            if p.start_date > gap:
+                break
+            gap = p.end_date + timedelta(days=1)
+        states[car_id] = dict(current_policy_id=current.id, provider=current.provider,
+                              coverage_end=current.end_date, next_gap=gap)
+    return states
+
+def _claim_totals(car_ids) -> dict:
+    rows = db.session.execute(
+        select(Claim.car_id, func.count(), func.coalesce(func.sum(Claim.amount), 0), func.max(Claim.claim_date))
+        .where(Claim.car_id.in_(car_ids))
+        .group_by(Claim.car_id)
+    )
+    return {car_id: dict(claim_count=n, claim_total=total, last_claim_date=last) for car_id, n, total, last in rows}
+
+def compute_rows(car_ids, today: date) -> list[dict]:
+    """Full summary rows for the existing cars among ``car_ids``."""
+    existing = db.session.scalars(select(Car.id).where(Car.id.in_(car_ids)).order_by(Car.id)).all()
+    if not existing:
+        return []
+    states = policy_states(existing, today)
+    claims = _claim_totals(existing)
+    no_claims = dict(claim_count=0, claim_total=0, last_claim_date=None)
+    return [
+        dict(car_id=car_id, as_of=today, **states.get(car_id, NOT_INSURED), **claims.get(car_id, no_claims))
+        for car_id in existing
+    ]
+
+def _apply(stmt, car_id: int):
+    """Run an in-place UPDATE of one car's row, inserting the full row when there is none yet."""
+    if db.session.execute(stmt.execution_options(synchronize_session=False)).rowcount:
+        return
+    try:
+        with db.session.begin_nested():
+            rows = compute_rows([car_id], _today())
+            if rows:
+                db.session.execute(insert(S), rows)
+    except IntegrityError:
+        # A concurrent write created the row first; it lacks this write, so apply it.
+        db.session.execute(stmt.execution_options(synchronize_session=False))
+
+def policies_changed(car_id: int):
+    """Recompute the car's policy columns as of today; the caller commits."""
+    today = _today()
+    state = policy_states([car_id], today).get(car_id, NOT_INSURED)
+    _apply(update(S).where(S.car_id == car_id).values(as_of=today, **state), car_id)
+
+def claim_added(car_id: int, claim_date: date, amount):
+    """Count a new (flushed or pending) claim; the caller commits."""
+    _apply(update(S).where(S.car_id == car_id).values(
+        claim_count=S.claim_count + 1,
+        claim_total=S.claim_total + amount,
+        last_claim_date=case(
+            (or_(S.last_claim_date.is_(None), S.last_claim_date < claim_date), claim_date),
+            else_=S.last_claim_date,
+        ),
+    ), car_id)
+
+def claim_removed(car_id: int, amount):
+    """Uncount a deleted claim; the caller commits."""
+    last = select(func.max(Claim.claim_date)).where(Claim.car_id == car_id).scalar_subquery()
+    _apply(update(S).where(S.car_id == car_id).values(
+        claim_count=S.claim_count - 1,
+        claim_total=S.claim_total - amount,
+        last_claim_date=last,
+    ), car_id)
+
+def refresh_cars(*car_ids: int, batch_size: int = 1000):
+    """Replace the rows of ``car_ids`` with recomputed ones (bulk writes); the caller commits."""
+    today = _today()
+    for chunk in _chunks(sorted(set(car_ids)), batch_size):
+        db.session.execute(delete(S).where(S.car_id.in_(chunk)))
+        rows = compute_rows(chunk, today)
+        if rows:
+            db.session.execute(insert(S), rows)
+
+def delete_for_car(car_id: int):
+    """Drop a car's row before the car itself is deleted; the caller commits."""
+    db.session.execute(delete(S).where(S.car_id == car_id))
+
+def roll_forward(today: date | None = None, batch_size: int = 1000, heartbeat=None) -> int:
+    """Move every row to ``today``, recomputing cars whose coverage changed since their ``as_of``.
+
+    Coverage changes only when a policy starts after ``as_of`` or one ends
+    before today, so other rows are simply re-dated. Commits; returns the
+    number of cars recomputed. ``heartbeat`` is called per chunk and before the commit.
+    """
+    today = today or _today()
+    boundary = (select(InsurancePolicy.id)
+                .where(InsurancePolicy.car_id == S.car_id,
+                       or_(and_(InsurancePolicy.start_date > S.as_of, InsurancePolicy.start_date <= today),
+                           and_(InsurancePolicy.end_date >= S.as_of, InsurancePolicy.end_date < today)))
+                .exists())
+    due = db.session.scalars(select(S.car_id).where(S.as_of < today, boundary).order_by(S.car_id)).all()
+    for chunk in _chunks(due, batch_size):
+        states = policy_states(chunk, today)
+        db.session.execute(update(S), [
+            dict(car_id=car_id, as_of=today, **states.get(car_id, NOT_INSURED)) for car_id in chunk
+        ])
+        if heartbeat:
+            heartbeat()
+    db.session.execute(update(S).where(S.as_of < today).values(as_of=today)
+                       .execution_options(synchronize_session=False))
+    if heartbeat:
+        heartbeat()
+    db.session.commit()
+    if due:
+        log.info("coverage_summary.roll_forward", cars=len(due), as_of=today.isoformat())
+    return len(due)
+
+def rebuild(batch_size: int = 1000) -> int:
+    """Recompute the whole table from policies and claims in one transaction; returns rows written."""
+    today = _today()
+    db.session.execute(delete(S))
+    car_ids = db.session.scalars(select(Car.id).order_by(Car.id)).all()
+    written = 0
+    for chunk in _chunks(car_ids, batch_size):
+        rows = compute_rows(chunk, today)
+        if rows:
+            db.session.execute(insert(S), rows)
+            written += len(rows)
+    db.session.commit()
+    log.info("coverage_summary.rebuild", rows=written, as_of=today.isoformat())
+    return written
+
+def get_summary(car_id: int) -> CarCoverageSummary:
+    """The car's summary as of today; computed on the fly when the row is missing or not rolled forward yet."""
+    today = _today()
+    row = db.session.get(S, car_id)
+    if row is None:
+        rows = compute_rows([car_id], today)
+        if not rows:
+            raise NotFoundError("Car not found")
+        return S(**rows[0])
+    if row.as_of < today:
+        state = policy_states([car_id], today).get(car_id, NOT_INSURED)
+        fields = {c: getattr(row, c) for c in ("claim_count", "claim_total", "last_claim_date")}
+        return S(car_id=car_id, as_of=today, **state, **fields)
+    return row
@@ -1,51 +1,120 @@
 """Policy expiry logging service.
 
-Responsible for idempotently logging policies that expire 'today'. Designed to be
-called from a scheduled job (e.g., APScheduler) shortly after midnight. It only
-logs during a guarded time window (00:00-00:59) to avoid duplicate daily runs
-while still allowing retries inside the same hour.
+Responsible for idempotently logging policies as they expire. Designed to be
+called from a scheduled job at any time of day: every run catches up on all
+unlogged policies whose ``end_date`` is on or before today, oldest date first,
+including policies created or imported with an end date the job has already
+passed. Missing a tick, a deploy or a restart only delays logging; it never
+skips a day. Only policies ending on or before the floor (the start of the
+very first run's lookback, stored once) are never logged. The scan reads the
+partial index ``ix_policy_unlogged_end``, which holds unlogged policies only.
+
+Policies are processed in chunks of ``EXPIRY_CHUNK_SIZE`` ordered by
+``(end_date, id)``: each chunk is one ``UPDATE ... RETURNING`` that sets
+``logged_expiry_at`` and hands back the rows. They are logged before the chunk
+is committed, so a crash or lost lease in between relogs them instead of
+losing them. Every scan starts at the floor; the ``policy_expiry`` watermark
+committed with each chunk is informational only. It reports the last date
+fully processed (chunks are date-ordered, so every date before the newest one
+in a full chunk is complete; today stays open, so it stops at yesterday) and
+seeds the floor once on deployments that predate it. It never selects rows.
 """
 
-from datetime import datetime, time
-from sqlalchemy import and_
+from datetime import datetime, timedelta
+from time import perf_counter
+from sqlalchemy import select, update
 from app.db.base import datab as db
 from app.db.models import InsurancePolicy
+from app.core.config import get_settings
 from app.core.logging import get_logger
+from app.core.metrics import counter, gauge, histogram
+from app.services.watermark_service import get_watermark, set_watermark
 
 log = get_logger()
 
-def log_today_expiring_policies() -> int:
-    """Log each policy whose end_date is today and not previously logged.
+WATERMARK = "policy_expiry"
+FLOOR = "policy_expiry_floor"
+
+EXPIRY_ROWS = counter("policy_expiry_rows_total", "Policies marked and logged as expired")
+EXPIRY_CHUNK_SECONDS = histogram(
+    "policy_expiry_chunk_seconds", "Latency of one expiry chunk (UPDATE ... RETURNING plus commit)"
+)
+EXPIRY_ROWS_PER_SECOND = gauge(
+    "policy_expiry_rows_per_second", "Throughput of the last expiry run that marked any policies"
+)
+
+def _mark_chunk(after, through, logged_at: datetime, size: int):
+    """Mark up to ``size`` unlogged policies with after < end_date <= through; returns (id, car_id, end_date) rows."""
+    pending = (select(InsurancePolicy.id)
+               .where(InsurancePolicy.end_date > after,
+                      InsurancePolicy.end_date <= through,
+                      InsurancePolicy.logged_expiry_at.is_(None))
+               .order_by(InsurancePolicy.end_date, InsurancePolicy.id)
+               .limit(size)
+               .with_for_update(skip_locked=True))
+    stmt = (update(InsurancePolicy)
+            .where(InsurancePolicy.id.in_(pending))
+            .values(logged_expiry_at=logged_at)
+            .returning(InsurancePolicy.id, InsurancePolicy.car_id, InsurancePolicy.end_date)
+            .execution_options(synchronize_session=False))
+    return db.session.execute(stmt).all()
 
-    Returns the number of policies logged. If called outside the midnight window
-    it returns 0 immediately. Uses a simple idempotency flag (logged_expiry_at).
+def log_expiring_policies(chunk_size: int | None = None, heartbeat=None) -> int:
+    """Log every unlogged policy that ended after the floor, up to and including today.
+
+    Returns the number of policies logged. Uses a simple idempotency flag
+    (logged_expiry_at) so reruns and overlapping catch-up ranges never relog.
+    The first run (no floor or watermark yet) looks back
+    EXPIRY_INITIAL_LOOKBACK_DAYS days and stores that start as the floor.
+    ``heartbeat`` (the scheduler's lease renewal) is called before each chunk commits.
     """
+    settings = get_settings()
     now = datetime.now()
     today = now.date()
-    window_start = datetime.combine(today, time(0, 0))
-    window_end = datetime.combine(today, time(1, 0))
-    if not (window_start <= now < window_end):
-        return 0
-
-    policies = (InsurancePolicy.query
-                .filter(and_(
-                    InsurancePolicy.end_date == today,
-                    InsurancePolicy.logged_expiry_at.is_(None)
-                )).all())
-    if not policies:
-        return 0
-
-    count = 0
-    for p in policies:
-        p.logged_expiry_at = now
-        log.info(
-            "policy.expiry",
-            policy_id=p.id,
-            car_id=p.car_id,
-            end_date=p.end_date.isoformat(),
-            logged_at=now.isoformat()
-        )
-        count += 1
-
-    db.session.commit()
-    return count
\ No newline at end of file
+    yesterday = today - timedelta(days=1)
+    # Progress marker only (reported, never used to select rows)
+    watermark = get_watermark(WATERMARK)
+    if watermark is None:
+        watermark = yesterday - timedelta(days=settings.EXPIRY_INITIAL_LOOKBACK_DAYS)
+    floor = get_watermark(FLOOR)
+    if floor is None:
+        # Logging starts here (or at a pre-floor deployment's watermark); committed with the first chunk
+        floor = watermark
+        set_watermark(FLOOR, floor)
+
+    chunk_size = chunk_size or settings.EXPIRY_CHUNK_SIZE
+    started = perf_counter()
+    count = chunks = 0
+    while True:
+        chunk_started = perf_counter()
+        rows = _mark_chunk(floor, today, now, chunk_size)
+        full = len(rows) == chunk_size
+        # A full chunk may stop mid-date; everything before its newest date is done.
+        done_through = rows[-1].end_date - timedelta(days=1) if full else yesterday
+        watermark = max(watermark, min(done_through, yesterday))
+        set_watermark(WATERMARK, watermark)
+        # Log before committing: a failed commit relogs the chunk next run, never loses it.
+        for policy_id, car_id, end_date in rows:
+            log.info(
+                "policy.expiry",
+                policy_id=policy_id,
+                car_id=car_id,
+                end_date=end_date.isoformat(),
+                logged_at=now.isoformat()
+            )
+        if heartbeat:
+            heartbeat()
+        db.session.commit()
+        EXPIRY_CHUNK_SECONDS.observe(perf_counter() - chunk_started)
+        chunks += 1
+        count += len(rows)
+        if not full:
+            break
+
+    elapsed = perf_counter() - started
+    if count:
+        EXPIRY_ROWS.inc(count)
+        EXPIRY_ROWS_PER_SECOND.set(count / elapsed if elapsed > 0 else count)
+        log.info("policy.expiry.run", rows=count, chunks=chunks, seconds=round(elapsed, 3),
+                 watermark=watermark.isoformat())
+    return count
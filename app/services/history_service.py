@@ -1,59 +1,122 @@
+"""Car history: one chronological timeline of policies and claims.
+
+The timeline is a single ``UNION ALL`` over policies (keyed by start date) and
+claims (keyed by claim date), ordered by ``(date, type, id)`` in SQL. Pages are
+keyset-bounded on that same tuple, and optional date bounds are pushed into
+each branch so the ``(car_id, start_date)`` / ``(car_id, claim_date)`` indexes
+apply.
+"""
+from datetime import date
+from sqlalchemy import Date, Numeric, and_, cast, literal_column, null, or_, select, union_all
 from app.db.models import InsurancePolicy, Claim, Car
 from app.db.base import datab as db
+from app.db.queries import fetch_stream
 from app.api.errors import NotFoundError
+from app.core.config import get_settings
+
+POLICY = "POLICY"
+CLAIM = "CLAIM"
+
+def _timeline(car_id: int, after=None, date_from: date | None = None, date_to: date | None = None):
+    """Build the ordered UNION ALL statement; ``after`` is a (date, type, id) keyset position."""
+    branches = []
+    for kind, model, when, cols in (
+        (POLICY, InsurancePolicy, InsurancePolicy.start_date, (
+            InsurancePolicy.start_date, InsurancePolicy.end_date, InsurancePolicy.provider,
+            cast(null(), Date), cast(null(), Numeric(12, 2)), null(),
+        )),
+        (CLAIM, Claim, Claim.claim_date, (
+            cast(null(), Date), cast(null(), Date), null(),
+            Claim.claim_date, Claim.amount, Claim.description,
+        )),
+    ):
+        branch = select(
+            literal_column(f"'{kind}'").label("type"),
+            model.id.label("id"),
+            when.label("date"),
+            *(c.label(n) for c, n in zip(cols, (
+                "start_date", "end_date", "provider", "claim_date", "amount", "description"
+            ))),
+        ).where(model.car_id == car_id)
+        if date_from:
+            branch = branch.where(when >= date_from)
+        if date_to:
+            branch = branch.where(when <= date_to)
+        if after:
+            branch = branch.where(when >= after[0])
+        branches.append(branch)
+    h = union_all(*branches).subquery("h")
+    stmt = select(h).order_by(h.c.date, h.c.type, h.c.id)
+    if after:
+        a_date, a_type, a_id = after
+        stmt = stmt.where(or_(
+            h.c.date > a_date,
+            and_(h.c.date == a_date, or_(h.c.type > a_type, and_(h.c.type == a_type, h.c.id > a_id))),
+        ))
+    return stmt
+
+def _history_version(car_id: int):
+    """(history_version, history_updated_at) of the car; NotFoundError if it does not exist."""
+    row = db.session.execute(
+        select(Car.history_version, Car.history_updated_at).where(Car.id == car_id)
+    ).first()
+    if row is None:
+        raise NotFoundError("Car not found")
+    return tuple(row)
+
+def history_rows(car_id: int, after=None, limit: int | None = None,
+                 date_from: date | None = None, date_to: date | None = None):
+    """Return (timeline rows, (history_version, history_updated_at)) of a car.
+
+    Rows are (type, id, date, start_date, end_date, provider, claim_date,
+    amount, description) and carry the car's history version, read in the same
+    query. The car is only looked up separately when the page comes back
+    empty, to tell an unknown car (404) from an empty range.
+    """
+    stmt = _timeline(car_id, after, date_from, date_to)
+    stmt = stmt.add_columns(Car.history_version, Car.history_updated_at).join(Car, Car.id == car_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    rows = db.session.execute(stmt).all()
+    if not rows:
+        return rows, _history_version(car_id)
+    return rows, (rows[0].history_version, rows[0].history_updated_at)
+
+def iter_history_rows(car_id: int, after=None, date_from: date | None = None,
+                      date_to: date | None = None, batch_size: int | None = None):
+    """Check the car now (404); return a lazy generator over every timeline row and the version checked."""
+    version = _history_version(car_id)
+    rows = fetch_stream(_timeline(car_id, after, date_from, date_to),
+                        batch_size or get_settings().STREAM_BATCH_SIZE, columns=True)
+    return rows, version
+
+def history_entry(row, compact: bool = False) -> dict:
+    """Map a timeline row to its output entry; compact entries add a unified ``date``."""
+    if row.type == POLICY:
+        entry = {
+            "type": POLICY,
+            "policyId": row.id,
+            "startDate": row.start_date.isoformat(),
+            "endDate": row.end_date.isoformat(),
+        }
+        if row.provider is not None:
+            entry["provider"] = row.provider
+    else:
+        entry = {
+            "type": CLAIM,
+            "claimId": row.id,
+            "claimDate": row.claim_date.isoformat(),
+            "amount": row.amount,
+            "description": row.description,
+        }
+    if compact:
+        entry["date"] = row.date.isoformat()
+    return entry
 
 def car_history(car_id: int, compact: bool = False):
     """Aggregate a car's policies and claims into a unified chronological list.
 
     If compact=True: each entry includes a unified 'date' field (policy startDate or claim claimDate) and omits null keys.
     """
-    car = db.session.get(Car, car_id)
-    if not car:
-        raise NotFoundError("Car not found")
-    policies = InsurancePolicy.query.filter_by(car_id=car_id).all()
-    claims = Claim.query.filter_by(car_id=car_id).all()
-    # Build intermediate entries with a unified chronological key (chrono_date)
-    raw_entries = []
-    for p in policies:
-        raw_entries.append({
-            "type": "POLICY",
-            "policyId": p.id,
-            "startDate": p.start_date.isoformat(),
-            "endDate": p.end_date.isoformat(),
-            "provider": p.provider,
-            "_chrono": p.start_date,
-            "date": p.start_date.isoformat() if compact else None
-        })
-    for c in claims:
-        raw_entries.append({
-            "type": "CLAIM",
-            "claimId": c.id,
-            "claimDate": c.claim_date.isoformat(),
-            "amount": getattr(c, "amount", None),
-            "description": getattr(c, "description", None),
-            "_chrono": c.claim_date,
-            "date": c.claim_date.isoformat() if compact else None
-        })
-    # Sort by real date object, then by type for stable deterministic order (POLICY before CLAIM if same day)
-    raw_entries.sort(key=lambda e: (e["_chrono"], e["type"]))
-    # Drop internal key and post-process entries
-    pruned_entries = []
-    for e in raw_entries:
-        e.pop("_chrono", None)
-        if compact:
-            # Drop keys with None values
-            for k in [k for k, v in list(e.items()) if v is None]:
-                e.pop(k, None)
-            if e.get("type") == "CLAIM":
-                for k in ("startDate", "endDate", "provider", "policyId"):
-                    e.pop(k, None)
-            if e.get("type") == "POLICY":
-                for k in ("claimDate", "description", "amount", "claimId"):
-                    e.pop(k, None)
-        else:
-            # Full format: still prune None values to avoid noisy nulls
-            for k in [k for k, v in list(e.items()) if v is None]:
-                e.pop(k, None)
-            # Keep both policy and claim specific keys if they exist (no cross-pruning)
-        pruned_entries.append(e)
-    return pruned_entries
\ No newline at end of file
+    rows, _ = history_rows(car_id)
+    return [history_entry(r, compact) for r in rows]
@@ -0,0 +1,87 @@
+"""Database-backed leases for running a job on exactly one worker.
+
+Every worker (gunicorn process, container) runs the scheduler, but a job body
+only executes on the worker holding that job's row in ``scheduler_lease``. A
+lease is taken or renewed with one conditional ``UPDATE`` (succeeds when the
+caller already holds it or it has expired), falling back to an ``INSERT`` for
+the first run; both are atomic on Postgres and SQLite alike, so no
+dialect-specific locking is required. If the leader dies its lease simply
+expires and the next worker to tick takes over.
+
+A long job renews its lease from inside its own transaction (``renew``) before
+each commit. The renewal becomes visible together with the work, and it
+doubles as a fence: if another worker took the lease meanwhile, the renewal
+matches no row and the job gives up (``LeaseLost``) instead of committing.
+"""
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from app.db.base import datab as db
+from app.db.models import SchedulerLease
+
+def utcnow() -> datetime:
+    """Naive UTC timestamp, matching the DateTime columns."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+class LeaseLost(Exception):
+    """Raised by a job that found its lease taken over by another worker."""
+
+def try_acquire(name: str, holder: str, ttl_seconds: int, now: datetime | None = None) -> bool:
+    """Take or renew the lease on ``name`` for ``holder``; False when another holder's lease is live."""
+    now = now or utcnow()
+    expires_at = now + timedelta(seconds=ttl_seconds)
+    renewed = db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name,
+               or_(SchedulerLease.holder == holder, SchedulerLease.expires_at < now))
+        .values(holder=holder, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    if renewed.rowcount == 1:
+        db.session.commit()
+        return True
+    try:
+        db.session.execute(insert(SchedulerLease).values(name=name, holder=holder, expires_at=expires_at))
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return False
+    return True
+
+def renew(name: str, holder: str, ttl_seconds: int, now: datetime | None = None) -> bool:
+    """Extend ``holder``'s lease on ``name`` in the current transaction; False when another holder has it.
+
+    Does not commit: the caller's next commit publishes the renewal with its work.
+    """
+    now = now or utcnow()
+    renewed = db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(expires_at=now + timedelta(seconds=ttl_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    return renewed.rowcount == 1
+
+def release(name: str, holder: str, now: datetime | None = None):
+    """Expire ``holder``'s lease immediately so another worker can take over on its next tick."""
+    db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(expires_at=now or utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+def record_run(name: str, holder: str, started_at: datetime, seconds: float, rows: int | None):
+    """Store the last-run stats on the lease row (only while ``holder`` still owns it)."""
+    db.session.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(last_run_at=started_at, last_run_seconds=seconds, last_run_rows=rows)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+def list_leases():
+    """Return every lease row ordered by job name."""
+    return db.session.scalars(select(SchedulerLease).order_by(SchedulerLease.name)).all()
@@ -0,0 +1,216 @@
+"""Monthly claim and exposure rollups (``monthly_rollup``).
+
+One row per month x provider x make holds the insured car-days earned in the
+month (policy days up to the refresh date), the number of claims dated in it
+and their total, so frequency and severity reports read a handful of rows
+instead of scanning ``claim`` and ``insurance_policy``. A claim counts under the
+provider of the policy covering its claim date ('' when none did).
+
+``refresh`` recomputes whole months, choosing them from:
+
+- claims created (``Claim.created_at``) and policies created or updated
+  (``InsurancePolicy.updated_at``) since the ``monthly_rollup`` watermark,
+  which also covers bulk imports;
+- ``rollup_refresh_queue``, filled in the same transaction by the writes the
+  watermark cannot see: policy updates (old period) and deletes, claim deletes,
+  car make changes and car deletes (``queue_months`` / ``queue_car``);
+- the months from the watermark to today, whose earned exposure grew.
+
+The watermark is set to the day before the run started and the next run
+rescans from it, so rows committed while a run was in progress are not
+missed. Without a watermark (first run) ``refresh`` rebuilds every month.
+Both run in one transaction; the scheduled job passes a ``heartbeat`` (its
+lease renewal) that is called per month and before the commit.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from sqlalchemy import Integer, and_, cast, delete, func, insert, literal, select, Date
+from app.core.logging import get_logger
+from app.db.base import datab as db
+from app.db.models import Car, Claim, InsurancePolicy, MonthlyRollup, RollupRefreshQueue
+from app.services.lease_service import utcnow
+from app.services.watermark_service import get_watermark, set_watermark
+
+R = MonthlyRollup
+Q = RollupRefreshQueue
+log = get_logger()
+
+WATERMARK = "monthly_rollup"
+CENTS = Decimal("0.01")
+DAYS_PER_YEAR = 365
+
+def _today() -> date:
+    return date.today()
+
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+def _next_month(m: date) -> date:
+    return (m.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def months_between(start: date, end: date):
+    """First days of the months from ``start``'s through ``end``'s."""
+    m = month_start(start)
+    while m <= end:
+        yield m
+        m = _next_month(m)
+
+def queue_months(start: date, end: date | None = None):
+    """Queue the months from ``start`` through ``end`` for the next refresh; the caller commits."""
+    rows = [{"month": m} for m in months_between(start, end or start)]
+    if rows:
+        db.session.execute(insert(Q), rows)
+
+def queue_car(car_id: int):
+    """Queue every month holding one of the car's policies or claims (before a make change or delete)."""
+    months = set()
+    for start, end in db.session.execute(
+            select(InsurancePolicy.start_date, InsurancePolicy.end_date).where(InsurancePolicy.car_id == car_id)):
+        months.update(months_between(start, end))
+    months.update(month_start(d) for d in db.session.scalars(
+        select(Claim.claim_date).where(Claim.car_id == car_id).distinct()))
+    if months:
+        db.session.execute(insert(Q), [{"month": m} for m in sorted(months)])
+
+def _day_count(lo, hi, dialect: str):
+    """Inclusive number of days from ``lo`` to ``hi`` as SQL."""
+    if dialect == "postgresql":
+        return hi - lo + 1
+    return cast(func.julianday(hi) - func.julianday(lo), Integer) + 1
+
+def _exposure(first: date, last: date, dialect: str):
+    """(provider, make, insured car-days) of the policy days between ``first`` and ``last``."""
+    first, last = literal(first, Date), literal(last, Date)
+    clamp = (func.greatest, func.least) if dialect == "postgresql" else (func.max, func.min)
+    lo, hi = clamp[0](InsurancePolicy.start_date, first), clamp[1](InsurancePolicy.end_date, last)
+    provider, make = func.coalesce(InsurancePolicy.provider, ""), func.coalesce(Car.make, "")
+    return db.session.execute(
+        select(provider, make, func.sum(_day_count(lo, hi, dialect)))
+        .join(Car, Car.id == InsurancePolicy.car_id)
+        .where(InsurancePolicy.start_date <= last, InsurancePolicy.end_date >= first)
+        .group_by(provider, make)
+    ).all()
+
+def _claims(first: date, last: date):
+    """(provider, make, count, total) of the claims dated between ``first`` and ``last``."""
+    provider, make = func.coalesce(InsurancePolicy.provider, ""), func.coalesce(Car.make, "")
+    covering = and_(InsurancePolicy.car_id == Claim.car_id,
+                    InsurancePolicy.start_date <= Claim.claim_date,
+                    InsurancePolicy.end_date >= Claim.claim_date)
+    return db.session.execute(
+        select(provider, make, func.count(), func.sum(Claim.amount))
+        .select_from(Claim)
+        .join(Car, Car.id == Claim.car_id)
+        .outerjoin(InsurancePolicy, covering)
+        .where(Claim.claim_date >= first, Claim.claim_date <= last)
+        .group_by(provider, make)
+    ).all()
+
+def _refresh_month(month: date, today: date, dialect: str, refreshed_at: datetime) -> int:
+    """Replace one month's rows; returns rows written."""
+    last = _next_month(month) - timedelta(days=1)
+    cells = defaultdict(lambda: dict(insured_car_days=0, claim_count=0, claim_total=0))
+    if month <= today:
+        for provider, make, days in _exposure(month, min(last, today), dialect):
+            cells[(provider, make)]["insured_car_days"] = int(days)
+    for provider, make, count, total in _claims(month, last):
+        cells[(provider, make)].update(claim_count=count, claim_total=total)
+    db.session.execute(delete(R).where(R.month == month))
+    rows = [dict(month=month, provider=provider, make=make, refreshed_at=refreshed_at, **values)
+            for (provider, make), values in sorted(cells.items())]
+    if rows:
+        db.session.execute(insert(R), rows)
+    return len(rows)
+
+def _take_queue():
+    """Queued (ids, months) visible now; only these ids are removed after the refresh."""
+    rows = db.session.execute(select(Q.id, Q.month)).all()
+    return [r.id for r in rows], {r.month for r in rows}
+
+def _drop_queue(ids, batch_size: int = 1000):
+    for start in range(0, len(ids), batch_size):
+        db.session.execute(delete(Q).where(Q.id.in_(ids[start:start + batch_size])))
+
+def _recompute(months, today: date, started: datetime, queued_ids, heartbeat=None) -> int:
+    dialect = db.engine.dialect.name
+    for month in sorted(months):
+        _refresh_month(month, today, dialect, started)
+        if heartbeat:
+            heartbeat()
+    _drop_queue(queued_ids)
+    set_watermark(WATERMARK, started.date() - timedelta(days=1))
+    if heartbeat:
+        heartbeat()
+    db.session.commit()
+    return len(months)
+
+def refresh(today: date | None = None, heartbeat=None) -> int:
+    """Recompute the months changed since the watermark in one transaction; returns months refreshed."""
+    started = utcnow()
+    today = today or _today()
+    watermark = get_watermark(WATERMARK)
+    if watermark is None:
+        return rebuild(today, heartbeat)
+    since = datetime.combine(watermark, time.min)
+    months = set(months_between(watermark, today))
+    months.update(month_start(d) for d in db.session.scalars(
+        select(Claim.claim_date).where(Claim.created_at >= since).distinct()))
+    for start, end in db.session.execute(
+            select(InsurancePolicy.start_date, InsurancePolicy.end_date).where(InsurancePolicy.updated_at >= since)):
+        months.update(months_between(start, end))
+    queued_ids, queued = _take_queue()
+    months |= queued
+    refreshed = _recompute(months, today, started, queued_ids, heartbeat)
+    log.info("monthly_rollup.refresh", months=refreshed, queued=len(queued), since=watermark.isoformat())
+    return refreshed
+
+def rebuild(today: date | None = None, heartbeat=None) -> int:
+    """Recompute every month holding a policy or claim (through today); returns months refreshed."""
+    started = utcnow()
+    today = today or _today()
+    first = min(filter(None, (db.session.scalar(select(func.min(InsurancePolicy.start_date))),
+                              db.session.scalar(select(func.min(Claim.claim_date))))), default=None)
+    last = max(today, db.session.scalar(select(func.max(Claim.claim_date))) or today)
+    queued_ids, _ = _take_queue()
+    db.session.execute(delete(R))
+    months = set(months_between(first, last)) if first else set()
+    refreshed = _recompute(months, today, started, queued_ids, heartbeat)
+    log.info("monthly_rollup.rebuild", months=refreshed)
+    return refreshed
+
+def _ratio(numerator, denominator, places: str):
+    if not denominator:
+        return None
+    return (Decimal(numerator) / Decimal(denominator)).quantize(Decimal(places), rounding=ROUND_HALF_UP)
+
+def get_rollups(month_from: date | None = None, month_to: date | None = None,
+                provider: str | None = None, make: str | None = None) -> list[dict]:
+    """Rollup rows in (month, provider, make) order with claim frequency and severity.
+
+    ``frequency`` is claims per insured car-year, ``severity`` the average claim
+    amount; both are null without exposure / claims. '' keys come back as null.
+    """
+    stmt = select(R).order_by(R.month, R.provider, R.make)
+    if month_from:
+        stmt = stmt.where(R.month >= month_from)
+    if month_to:
+        stmt = stmt.where(R.month <= month_to)
+    if provider is not None:
+        stmt = stmt.where(R.provider == provider)
+    if make is not None:
+        stmt = stmt.where(R.make == make)
+    return [{
+        "month": row.month.strftime("%Y-%m"),
+        "provider": row.provider or None,
+        "make": row.make or None,
+        "insuredCarDays": row.insured_car_days,
+        "claimCount": row.claim_count,
+        "claimTotal": Decimal(row.claim_total).quantize(CENTS),
+        "frequency": _ratio(row.claim_count * DAYS_PER_YEAR, row.insured_car_days, "0.0001"),
+        "severity": _ratio(row.claim_total, row.claim_count, "0.01"),
+    } for row in db.session.scalars(stmt)]
+
+def refreshed_through() -> date | None:
+    """Last day whose writes the rollups are guaranteed to include (None before the first refresh)."""
+    return get_watermark(WATERMARK)
@@ -7,13 +7,32 @@ here isolates persistence logic from request validation / response formatting.
 from app.db.base import datab as db
 from app.db.models import Owner
 from app.api.errors import NotFoundError
+from app.core.config import get_settings
+from app.db.queries import projection, fetch_all, fetch_stream
 
-def list_owners():
-    """Return all owners.
+def list_owners(after_id: int | None = None, limit: int | None = None, columns=None):
+    """Return owners ordered by id.
 
-    For large datasets consider adding pagination; current tests assume full list.
+    Pass after_id (last id of the previous page) and limit for keyset pagination;
+    omitting both returns the full list. Passing columns selects just those
+    columns and returns Row tuples instead of Owner instances.
     """
-    return Owner.query.all()
+    stmt = projection(Owner, columns).order_by(Owner.id)
+    if after_id is not None:
+        stmt = stmt.where(Owner.id > after_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return fetch_all(stmt, columns)
+
+def iter_owners(after_id: int | None = None, batch_size: int | None = None, columns=None):
+    """Yield owners ordered by id without loading the whole table.
+
+    Rows arrive batch_size at a time (STREAM_BATCH_SIZE by default).
+    """
+    stmt = projection(Owner, columns).order_by(Owner.id)
+    if after_id is not None:
+        stmt = stmt.where(Owner.id > after_id)
+    return fetch_stream(stmt, batch_size or get_settings().STREAM_BATCH_SIZE, columns)
 
 def create_owner(data: dict):
     """Persist and return a new Owner instance."""
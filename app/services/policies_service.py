@@ -1,10 +1,56 @@
+from datetime import date
+from sqlalchemy.exc import IntegrityError
 from app.db.base import datab as db
-from app.db.models import InsurancePolicy, Car
+from app.db.queries import projection, fetch_all, fetch_stream
+from app.db.models import InsurancePolicy, POLICY_CAR_MISSING, POLICY_OVERLAP_CONSTRAINT
 from app.api.errors import NotFoundError, DomainValidationError, ConflictError
+from app.core.config import get_settings
+from app.services.coverage_index import note_policy_added, invalidate_car
+from app.services import coverage_summary_service, monthly_rollup_service
+from app.services.version_service import bump, touch_car_history
+from app.services.response_cache import invalidate_car_responses
 
-def list_policies():
-    """Return all insurance policies."""
-    return InsurancePolicy.query.all()
+def list_policies(after_id: int | None = None, limit: int | None = None, columns=None):
+    """Return insurance policies ordered by id; keyset-paginated when after_id/limit are given.
+
+    columns switches from InsurancePolicy instances to Row tuples of just those columns.
+    """
+    stmt = projection(InsurancePolicy, columns).order_by(InsurancePolicy.id)
+    if after_id is not None:
+        stmt = stmt.where(InsurancePolicy.id > after_id)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return fetch_all(stmt, columns)
+
+def iter_policies(after_id: int | None = None, batch_size: int | None = None, columns=None):
+    """Yield all insurance policies ordered by id, batch_size rows per fetch."""
+    stmt = projection(InsurancePolicy, columns).order_by(InsurancePolicy.id)
+    if after_id is not None:
+        stmt = stmt.where(InsurancePolicy.id > after_id)
+    return fetch_stream(stmt, batch_size or get_settings().STREAM_BATCH_SIZE, columns)
+
+def list_policies_for_car(car_id: int, active_on: date | None = None, provider: str | None = None,
+                          date_from: date | None = None, date_to: date | None = None, batch_size: int = 500,
+                          columns=None):
+    """Iterate a car's policies ordered by start date with filters applied in SQL.
+
+    active_on keeps policies covering that day; date_from/date_to keep policies
+    overlapping the (inclusive) range. The car_id + start_date predicates are
+    served by ix_policy_car_start_end. Rows are fetched in batches of batch_size
+    (server-side cursor on Postgres) so callers can stream them; the query
+    is deferred until the first row is requested.
+    """
+    stmt = projection(InsurancePolicy, columns).where(InsurancePolicy.car_id == car_id)
+    if active_on is not None:
+        stmt = stmt.where(InsurancePolicy.start_date <= active_on, InsurancePolicy.end_date >= active_on)
+    if date_from is not None:
+        stmt = stmt.where(InsurancePolicy.end_date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(InsurancePolicy.start_date <= date_to)
+    if provider is not None:
+        stmt = stmt.where(InsurancePolicy.provider == provider)
+    stmt = stmt.order_by(InsurancePolicy.start_date, InsurancePolicy.id)
+    return fetch_stream(stmt, batch_size, columns)
 
 def get_policy(policy_id: int):
     """Fetch a policy by id or raise NotFoundError."""
@@ -13,24 +59,44 @@ def get_policy(policy_id: int):
         raise NotFoundError("Policy not found")
     return p
 
+def _constraint_error(exc: IntegrityError):
+    """Map a violated policy constraint to its domain error (None for anything else)."""
+    code = getattr(exc.orig, "pgcode", None)
+    message = str(exc.orig)
+    if code == "23P01" or POLICY_OVERLAP_CONSTRAINT in message:
+        # Overlapping policies are a resource conflict -> 409
+        return ConflictError("Policy dates overlap existing policy")
+    if code == "23503" or POLICY_CAR_MISSING in message:
+        return NotFoundError("Car not found")
+    return None
+
+def _commit_policy_write(car_id: int):
+    """Flush a policy insert/update, bump the car's history version and summary, and commit.
+
+    Overlap and car existence are enforced by the database (see app.db.models),
+    so concurrent writers cannot both commit overlapping policies.
+    """
+    try:
+        db.session.flush()
+        touch_car_history(car_id)
+        coverage_summary_service.policies_changed(car_id)
+        db.session.commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        error = _constraint_error(exc)
+        if error is None:
+            raise
+        raise error from None
+
 def create_policy(provider, start_date, end_date, car_id):
-    """Create a policy enforcing date ordering and no overlap with existing policies for the car."""
-    car = db.session.get(Car, car_id)
-    if not car:
-        raise NotFoundError("Car not found")
+    """Create a policy with a single INSERT; the database rejects overlaps (409) and unknown cars (404)."""
     if end_date < start_date:
         raise DomainValidationError("endDate must be >= startDate", field="endDate")
-    overlap = InsurancePolicy.query.filter(
-        InsurancePolicy.car_id == car_id,
-        InsurancePolicy.start_date <= end_date,
-        InsurancePolicy.end_date >= start_date
-    ).first()
-    if overlap:
-        # Overlapping policies are a resource conflict -> 409
-        raise ConflictError("Policy dates overlap existing policy")
     p = InsurancePolicy(provider=provider, start_date=start_date, end_date=end_date, car_id=car_id)
     db.session.add(p)
-    db.session.commit()
+    _commit_policy_write(car_id)
+    note_policy_added(car_id, start_date, end_date, p.id)
+    invalidate_car_responses(car_id)
     return p
 
 def update_policy(policy_id, provider=None, start_date=None, end_date=None):
@@ -40,19 +106,28 @@ def update_policy(policy_id, provider=None, start_date=None, end_date=None):
     new_end = end_date or p.end_date
     if new_end < new_start:
         raise DomainValidationError("endDate must be >= startDate", field="endDate")
-    overlap = InsurancePolicy.query.filter(
-        InsurancePolicy.car_id == p.car_id,
-        InsurancePolicy.id != p.id,
-        InsurancePolicy.start_date <= new_end,
-        InsurancePolicy.end_date >= new_start
-    ).first()
-    if overlap:
-        raise ConflictError("Policy dates overlap existing policy")
+    car_id = p.car_id
+    monthly_rollup_service.queue_months(p.start_date, p.end_date)
     if provider is not None:
         p.provider = provider
     if start_date is not None:
         p.start_date = start_date
     if end_date is not None:
         p.end_date = end_date
+    bump(p)
+    _commit_policy_write(car_id)
+    invalidate_car(car_id)
+    invalidate_car_responses(car_id)
+    return p
+
+def delete_policy(policy_id: int):
+    """Delete a single policy by id."""
+    p = get_policy(policy_id)
+    car_id = p.car_id
+    monthly_rollup_service.queue_months(p.start_date, p.end_date)
+    db.session.delete(p)
+    touch_car_history(car_id)
+    coverage_summary_service.policies_changed(car_id)
     db.session.commit()
-    return p
\ No newline at end of file
+    invalidate_car(car_id)
+    invalidate_car_responses(car_id)
\ No newline at end of file
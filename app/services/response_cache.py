@@ -0,0 +1,182 @@
+"""Optional cache of rendered responses for read-heavy per-car endpoints.
+
+``RESPONSE_CACHE_BACKEND`` selects the store:
+
+- ``memory``: per-process LRU of ``RESPONSE_CACHE_MAX_ENTRIES`` entries, each
+  expiring after ``RESPONSE_CACHE_TTL_SECONDS``. Invalidations reach only the
+  worker that made the write; other workers catch up when the TTL elapses.
+- ``shared``: a Redis-compatible store named by ``RESPONSE_CACHE_URL``, shared
+  by every worker. ``redis://`` URLs need the optional ``redis`` package;
+  ``local://`` uses ``LocalStandIn``, an in-process implementation of the few
+  commands used, for development and tests.
+- ``none`` (default): caching is off.
+
+Entries are keyed by route, car id, the car's cache generation and a digest of
+the request's representation. Writes to a car's policies or claims (and
+deleting the car) call ``invalidate_car_responses`` after commit, which bumps
+the generation: older entries become unreachable and age out. A reader that
+raced a write stored its entry under the generation it read before querying,
+so it can never mask the newer data.
+"""
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from app.core.config import get_settings
+from app.core.metrics import counter, gauge
+
+LOOKUPS = counter("response_cache_lookups_total", "Response cache lookups by route and result (hit/miss)", ("route", "result"))
+INVALIDATIONS = counter("response_cache_invalidations_total", "Cars whose cached responses were invalidated")
+ENTRIES = gauge("response_cache_entries", "Entries held by the in-process response cache")
+
+class MemoryCache:
+    """In-process LRU + TTL store with per-car generations.
+
+    Generations are kept in their own LRU of ``max_entries`` cars. A car whose
+    generation was evicted gets a fresh, never used value from a process-wide
+    counter, so its older entries stay unreachable.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+        self._generations: OrderedDict[int, int] = OrderedDict()
+        self._next_generation = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _touch_generation(self, car_id: int, fresh: bool = False) -> int:
+        if fresh or car_id not in self._generations:
+            self._generations[car_id] = next(self._next_generation)
+        self._generations.move_to_end(car_id)
+        while len(self._generations) > self.max_entries:
+            self._generations.popitem(last=False)
+        return self._generations[car_id]
+
+    def generation(self, car_id: int) -> int:
+        with self._lock:
+            return self._touch_generation(car_id)
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at >= self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, car_id: int):
+        with self._lock:
+            self._touch_generation(car_id, fresh=True)
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+class LocalStandIn:
+    """Thread-safe in-process stand-in for the Redis commands SharedCache uses."""
+
+    def __init__(self):
+        self._data: dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and time.monotonic() >= expires:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value, ex: float | None = None):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._data.get(key, (0, None))[0]) + 1
+            self._data[key] = (value, None)
+            return value
+
+class SharedCache:
+    """Store shared by all workers through a Redis-compatible ``client``."""
+
+    def __init__(self, client, ttl_seconds: float, prefix: str = "rc:"):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def generation(self, car_id: int) -> int:
+        return int(self.client.get(f"{self.prefix}gen:{car_id}") or 0)
+
+    def get(self, key: str) -> bytes | None:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes):
+        self.client.set(self.prefix + key, value, ex=self.ttl_seconds)
+
+    def invalidate(self, car_id: int):
+        self.client.incr(f"{self.prefix}gen:{car_id}")
+
+def _shared_client(url: str | None):
+    if not url or url.startswith("local://"):
+        return LocalStandIn()
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("RESPONSE_CACHE_URL needs the 'redis' package; install it or use local://")
+    return redis.Redis.from_url(url)
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_response_cache():
+    """Return the process-wide cache backend, or None when RESPONSE_CACHE_BACKEND is none."""
+    global _cache
+    settings = get_settings()
+    if settings.RESPONSE_CACHE_BACKEND == "none":
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                if settings.RESPONSE_CACHE_BACKEND == "shared":
+                    _cache = SharedCache(_shared_client(settings.RESPONSE_CACHE_URL), settings.RESPONSE_CACHE_TTL_SECONDS)
+                else:
+                    _cache = MemoryCache(settings.RESPONSE_CACHE_TTL_SECONDS, settings.RESPONSE_CACHE_MAX_ENTRIES)
+    return _cache
+
+def reset_response_cache():
+    """Drop the process-wide cache (used by tests and after configuration changes)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
+
+def route_enabled(route: str) -> bool:
+    """True when ``route`` is listed in RESPONSE_CACHE_ROUTES."""
+    routes = get_settings().RESPONSE_CACHE_ROUTES
+    return route in {r.strip() for r in routes.split(",")}
+
+def invalidate_car_responses(*car_ids: int):
+    """Forget cached responses of ``car_ids``; call after the write has committed."""
+    cache = get_response_cache()
+    if cache is None:
+        return
+    for car_id in set(car_ids):
+        cache.invalidate(car_id)
+        INVALIDATIONS.inc()
+
+ENTRIES.set_function(lambda: _cache.size() if isinstance(_cache, MemoryCache) else 0)
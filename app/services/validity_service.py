@@ -1,26 +1,82 @@
 from app.db.models import InsurancePolicy, Car
 from app.api.errors import NotFoundError
 from datetime import date
+from sqlalchemy import Date, Integer, bindparam, column, select, text
 from app.core.logging import get_logger
+from app.services.coverage_index import get_coverage_index
 
 log = get_logger()
 
-def check_insurance(car_id: int, target_date: date):
-    """Return whether a car has an active policy covering target_date with logging metadata."""
+def check_insurance(car_id: int, target_date: date, history_version: int | None = None):
+    """Return whether a car has an active policy covering target_date with logging metadata.
+
+    ``history_version``, when the caller already read the car's version (a
+    conditional request), makes the coverage index answer from data at least
+    that recent. ``version`` in the result is the (history_version,
+    history_updated_at) the answer was built from, for the response's ETag.
+    """
     from app.db.base import datab as db
-    car = db.session.get(Car, car_id)
-    if not car:
-        raise NotFoundError("Car not found")
-    policy = InsurancePolicy.query.filter(
-        InsurancePolicy.car_id == car_id,
-        InsurancePolicy.start_date <= target_date,
-        InsurancePolicy.end_date >= target_date
-    ).first()
-    valid = bool(policy)
+    index = get_coverage_index()
+    if index is not None:
+        found = index.validity(car_id, target_date, history_version)
+        if found is None:
+            raise NotFoundError("Car not found")
+        version, updated_at, policy_id = found
+    else:
+        car = db.session.get(Car, car_id)
+        if not car:
+            raise NotFoundError("Car not found")
+        version, updated_at = car.history_version, car.history_updated_at
+        policy = InsurancePolicy.query.filter(
+            InsurancePolicy.car_id == car_id,
+            InsurancePolicy.start_date <= target_date,
+            InsurancePolicy.end_date >= target_date
+        ).first()
+        policy_id = policy.id if policy else None
+    valid = policy_id is not None
     log.info("insurance.check", car_id=car_id, date=target_date.isoformat(), valid=valid,
-             policy_id=policy.id if policy else None)
+             policy_id=policy_id)
     return {
         "carId": car_id,
         "date": target_date,
-        "valid": valid
-    }
\ No newline at end of file
+        "valid": valid,
+        "version": (version, updated_at),
+    }
+
+def check_insurance_batch(queries: list[tuple[int, date]]):
+    """Resolve many (car_id, date) validity checks with one set-based query.
+
+    The pairs are sent as a VALUES list (columns column1..3 on both SQLite and
+    Postgres), left-joined to car for existence and probed with a correlated
+    EXISTS on ix_policy_car_start_end. Returns one dict per input pair, in input
+    order, with found=False for unknown cars instead of raising NotFoundError.
+    """
+    from app.db.base import datab as db
+    if not queries:
+        return []
+    rows_sql = ", ".join(f"(:i{n}, :c{n}, :d{n})" for n in range(len(queries)))
+    params = []
+    for n, (car_id, target_date) in enumerate(queries):
+        params += [
+            bindparam(f"i{n}", n, type_=Integer),
+            bindparam(f"c{n}", car_id, type_=Integer),
+            bindparam(f"d{n}", target_date, type_=Date),
+        ]
+    q = (text(f"VALUES {rows_sql}")
+         .bindparams(*params)
+         .columns(column("column1", Integer), column("column2", Integer), column("column3", Date))
+         .subquery("q"))
+    covered = (select(InsurancePolicy.id)
+               .where(InsurancePolicy.car_id == q.c.column2,
+                      InsurancePolicy.start_date <= q.c.column3,
+                      InsurancePolicy.end_date >= q.c.column3)
+               .exists())
+    stmt = (select(q.c.column1, Car.id, covered)
+            .select_from(q.outerjoin(Car, Car.id == q.c.column2)))
+    by_idx = {idx: (found_id is not None, bool(valid)) for idx, found_id, valid in db.session.execute(stmt)}
+    results = []
+    for n, (car_id, target_date) in enumerate(queries):
+        found, valid = by_idx[n]
+        results.append({"carId": car_id, "date": target_date, "found": found, "valid": valid if found else None})
+    log.info("insurance.check_batch", size=len(queries), not_found=sum(1 for r in results if not r["found"]))
+    return results
@@ -0,0 +1,41 @@
+"""Entity and per-car aggregate versions behind ETag / Last-Modified.
+
+``Car`` and ``InsurancePolicy`` rows carry ``version``/``updated_at``, bumped by
+their update services. ``Car.history_version``/``history_updated_at`` version a
+car's policies and claims as a whole: every write to them (create, update,
+delete, bulk import) calls ``touch_car_history`` inside the same transaction,
+so history and validity responses can be revalidated by reading one car row.
+"""
+from sqlalchemy import select, update
+from app.db.base import datab as db
+from app.db.models import Car, InsurancePolicy
+from app.services.lease_service import utcnow
+
+def bump(entity):
+    """Advance an ORM instance's own version; the caller commits."""
+    entity.version += 1
+    entity.updated_at = utcnow()
+
+def touch_car_history(*car_ids: int):
+    """Advance the aggregate history version of ``car_ids``; the caller commits."""
+    db.session.execute(
+        update(Car)
+        .where(Car.id.in_(set(car_ids)))
+        .values(history_version=Car.history_version + 1, history_updated_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
+
+def _lookup(*columns, where):
+    return db.session.execute(select(*columns).where(where)).first()
+
+def car_version(car_id: int):
+    """(version, updated_at) of a car, or None if it does not exist."""
+    return _lookup(Car.version, Car.updated_at, where=Car.id == car_id)
+
+def car_history_version(car_id: int):
+    """(history_version, history_updated_at) of a car, or None if it does not exist."""
+    return _lookup(Car.history_version, Car.history_updated_at, where=Car.id == car_id)
+
+def policy_version(policy_id: int):
+    """(version, updated_at) of a policy, or None if it does not exist."""
+    return _lookup(InsurancePolicy.version, InsurancePolicy.updated_at, where=InsurancePolicy.id == policy_id)
@@ -0,0 +1,25 @@
+"""Per-job date watermarks: the last date a background job has fully processed.
+
+Writers call ``set_watermark`` inside the same transaction as the work it
+covers, so a crash never moves the watermark past unprocessed rows.
+"""
+from datetime import date
+from sqlalchemy import insert, select, update
+from app.db.base import datab as db
+from app.db.models import JobWatermark
+from app.services.lease_service import utcnow
+
+def get_watermark(name: str) -> date | None:
+    """Return the stored watermark for ``name`` (None before the first run)."""
+    return db.session.scalar(select(JobWatermark.watermark).where(JobWatermark.name == name))
+
+def set_watermark(name: str, value: date):
+    """Upsert the watermark for ``name``; the caller commits."""
+    moved = db.session.execute(
+        update(JobWatermark)
+        .where(JobWatermark.name == name)
+        .values(watermark=value, updated_at=utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if moved.rowcount == 0:
+        db.session.execute(insert(JobWatermark).values(name=name, watermark=value, updated_at=utcnow()))
@@ -0,0 +1,27 @@
+"""factory_boy factories producing column dicts for bulk seeding.
+
+They mirror the fixtures in ``tests/conftest.py`` (same columns, same VIN
+scheme) but build plain dicts instead of ORM objects so millions of rows can be
+inserted with executemany. Foreign keys and policy/claim dates are filled in by
+``benchmarks.seed``, which controls the data layout.
+"""
+import factory
+
+MAKES = ("Ford", "Toyota", "Volkswagen", "Dacia", "Renault", "BMW", "Skoda", "Honda")
+
+class OwnerRow(factory.DictFactory):
+    name = factory.Faker("name")
+    email = factory.Faker("email")
+
+class CarRow(factory.DictFactory):
+    vin = factory.Sequence(lambda n: f"VIN{n:014d}")
+    make = factory.Faker("random_element", elements=MAKES)
+    model = factory.Faker("word")
+    year_of_manufacture = factory.Faker("random_int", min=1995, max=2025)
+
+class PolicyRow(factory.DictFactory):
+    provider = factory.Faker("company")
+
+class ClaimRow(factory.DictFactory):
+    description = factory.Faker("sentence", nb_words=6)
+    amount = factory.Faker("pydecimal", left_digits=5, right_digits=2, positive=True)
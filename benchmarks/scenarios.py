@@ -0,0 +1,44 @@
+"""Request flows exercised by the benchmark runner.
+
+Each scenario issues one request through a Flask test client and returns the
+response; ``expected`` lists the status codes that count as success. Random
+choices come from the per-worker ``rng`` so runs are reproducible.
+"""
+from dataclasses import dataclass
+from typing import Callable
+from app.api.pagination import encode_cursor
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    call: Callable
+    expected: tuple = (200,)
+
+def _list_cars(client, rng, data):
+    return client.get(f"/api/cars/?limit=50&cursor={encode_cursor(data.random_car(rng))}")
+
+def _create_policy(client, rng, data):
+    # A one-year policy in a random future year: new years insert, repeats hit the overlap check.
+    year = rng.randrange(2030, 2100)
+    return client.post(f"/api/cars/{data.random_car(rng)}/policies", json={
+        "provider": "BenchCo", "startDate": f"{year}-01-01", "endDate": f"{year}-12-31",
+    })
+
+def _insurance_valid(client, rng, data):
+    return client.get(f"/api/cars/{data.random_car(rng)}/insurance-valid?date={data.random_day(rng).isoformat()}")
+
+def _history(client, rng, data):
+    return client.get(f"/api/history/{data.random_car(rng)}")
+
+def _list_claims(client, rng, data):
+    return client.get(f"/api/claims/?limit=50&cursor={encode_cursor(data.random_car(rng))}")
+
+SCENARIOS = {
+    s.name: s for s in (
+        Scenario("list_cars", _list_cars),
+        Scenario("create_policy", _create_policy, expected=(201, 409)),
+        Scenario("insurance_valid", _insurance_valid),
+        Scenario("history", _history),
+        Scenario("list_claims", _list_claims),
+    )
+}
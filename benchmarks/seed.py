@@ -0,0 +1,77 @@
+"""Seed a benchmark database with a dataset of a given size.
+
+Layout for ``rows`` total rows: 2 cars per 9 rows, one owner per two cars, one
+policy per car for each of ``POLICY_YEARS`` (consecutive, non-overlapping) and
+one claim per car inside the last policy year. The schema is dropped and
+recreated first, so ids are contiguous and the target database must be one
+dedicated to benchmarking.
+"""
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from time import perf_counter
+from sqlalchemy import func, insert, select
+from app.db.base import datab as db
+from app.db.models import Car, Claim, InsurancePolicy, Owner
+from benchmarks.factories import CarRow, ClaimRow, OwnerRow, PolicyRow
+
+POLICY_YEARS = (2023, 2024)
+
+@dataclass(frozen=True)
+class Dataset:
+    rows: int
+    car_ids: range
+    first_day: date
+    last_day: date
+    seed_seconds: float
+
+    def random_car(self, rng: random.Random) -> int:
+        return rng.choice(self.car_ids)
+
+    def random_day(self, rng: random.Random) -> date:
+        return self.first_day + timedelta(days=rng.randrange((self.last_day - self.first_day).days + 1))
+
+def _insert(model, rows, batch_size: int) -> range:
+    """executemany ``rows`` into ``model`` in batches; returns the id range created."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            db.session.execute(insert(model), batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+    db.session.commit()
+    lo, hi, count = db.session.execute(select(func.min(model.id), func.max(model.id), func.count())).one()
+    if count and hi - lo + 1 != count:
+        raise RuntimeError(f"{model.__tablename__} ids are not contiguous; seed into an empty database")
+    return range(lo, hi + 1) if count else range(0)
+
+def seed(rows: int, batch_size: int = 5000, random_seed: int = 1) -> Dataset:
+    """Recreate the schema and load roughly ``rows`` rows; run inside an app context."""
+    started = perf_counter()
+    rng = random.Random(random_seed)
+    car_count = max(1, rows * 2 // 9)
+    owner_count = max(1, car_count // 2)
+    db.drop_all()
+    db.create_all()
+
+    owners = _insert(Owner, (OwnerRow() for _ in range(owner_count)), batch_size)
+    cars = _insert(Car, (CarRow(owner_id=owners[i % owner_count]) for i in range(car_count)), batch_size)
+    _insert(InsurancePolicy, (
+        PolicyRow(car_id=car_id, start_date=date(year, 1, 1), end_date=date(year, 12, 31))
+        for car_id in cars for year in POLICY_YEARS
+    ), batch_size)
+    last_year = POLICY_YEARS[-1]
+    _insert(Claim, (
+        ClaimRow(car_id=car_id, claim_date=date(last_year, 1, 1) + timedelta(days=rng.randrange(365)))
+        for car_id in cars
+    ), batch_size)
+    total = owner_count + car_count * (len(POLICY_YEARS) + 2)
+    return Dataset(
+        rows=total,
+        car_ids=cars,
+        first_day=date(POLICY_YEARS[0] - 1, 7, 1),
+        last_day=date(last_year, 12, 31),
+        seed_seconds=perf_counter() - started,
+    )
@@ -7,6 +7,18 @@ if [ -f /app/alembic.ini ]; then
   alembic upgrade head || { echo "Migration failed"; exit 1; }
 fi
 
+# Fresh shared metrics directory so worker snapshots from a previous run are not merged
+if [ -n "${METRICS_MULTIPROC_DIR:-}" ]; then
+  rm -rf "$METRICS_MULTIPROC_DIR"
+  mkdir -p "$METRICS_MULTIPROC_DIR"
+fi
+
+# SERVER_MODE=asgi: uvicorn with async handlers for the hot read routes (app/asgi.py)
+if [ "${SERVER_MODE:-wsgi}" = "asgi" ]; then
+  echo "[entrypoint] Starting uvicorn (ASGI)..."
+  exec uvicorn --factory app.asgi:create_asgi_app --host 0.0.0.0 --port 8000 --workers "${WEB_CONCURRENCY:-3}"
+fi
+
 # Start Gunicorn
 echo "[entrypoint] Starting Gunicorn..."
-exec gunicorn -b 0.0.0.0:8000 -w 3 --threads 2 --timeout 90 'app.main:create_app()'
+exec gunicorn -b 0.0.0.0:8000 -w 3 --threads 2 --timeout 90 'app.main:create_app(start_scheduler=True)'
@@ -13,7 +13,7 @@ config = context.config
 if config.config_file_name:
     fileConfig(config.config_file_name)
 
-# Build the Flask app (no scheduler side-effects if create_app guarded)
+# Build the Flask app (create_app starts no scheduler unless asked to)
 app = create_app()
 target_metadata = db.Model.metadata
 
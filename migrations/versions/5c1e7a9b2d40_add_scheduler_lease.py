@@ -0,0 +1,31 @@
+"""Add scheduler_lease table for leader election of background jobs.
+
+Revision ID: 5c1e7a9b2d40
+Revises: 196503731df8
+Create Date: 2026-10-18 10:20:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e7a9b2d40'
+down_revision = '196503731df8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('scheduler_lease',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('holder', sa.String(length=255), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('last_run_at', sa.DateTime(), nullable=True),
+    sa.Column('last_run_seconds', sa.Float(), nullable=True),
+    sa.Column('last_run_rows', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('scheduler_lease')
@@ -0,0 +1,28 @@
+"""Add job_watermark table for catch-up processing of date-based jobs.
+
+Revision ID: 8a3f0d6c1e27
+Revises: 5c1e7a9b2d40
+Create Date: 2026-10-18 10:45:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8a3f0d6c1e27'
+down_revision = '5c1e7a9b2d40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_watermark',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('watermark', sa.Date(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('job_watermark')
@@ -0,0 +1,25 @@
+"""Add a covering claim index for date-bounded claim statistics.
+
+(claim_date, car_id, amount) lets GET /api/claims/stats range-scan claims by
+date and aggregate amounts per car without reading the table.
+
+Revision ID: a7d2c5e8f140
+Revises: f3a8c61d09e4
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d2c5e8f140'
+down_revision = 'f3a8c61d09e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_claim_date_car_amount', 'claim', ['claim_date', 'car_id', 'amount'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_claim_date_car_amount', table_name='claim')
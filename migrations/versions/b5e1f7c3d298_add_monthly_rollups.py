@@ -0,0 +1,46 @@
+"""Add the monthly claim / exposure rollups and their refresh queue.
+
+Also indexes insurance_policy.updated_at, which the refresh scans from its
+watermark. Fill the rollups with ``flask rollups refresh`` (the first refresh
+rebuilds every month) or let the scheduled job do it.
+
+Revision ID: b5e1f7c3d298
+Revises: a7d2c5e8f140
+Create Date: 2026-10-18 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e1f7c3d298'
+down_revision = 'a7d2c5e8f140'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'monthly_rollup',
+        sa.Column('month', sa.Date(), primary_key=True),
+        sa.Column('provider', sa.String(length=120), primary_key=True),
+        sa.Column('make', sa.String(length=120), primary_key=True),
+        sa.Column('insured_car_days', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('claim_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('claim_total', sa.Numeric(16, 2), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    )
+    op.create_table(
+        'rollup_refresh_queue',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('month', sa.Date(), nullable=False),
+    )
+    op.create_index('ix_rollup_refresh_queue_month', 'rollup_refresh_queue', ['month'])
+    op.create_index('ix_policy_updated_at', 'insurance_policy', ['updated_at'])
+
+
+def downgrade():
+    op.drop_index('ix_policy_updated_at', table_name='insurance_policy')
+    op.drop_index('ix_rollup_refresh_queue_month', table_name='rollup_refresh_queue')
+    op.drop_table('rollup_refresh_queue')
+    op.drop_table('monthly_rollup')
@@ -0,0 +1,28 @@
+"""Add a partial index over policies whose expiry is not logged yet.
+
+The expiry job scans every unlogged policy ending up to today (not only those
+after its watermark), ordered by (end_date, id); the index holds only those rows.
+
+Revision ID: c8f4a2d6e913
+Revises: b5e1f7c3d298
+Create Date: 2026-10-18 18:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8f4a2d6e913'
+down_revision = 'b5e1f7c3d298'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    unlogged = sa.text('logged_expiry_at IS NULL')
+    op.create_index('ix_policy_unlogged_end', 'insurance_policy', ['end_date', 'id'],
+                    postgresql_where=unlogged, sqlite_where=unlogged)
+
+
+def downgrade():
+    op.drop_index('ix_policy_unlogged_end', table_name='insurance_policy')
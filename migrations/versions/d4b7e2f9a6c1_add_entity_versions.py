@@ -0,0 +1,43 @@
+"""Add version / updated_at columns backing ETag and Last-Modified.
+
+car gets its own version plus an aggregate history_version for its policies
+and claims; insurance_policy gets its own version. Existing rows start at 1.
+
+Revision ID: d4b7e2f9a6c1
+Revises: 8a3f0d6c1e27
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4b7e2f9a6c1'
+down_revision = '8a3f0d6c1e27'
+branch_labels = None
+depends_on = None
+
+
+def _version_columns(prefix=''):
+    return [
+        sa.Column(f'{prefix}version', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column(f'{prefix}updated_at', sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+    ]
+
+
+def upgrade():
+    with op.batch_alter_table('car') as batch_op:
+        for column in _version_columns() + _version_columns('history_'):
+            batch_op.add_column(column)
+    with op.batch_alter_table('insurance_policy') as batch_op:
+        for column in _version_columns():
+            batch_op.add_column(column)
+
+
+def downgrade():
+    with op.batch_alter_table('insurance_policy') as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('version')
+    with op.batch_alter_table('car') as batch_op:
+        for name in ('history_updated_at', 'history_version', 'updated_at', 'version'):
+            batch_op.drop_column(name)
@@ -0,0 +1,74 @@
+"""Enforce non-overlapping policies per car in the database.
+
+PostgreSQL gets an EXCLUDE constraint over (car_id, daterange(start, end, '[]'))
+backed by a GiST index (needs btree_gist for the integer equality). SQLite gets
+BEFORE INSERT/UPDATE triggers doing the same check plus car existence; SQLite
+serialises writers, so the check and the write are atomic.
+
+Existing overlapping rows must be resolved before upgrading.
+
+Revision ID: e9c2a4f17b35
+Revises: d4b7e2f9a6c1
+Create Date: 2026-10-18 13:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9c2a4f17b35'
+down_revision = 'd4b7e2f9a6c1'
+branch_labels = None
+depends_on = None
+
+# Schema as of this revision (kept here so later model edits cannot change it)
+OVERLAP_CONSTRAINT = 'ex_policy_car_period'
+
+SQLITE_TRIGGERS = {
+    'trg_policy_no_overlap_insert': '''
+    CREATE TRIGGER trg_policy_no_overlap_insert BEFORE INSERT ON insurance_policy
+    BEGIN
+        SELECT RAISE(ABORT, 'fk_policy_car')
+        WHERE NOT EXISTS (SELECT 1 FROM car WHERE car.id = NEW.car_id);
+        SELECT RAISE(ABORT, 'ex_policy_car_period')
+        WHERE EXISTS (SELECT 1 FROM insurance_policy p
+                      WHERE p.car_id = NEW.car_id AND p.id IS NOT NEW.id
+                        AND p.start_date <= NEW.end_date AND p.end_date >= NEW.start_date);
+    END
+    ''',
+    'trg_policy_no_overlap_update': '''
+    CREATE TRIGGER trg_policy_no_overlap_update BEFORE UPDATE OF car_id, start_date, end_date ON insurance_policy
+    BEGIN
+        SELECT RAISE(ABORT, 'fk_policy_car')
+        WHERE NOT EXISTS (SELECT 1 FROM car WHERE car.id = NEW.car_id);
+        SELECT RAISE(ABORT, 'ex_policy_car_period')
+        WHERE EXISTS (SELECT 1 FROM insurance_policy p
+                      WHERE p.car_id = NEW.car_id AND p.id IS NOT NEW.id
+                        AND p.start_date <= NEW.end_date AND p.end_date >= NEW.start_date);
+    END
+    ''',
+}
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+        op.create_exclude_constraint(
+            OVERLAP_CONSTRAINT, 'insurance_policy',
+            ('car_id', '='),
+            (sa.text("daterange(start_date, end_date, '[]')"), '&&'),
+            using='gist',
+        )
+    elif dialect == 'sqlite':
+        for ddl in SQLITE_TRIGGERS.values():
+            op.execute(ddl)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_constraint(OVERLAP_CONSTRAINT, 'insurance_policy', type_='exclude')
+    elif dialect == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            op.execute(f'DROP TRIGGER IF EXISTS {name}')
@@ -0,0 +1,41 @@
+"""Add the car_coverage_summary projection.
+
+Rows are filled by writes and by ``flask coverage-summary rebuild``; run the
+rebuild once after upgrading (until then the endpoint computes missing rows on
+the fly).
+
+Revision ID: f3a8c61d09e4
+Revises: e9c2a4f17b35
+Create Date: 2026-10-18 14:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8c61d09e4'
+down_revision = 'e9c2a4f17b35'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'car_coverage_summary',
+        sa.Column('car_id', sa.Integer(), sa.ForeignKey('car.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('as_of', sa.Date(), nullable=False),
+        sa.Column('current_policy_id', sa.Integer(), nullable=True),
+        sa.Column('provider', sa.String(length=120), nullable=True),
+        sa.Column('coverage_end', sa.Date(), nullable=True),
+        sa.Column('next_gap', sa.Date(), nullable=True),
+        sa.Column('claim_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('claim_total', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('last_claim_date', sa.Date(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_car_coverage_summary_as_of', 'car_coverage_summary', ['as_of'])
+
+
+def downgrade():
+    op.drop_index('ix_car_coverage_summary_as_of', table_name='car_coverage_summary')
+    op.drop_table('car_coverage_summary')
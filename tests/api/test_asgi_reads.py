@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+import httpx
+import pytest
+import pytest_asyncio
+from asgiref.wsgi import WsgiToAsgi
+from app.asgi import ASYNC_READS, PooledWsgiToAsgi, create_asgi_app
+from app.db.base import datab as db
+from app.db.pool import async_database_url
+
+@pytest_asyncio.fixture
+async def asgi(tmp_path):
+    app = create_asgi_app(db_url=f"sqlite:///{tmp_path / 'asgi.db'}")
+    with app.flask_app.app_context():
+        db.create_all()
+    yield app
+    await app.engine.dispose()
+    app.wsgi.shutdown()
+
+def _client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://testserver")
+
+async def _seed(client):
+    owner = (await client.post("/api/owners/", json={"name": "Ana", "email": "ana@example.com"})).json()
+    car = (await client.post("/api/cars/", json={"vin": "ASGI-1", "make": "VW", "model": "Golf",
+                                                 "yearOfManufacture": 2020, "ownerId": owner["id"]})).json()
+    policy = (await client.post(f"/api/cars/{car['id']}/policies",
+                                json={"provider": "ACME", "startDate": "2024-01-01", "endDate": "2024-12-31"})).json()
+    return car["id"], policy["id"]
+
+async def test_async_reads_match_wsgi_responses(asgi):
+    async with _client(asgi) as client, _client(WsgiToAsgi(asgi.flask_app)) as wsgi:
+        car_id, policy_id = await _seed(client)
+        urls = {
+            "car": f"/api/cars/{car_id}",
+            "policy": f"/api/policies/{policy_id}",
+            "history": f"/api/history/{car_id}?format=compact",
+            "validity": f"/api/cars/{car_id}/insurance-valid?date=2024-05-01",
+        }
+        for route, url in urls.items():
+            served = ASYNC_READS.value(route=route)
+            r, expected = await client.get(url), await wsgi.get(url)
+            assert ASYNC_READS.value(route=route) == served + 1
+            assert (r.status_code, r.content) == (expected.status_code, expected.content)
+            assert r.headers["ETag"] == expected.headers["ETag"] and "X-Request-ID" in r.headers
+            assert (await client.get(url, headers={"If-None-Match": r.headers["ETag"]})).status_code == 304
+        for url in (f"/api/cars/{car_id + 1}", f"/api/history/{car_id + 1}",
+                    f"/api/cars/{car_id}/insurance-valid", f"/api/history/{car_id}?limit=0"):
+            r, expected = await client.get(url), await wsgi.get(url)
+            assert (r.status_code, r.content) == (expected.status_code, expected.content)
+        head = await client.head(urls["car"])
+        assert head.status_code == 200 and head.content == b""
+
+async def test_writes_and_streams_go_through_wsgi(asgi):
+    async with _client(asgi) as client:
+        car_id, _ = await _seed(client)
+        history = await client.get(f"/api/history/{car_id}")
+        served = ASYNC_READS.value(route="history")
+        claim = await client.post(f"/api/claims/car/{car_id}",
+                                  json={"claimDate": "2024-03-02", "description": "Dent", "amount": 10, "carId": car_id})
+        assert claim.status_code == 201
+        r = await client.get(f"/api/history/{car_id}", headers={"If-None-Match": history.headers["ETag"]})
+        assert r.status_code == 200 and len(r.json()) == 2
+        stream = await client.get(f"/api/history/{car_id}", headers={"Accept": "application/x-ndjson"})
+        assert stream.status_code == 200 and len(stream.text.splitlines()) == 2
+        assert ASYNC_READS.value(route="history") == served + 1
+
+async def test_concurrent_reads_share_the_async_pool(asgi):
+    async with _client(asgi) as client:
+        car_id, _ = await _seed(client)
+        responses = await asyncio.gather(*(
+            client.get(f"/api/cars/{car_id}/insurance-valid?date=2024-{m:02d}-01") for m in range(1, 13)
+        ))
+        assert [r.json()["valid"] for r in responses] == [True] * 12
+
+async def test_wsgi_fallback_requests_run_concurrently():
+    threads = set()
+
+    def slow(environ, start_response):
+        threads.add(threading.get_ident())
+        time.sleep(0.3)
+        start_response("200 OK", [("Content-Type", "text/plain")])
+        return [b"ok"]
+
+    app = PooledWsgiToAsgi(slow, threads=2)
+    try:
+        async with _client(app) as client:
+            started = time.perf_counter()
+            responses = await asyncio.gather(client.post("/a"), client.post("/b"))
+            elapsed = time.perf_counter() - started
+    finally:
+        app.shutdown()
+    assert [r.text for r in responses] == ["ok", "ok"]
+    assert len(threads) == 2 and elapsed < 0.55
+
+def test_async_database_url():
+    assert async_database_url("postgresql+psycopg2://u:p@db/x") == "postgresql+asyncpg://u:p@db/x"
+    assert async_database_url("sqlite:///data.db") == "sqlite+aiosqlite:///data.db"
+    with pytest.raises(ValueError):
+        async_database_url("mssql+pyodbc://db/x")
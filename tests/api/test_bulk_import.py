@@ -0,0 +1,80 @@
+import json
+import pytest
+from datetime import date
+from sqlalchemy import func, select
+from app.db.base import datab as db
+from app.db.models import Owner, Car, InsurancePolicy, Claim
+
+def _ndjson(*records):
+    return "\n".join(r if isinstance(r, str) else json.dumps(r) for r in records) + "\n"
+
+def _count(model):
+    return db.session.scalar(select(func.count()).select_from(model))
+
+RECORDS = (
+    {"type": "owner", "ref": "o1", "name": "Ana", "email": "ana@example.com"},
+    {"type": "car", "vin": "BULK-1", "make": "VW", "model": "Golf", "yearOfManufacture": 2019, "ownerRef": "o1"},
+    {"type": "car", "vin": "BULK-1", "make": "VW", "model": "Polo", "yearOfManufacture": 2020, "ownerRef": "o1"},
+    {"type": "policy", "vin": "BULK-1", "provider": "ACME", "startDate": "2024-01-01", "endDate": "2024-06-30"},
+    {"type": "policy", "vin": "BULK-1", "provider": "ACME", "startDate": "2024-06-01", "endDate": "2024-12-31"},
+    {"type": "claim", "vin": "BULK-1", "claimDate": "2024-02-01", "description": "Dent", "amount": 120.5},
+    {"type": "claim", "vin": "NOPE", "claimDate": "2024-02-01", "description": "Dent", "amount": 10},
+    {"type": "claim", "vin": "BULK-1", "claimDate": "2024-02-01", "description": " ", "amount": 10},
+    "{not json",
+    {"type": "boat"},
+)
+
+@pytest.mark.asyncio
+async def test_bulk_import_reports_per_line_errors(async_client):
+    r = await async_client.post("/api/bulk-import", content=_ndjson(*RECORDS), headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200
+    report = r.json()
+    assert report["processed"] == len(RECORDS)
+    assert report["inserted"] == {"owners": 1, "cars": 1, "policies": 1, "claims": 1}
+    assert {e["line"]: e["detail"] for e in report["errors"]} == {
+        3: "VIN already exists",
+        5: "Policy dates overlap existing policy",
+        7: "Car not found",
+        8: "Validation failed",
+        9: "Invalid JSON",
+        10: "type must be one of: owner, car, policy, claim",
+    }
+    car = db.session.scalar(select(Car).where(Car.vin == "BULK-1"))
+    assert car.owner.name == "Ana" and car.model == "Golf"
+    assert [(p.start_date, p.end_date) for p in car.insurance_policies] == [(date(2024, 1, 1), date(2024, 6, 30))]
+
+@pytest.mark.asyncio
+async def test_bulk_import_checks_existing_rows(async_client, car_factory, policy_factory):
+    car = car_factory()
+    policy_factory(car=car, start=date(2024, 1, 1), end=date(2024, 12, 31))
+    body = _ndjson(
+        {"type": "car", "vin": car.vin, "make": "X", "model": "Y", "yearOfManufacture": 2000, "ownerId": car.owner_id},
+        {"type": "car", "vin": "FRESH", "make": "X", "model": "Y", "yearOfManufacture": 2000, "ownerId": 999999},
+        {"type": "policy", "carId": car.id, "provider": "B", "startDate": "2024-03-01", "endDate": "2024-03-31"},
+        {"type": "policy", "carId": car.id, "provider": "B", "startDate": "2025-01-01", "endDate": "2025-01-31"},
+    )
+    report = (await async_client.post("/api/bulk-import", content=body)).json()
+    assert [(e["line"], e["detail"]) for e in report["errors"]] == [
+        (1, "VIN already exists"), (2, "Owner not found"), (3, "Policy dates overlap existing policy"),
+    ]
+    assert report["inserted"]["policies"] == 1
+
+def test_bulk_import_cli_batches(app, tmp_path, sql_statements, monkeypatch):
+    from app.core import logging as app_logging
+    monkeypatch.setattr(app_logging._console, "to_stderr", False)  # restored after the command flips it
+    lines = [{"type": "owner", "ref": "o", "name": "Bulk"}]
+    lines += [
+        {"type": "car", "vin": f"V{i}", "make": "M", "model": "N", "yearOfManufacture": 2010, "ownerRef": "o"}
+        for i in range(40)
+    ]
+    lines += [{"type": "claim", "vin": f"V{i}", "claimDate": "2024-05-05", "description": "x", "amount": 1} for i in range(40)]
+    path = tmp_path / "load.ndjson"
+    path.write_text(_ndjson(*lines))
+    result = app.test_cli_runner().invoke(args=["bulk-import", str(path), "--batch-size", "25"])
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.stdout)
+    assert report["errorCount"] == 0
+    assert report["inserted"] == {"owners": 1, "cars": 40, "policies": 0, "claims": 40}
+    assert (_count(Owner), _count(Car), _count(Claim), _count(InsurancePolicy)) == (1, 40, 40, 0)
+    inserts = [s for s in sql_statements if s.startswith("INSERT")]
+    assert len(inserts) <= 10  # 4 per batch of records, plus one car_coverage_summary INSERT per batch
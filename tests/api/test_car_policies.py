@@ -0,0 +1,37 @@
+import pytest
+from datetime import date
+
+
+@pytest.mark.asyncio
+async def test_car_policies_only_that_car(async_client, car_factory, policy_factory):
+    car = car_factory()
+    other = car_factory()
+    p1 = policy_factory(car=car, start=date(2024, 1, 1), end=date(2024, 6, 30))
+    p2 = policy_factory(car=car, start=date(2024, 7, 1), end=date(2024, 12, 31))
+    policy_factory(car=other, start=date(2024, 1, 1), end=date(2024, 12, 31))
+    r = await async_client.get(f"/api/cars/{car.id}/policies")
+    assert r.status_code == 200
+    assert r.headers["Content-Type"] == "application/json"
+    assert [p["id"] for p in r.json()] == [p1.id, p2.id]
+
+@pytest.mark.asyncio
+async def test_car_policies_filters(async_client, car_factory, policy_factory):
+    car = car_factory()
+    p1 = policy_factory(car=car, start=date(2024, 1, 1), end=date(2024, 6, 30), provider="A")
+    p2 = policy_factory(car=car, start=date(2024, 7, 1), end=date(2024, 12, 31), provider="B")
+    p3 = policy_factory(car=car, start=date(2025, 1, 1), end=date(2025, 6, 30), provider="A")
+    base = f"/api/cars/{car.id}/policies"
+    r = await async_client.get(f"{base}?activeOn=2024-08-15")
+    assert [p["id"] for p in r.json()] == [p2.id]
+    r = await async_client.get(f"{base}?from=2024-06-01&to=2025-01-01")
+    assert [p["id"] for p in r.json()] == [p1.id, p2.id, p3.id]
+    r = await async_client.get(f"{base}?from=2024-07-01&provider=A")
+    assert [p["id"] for p in r.json()] == [p3.id]
+
+@pytest.mark.asyncio
+async def test_car_policies_bad_filter(async_client, car_factory):
+    car = car_factory()
+    r = await async_client.get(f"/api/cars/{car.id}/policies?from=2024-02-01&to=2024-01-01")
+    assert r.status_code == 400
+    r = await async_client.get(f"/api/cars/{car.id}/policies?activeOn=notadate")
+    assert r.status_code == 400
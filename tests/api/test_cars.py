@@ -4,7 +4,7 @@ import pytest
 @pytest.mark.asyncio
 async def test_list_cars(async_client, car_factory):
     car = car_factory()  # ensures at least one car with owner
-    r = await async_client.get("/api/cars/")
+    r = await async_client.get("/api/cars/?include=owner")
     assert r.status_code == 200
     data = r.json()
     assert isinstance(data, list)
@@ -35,3 +35,26 @@ async def test_create_car_camelcase(async_client, owner_factory):
     assert data["vin"] == payload["vin"]
     assert data["yearOfManufacture"] == 2024
     assert data["ownerId"] == owner.id
+
+@pytest.mark.asyncio
+async def test_list_cars_without_include_omits_owner(async_client, car_factory):
+    car_factory()
+    r = await async_client.get("/api/cars/")
+    assert r.status_code == 200
+    assert all("owner" not in c for c in r.json())
+
+@pytest.mark.asyncio
+async def test_list_cars_unknown_include(async_client):
+    r = await async_client.get("/api/cars/?include=claims")
+    assert r.status_code == 400
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", ["", "?include=owner"])
+async def test_list_cars_single_statement(async_client, car_factory, owner_factory, sql_statements, query):
+    for i in range(5):
+        car_factory(owner=owner_factory(name=f"Owner {i}"))
+    sql_statements.clear()
+    r = await async_client.get(f"/api/cars/{query}")
+    assert r.status_code == 200 and len(r.json()) == 5
+    assert len(sql_statements) == 1, sql_statements
+    assert ("JOIN owner" in sql_statements[0]) == bool(query)
@@ -0,0 +1,56 @@
+from datetime import date
+from sqlalchemy.dialects import postgresql
+from app.core.config import get_settings
+from app.db.models import Claim
+from app.services import claim_stats_service
+
+def _seed(car_factory, policy_factory, claim_factory):
+    ford, vw = car_factory(), car_factory(make="VW", model="Golf")
+    policy_factory(ford, date(2024, 1, 1), date(2024, 6, 30), provider="ACME")
+    for day, amount in ((date(2024, 1, 5), 100), (date(2024, 1, 20), 300), (date(2024, 2, 1), 200), (date(2024, 8, 1), 50)):
+        claim_factory(ford, day, amount=amount)
+    for day, amount in ((date(2024, 1, 10), 10), (date(2024, 2, 10), 1000)):
+        claim_factory(vw, day, amount=amount)
+    return ford, vw
+
+async def test_stats_grouped_by_car_and_provider(async_client, car_factory, policy_factory, claim_factory):
+    ford, vw = _seed(car_factory, policy_factory, claim_factory)
+    r = await async_client.get("/api/claims/stats?groupBy=car,provider")
+    assert r.status_code == 200
+    body = r.json()
+    assert body["groupBy"] == ["car", "provider"] and body["truncated"] is False
+    groups = {(g["carId"], g["provider"]): g for g in body["groups"]}
+    assert set(groups) == {(ford.id, None), (ford.id, "ACME"), (vw.id, None)}
+    acme = groups[(ford.id, "ACME")]
+    assert (acme["count"], acme["sum"], acme["avg"], acme["p50"], acme["p95"]) == (3, "600.00", "200.00", "200.00", "300.00")
+    assert groups[(ford.id, None)]["count"] == 1 and groups[(vw.id, None)]["p50"] == "10.00"
+
+async def test_stats_by_month_and_model_within_dates(async_client, car_factory, policy_factory, claim_factory):
+    _seed(car_factory, policy_factory, claim_factory)
+    r = await async_client.get("/api/claims/stats?groupBy=month,model&from=2024-01-01&to=2024-01-31")
+    body = r.json()
+    assert (body["from"], body["to"]) == ("2024-01-01", "2024-01-31")
+    assert [(g["month"], g["make"], g["model"], g["count"], g["sum"]) for g in body["groups"]] == [
+        ("2024-01", "Ford", "Focus", 2, "400.00"), ("2024-01", "VW", "Golf", 1, "10.00")]
+
+    totals = (await async_client.get("/api/claims/stats?groupBy=owner")).json()["groups"]
+    assert sum(g["count"] for g in totals) == 6
+    overall = (await async_client.get("/api/claims/stats")).json()["groups"]
+    assert len(overall) == 1 and overall[0]["count"] == 6 and overall[0]["avg"] == "276.67"
+    assert overall[0]["p50"] == "100.00" and overall[0]["p95"] == "1000.00"
+
+async def test_stats_validation_and_truncation(async_client, car_factory, policy_factory, claim_factory, monkeypatch):
+    _seed(car_factory, policy_factory, claim_factory)
+    assert (await async_client.get("/api/claims/stats?groupBy=color")).status_code == 400
+    assert (await async_client.get("/api/claims/stats?from=2024-02-01&to=2024-01-01")).status_code == 400
+    empty = (await async_client.get("/api/claims/stats?from=2030-01-01")).json()
+    assert empty["groups"] == []
+    monkeypatch.setattr(get_settings(), "CLAIM_STATS_MAX_GROUPS", 1)
+    body = (await async_client.get("/api/claims/stats?groupBy=car")).json()
+    assert len(body["groups"]) == 1 and body["truncated"] is True
+
+def test_postgres_uses_ordered_set_aggregates():
+    keys = claim_stats_service._dimensions("postgresql")["month"]
+    stmt = claim_stats_service._ordered_set_stmt(keys, Claim.__table__, [])
+    sql = str(stmt.compile(dialect=postgresql.dialect()))
+    assert "percentile_disc" in sql and "WITHIN GROUP (ORDER BY claim.amount)" in sql and "to_char" in sql
@@ -0,0 +1,96 @@
+import pytest
+from datetime import date
+
+@pytest.mark.asyncio
+async def test_car_item_etag_and_304_with_one_lookup(async_client, car_factory, sql_statements):
+    from app.db.base import datab as db
+    car_id = car_factory().id
+    db.session.expunge_all()
+    sql_statements.clear()
+    first = await async_client.get(f"/api/cars/{car_id}")
+    etag = first.headers["ETag"]
+    assert etag == f'"car-{car_id}-v1"' and "Last-Modified" in first.headers
+    # Without validators the tag comes from the car row the body was built from
+    assert len(sql_statements) == 1 and "car.version" in sql_statements[0] and "JOIN owner" in sql_statements[0]
+
+    sql_statements.clear()
+    r = await async_client.get(f"/api/cars/{car_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 304 and r.content == b"" and r.headers["ETag"] == etag
+    assert len(sql_statements) == 1 and "car.version" in sql_statements[0]
+    r = await async_client.get(f"/api/cars/{car_id}", headers={"If-Modified-Since": first.headers["Last-Modified"]})
+    assert r.status_code == 304
+
+    await async_client.put(f"/api/cars/{car_id}", json={"make": "Opel"})
+    r = await async_client.get(f"/api/cars/{car_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200 and r.json()["make"] == "Opel"
+    assert r.headers["ETag"] == f'"car-{car_id}-v2"'
+    assert (await async_client.get("/api/cars/999999", headers={"If-None-Match": etag})).status_code == 404
+
+@pytest.mark.asyncio
+async def test_policy_item_version_bumps_on_update(async_client, policy_factory):
+    p = policy_factory(start=date(2024, 1, 1), end=date(2024, 6, 30))
+    etag = (await async_client.get(f"/api/policies/{p.id}")).headers["ETag"]
+    assert (await async_client.get(f"/api/policies/{p.id}", headers={"If-None-Match": etag})).status_code == 304
+    await async_client.put(f"/api/policies/{p.id}", json={"provider": "Other"})
+    assert (await async_client.get(f"/api/policies/{p.id}", headers={"If-None-Match": etag})).status_code == 200
+
+@pytest.mark.asyncio
+async def test_history_and_validity_follow_car_aggregate_version(async_client, car_factory):
+    car = car_factory()
+    car_id = car.id
+    history = await async_client.get(f"/api/history/{car_id}")
+    validity = await async_client.get(f"/api/cars/{car_id}/insurance-valid?date=2024-03-01")
+    other_query = await async_client.get(f"/api/history/{car_id}?from=2024-01-01")
+    assert history.headers["ETag"] != other_query.headers["ETag"]
+    assert validity.json()["valid"] is False
+
+    async def unchanged():
+        h = await async_client.get(f"/api/history/{car_id}", headers={"If-None-Match": history.headers["ETag"]})
+        v = await async_client.get(f"/api/cars/{car_id}/insurance-valid?date=2024-03-01",
+                                   headers={"If-None-Match": validity.headers["ETag"]})
+        return h.status_code == 304, v.status_code == 304
+
+    assert await unchanged() == (True, True)
+    await async_client.post(f"/api/cars/{car_id}/policies",
+                            json={"provider": "ACME", "startDate": "2024-01-01", "endDate": "2024-12-31"})
+    assert await unchanged() == (False, False)
+
+    history = await async_client.get(f"/api/history/{car_id}")
+    validity = await async_client.get(f"/api/cars/{car_id}/insurance-valid?date=2024-03-01")
+    assert validity.json()["valid"] is True
+    claim = await async_client.post(f"/api/claims/car/{car_id}",
+                                    json={"claimDate": "2024-03-02", "description": "Dent", "amount": 10, "carId": car_id})
+    assert claim.status_code == 201
+    assert await unchanged() == (False, False)
+
+@pytest.mark.asyncio
+async def test_bulk_import_touches_history_version(async_client, car_factory):
+    car = car_factory()
+    etag = (await async_client.get(f"/api/history/{car.id}")).headers["ETag"]
+    body = f'{{"type": "claim", "carId": {car.id}, "claimDate": "2024-02-01", "description": "Dent", "amount": 5}}\n'
+    r = await async_client.post("/api/bulk-import", content=body, headers={"Content-Type": "application/x-ndjson"})
+    assert r.json()["inserted"]["claims"] == 1
+    assert (await async_client.get(f"/api/history/{car.id}", headers={"If-None-Match": etag})).status_code == 200
+
+@pytest.mark.asyncio
+async def test_validity_tag_never_newer_than_coverage_index(async_client, car_factory, monkeypatch):
+    from app.core.config import get_settings
+    from app.db.base import datab as db
+    from app.db.models import InsurancePolicy
+    from app.services import coverage_index as ci
+    from app.services.version_service import touch_car_history
+    monkeypatch.setattr(get_settings(), "COVERAGE_INDEX_ENABLED", True)
+    ci.reset_coverage_index()
+    car_id = car_factory().id
+    url = f"/api/cars/{car_id}/insurance-valid?date=2024-03-01"
+    first = await async_client.get(url)
+    assert first.json()["valid"] is False
+
+    # Another worker commits a policy: the version moves, this worker's index does not hear of it
+    db.session.add(InsurancePolicy(car_id=car_id, provider="X", start_date=date(2024, 1, 1), end_date=date(2024, 12, 31)))
+    touch_car_history(car_id)
+    db.session.commit()
+    r = await async_client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert r.status_code == 200 and r.json()["valid"] is True and r.headers["ETag"] != first.headers["ETag"]
+    assert (await async_client.get(url, headers={"If-None-Match": r.headers["ETag"]})).status_code == 304
+    ci.reset_coverage_index()
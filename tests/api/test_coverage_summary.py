@@ -0,0 +1,82 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from app.db.base import datab as db
+from app.db.models import CarCoverageSummary
+from app.services import coverage_summary_service as summaries
+
+TODAY = date.today()
+
+def _stored(car_id):
+    row = db.session.get(CarCoverageSummary, car_id)
+    db.session.refresh(row)
+    return {k: getattr(row, k) for k in ("as_of", *summaries.POLICY_COLUMNS, "claim_count", "claim_total", "last_claim_date")}
+
+def _recomputed(car_id):
+    row = summaries.compute_rows([car_id], TODAY)[0]
+    row.pop("car_id")
+    return row
+
+async def test_summary_follows_policy_and_claim_writes(async_client, car_factory):
+    car_id = car_factory().id
+    r = await async_client.get(f"/api/cars/{car_id}/coverage-summary")
+    assert r.status_code == 200 and r.json()["insured"] is False and r.json()["claimCount"] == 0
+    assert db.session.get(CarCoverageSummary, car_id) is None  # computed on the fly until a write
+
+    first = await async_client.post(f"/api/cars/{car_id}/policies", json={
+        "provider": "ACME", "startDate": (TODAY - timedelta(days=10)).isoformat(),
+        "endDate": (TODAY + timedelta(days=5)).isoformat()})
+    await async_client.post(f"/api/cars/{car_id}/policies", json={
+        "provider": "Next", "startDate": (TODAY + timedelta(days=6)).isoformat(),
+        "endDate": (TODAY + timedelta(days=20)).isoformat()})
+    claim_ids = []
+    for days_ago, amount in ((3, 100), (1, 50.5)):
+        c = await async_client.post(f"/api/claims/car/{car_id}", json={
+            "claimDate": (TODAY - timedelta(days=days_ago)).isoformat(), "description": "Dent", "amount": amount, "carId": car_id})
+        claim_ids.append(c.json()["id"])
+    stored = _stored(car_id)
+    assert stored == _recomputed(car_id)
+    assert (stored["current_policy_id"], stored["provider"], stored["coverage_end"], stored["next_gap"]) == (
+        first.json()["id"], "ACME", TODAY + timedelta(days=5), TODAY + timedelta(days=21))
+    assert (stored["claim_count"], stored["claim_total"], stored["last_claim_date"]) == (
+        2, Decimal("150.50"), TODAY - timedelta(days=1))
+
+    await async_client.delete(f"/api/claims/{claim_ids[1]}")
+    await async_client.delete(f"/api/policies/{first.json()['id']}")
+    stored = _stored(car_id)
+    assert stored == _recomputed(car_id)
+    assert stored["current_policy_id"] is None and stored["claim_count"] == 1
+    assert stored["last_claim_date"] == TODAY - timedelta(days=3)
+
+    body = (await async_client.get(f"/api/cars/{car_id}/coverage-summary")).json()
+    assert body["insured"] is False and body["claimTotal"] == "100.00" and body["carId"] == car_id
+    await async_client.delete(f"/api/cars/{car_id}")
+    assert db.session.get(CarCoverageSummary, car_id) is None
+    assert (await async_client.get(f"/api/cars/{car_id}/coverage-summary")).status_code == 404
+
+def test_roll_forward_recomputes_only_changed_cars(app, car_factory, policy_factory, monkeypatch):
+    ending, steady, starting = car_factory(), car_factory(), car_factory()
+    policy_factory(ending, TODAY - timedelta(days=30), TODAY)
+    policy_factory(steady, TODAY - timedelta(days=30), TODAY + timedelta(days=30))
+    policy_factory(starting, TODAY + timedelta(days=1), TODAY + timedelta(days=30))
+    ids = [ending.id, steady.id, starting.id]
+    assert summaries.rebuild() == 3
+    assert [_stored(i)["current_policy_id"] is not None for i in ids] == [True, True, False]
+
+    tomorrow = TODAY + timedelta(days=1)
+    monkeypatch.setattr(summaries, "_today", lambda: tomorrow)
+    live = summaries.get_summary(ending.id)
+    assert live.as_of == tomorrow and live.current_policy_id is None  # stale row answered live
+    assert summaries.roll_forward() == 2
+    rows = [_stored(i) for i in ids]
+    assert [r["as_of"] for r in rows] == [tomorrow] * 3
+    assert [r["current_policy_id"] is not None for r in rows] == [False, True, True]
+    assert rows[2]["next_gap"] == TODAY + timedelta(days=31)
+
+def test_rebuild_cli(app, car_factory, claim_factory):
+    car = car_factory()
+    claim_factory(car, TODAY, amount=7)
+    db.session.query(CarCoverageSummary).delete()
+    db.session.commit()
+    result = app.test_cli_runner().invoke(args=["coverage-summary", "rebuild"])
+    assert result.exit_code == 0 and "Rebuilt 1 coverage summaries" in result.output
+    assert _stored(car.id)["claim_total"] == Decimal("7.00")
@@ -0,0 +1,19 @@
+import pytest
+from sqlalchemy.exc import OperationalError
+from app.db.base import datab as db
+
+@pytest.mark.asyncio
+async def test_liveness_and_readiness(async_client):
+    assert (await async_client.get("/health")).json() == {"status": "ok"}
+    r = await async_client.get("/health/ready")
+    assert r.status_code == 200
+    assert r.json()["checks"]["database"]["status"] == "ok"
+
+@pytest.mark.asyncio
+async def test_readiness_fails_when_database_unreachable(async_client, monkeypatch):
+    def broken(*args, **kwargs):
+        raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+    monkeypatch.setattr(db.session, "execute", broken)
+    r = await async_client.get("/health/ready")
+    assert r.status_code == 503
+    assert r.json() == {"status": "unavailable", "checks": {"database": {"status": "error", "error": "OperationalError"}}}
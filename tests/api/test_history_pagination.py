@@ -0,0 +1,59 @@
+import pytest
+from datetime import date
+
+def _seed(car, policy_factory, claim_factory):
+    policy_factory(car=car, start=date(2024, 1, 1), end=date(2024, 1, 31))
+    claim_factory(car=car, claim_date=date(2024, 1, 1), amount=5)
+    claim_factory(car=car, claim_date=date(2024, 1, 15), amount=7)
+    policy_factory(car=car, start=date(2024, 2, 1), end=date(2024, 2, 28))
+    claim_factory(car=car, claim_date=date(2024, 2, 10), amount=9)
+
+@pytest.mark.asyncio
+async def test_history_keyset_pages(async_client, car_factory, policy_factory, claim_factory):
+    car = car_factory()
+    _seed(car, policy_factory, claim_factory)
+    full = (await async_client.get(f"/api/history/{car.id}")).json()
+    assert [(e["type"], e.get("startDate") or e["claimDate"]) for e in full] == [
+        ("CLAIM", "2024-01-01"), ("POLICY", "2024-01-01"), ("CLAIM", "2024-01-15"),
+        ("POLICY", "2024-02-01"), ("CLAIM", "2024-02-10"),
+    ]
+    seen, url = [], f"/api/history/{car.id}?limit=2&format=compact"
+    while url:
+        r = await async_client.get(url)
+        assert r.status_code == 200
+        seen.extend(r.json())
+        after = r.headers.get("X-Next-Cursor")
+        url = f"/api/history/{car.id}?limit=2&format=compact&after={after}" if after else None
+    assert [e["date"] for e in seen] == ["2024-01-01", "2024-01-01", "2024-01-15", "2024-02-01", "2024-02-10"]
+    assert [e.get("policyId") or e.get("claimId") for e in seen] == [e.get("policyId") or e.get("claimId") for e in full]
+
+@pytest.mark.asyncio
+async def test_history_date_bounds(async_client, car_factory, policy_factory, claim_factory):
+    car = car_factory()
+    _seed(car, policy_factory, claim_factory)
+    r = await async_client.get(f"/api/history/{car.id}?from=2024-01-10&to=2024-02-01&format=compact")
+    assert [e["date"] for e in r.json()] == ["2024-01-15", "2024-02-01"]
+    r = await async_client.get(f"/api/history/{car.id}?from=2030-01-01")
+    assert r.status_code == 200 and r.json() == []
+    r = await async_client.get("/api/history/999999?from=2030-01-01")
+    assert r.status_code == 404
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query", ["after=bogus", "from=2024-02-01&to=2024-01-01", "from=nope"])
+async def test_history_bad_args(async_client, car_factory, query):
+    car = car_factory()
+    r = await async_client.get(f"/api/history/{car.id}?{query}")
+    assert r.status_code == 400
+
+@pytest.mark.asyncio
+async def test_history_single_query_and_stream(async_client, car_factory, policy_factory, claim_factory, sql_statements):
+    car = car_factory()
+    _seed(car, policy_factory, claim_factory)
+    car_id = car.id
+    sql_statements.clear()
+    paged = await async_client.get(f"/api/history/{car_id}")
+    assert len(sql_statements) == 1 and "UNION ALL" in sql_statements[0]
+    streamed = await async_client.get(f"/api/history/{car_id}?stream=true")
+    assert streamed.content == paged.content
+    r = await async_client.get("/api/history/999999?stream=true")
+    assert r.status_code == 404
@@ -0,0 +1,79 @@
+from datetime import date, timedelta
+from sqlalchemy import select, update
+from app.core import scheduling
+from app.db.base import datab as db
+from app.db.models import Claim, InsurancePolicy, MonthlyRollup, SchedulerLease
+from app.services import monthly_rollup_service as rollups
+from app.services.lease_service import utcnow
+
+def _seed(car_factory, policy_factory, claim_factory):
+    ford, vw = car_factory(), car_factory(make="VW", model="Golf")
+    acme = policy_factory(ford, date(2024, 1, 1), date(2024, 6, 30), provider="ACME")
+    policy_factory(vw, date(2024, 1, 16), date(2024, 3, 31), provider="Shield")
+    for day, amount in ((date(2024, 1, 5), 100), (date(2024, 1, 20), 300), (date(2024, 8, 1), 50)):
+        claim_factory(ford, day, amount=amount)
+    claim_factory(vw, date(2024, 2, 10), amount=1000)
+    return ford, vw, acme
+
+def _cells(**filters):
+    return {(r["month"], r["provider"], r["make"]): r for r in rollups.get_rollups(**filters)}
+
+async def test_rollups_api_answers_from_refreshed_rows(async_client, car_factory, policy_factory, claim_factory):
+    _seed(car_factory, policy_factory, claim_factory)
+    empty = (await async_client.get("/api/rollups/monthly")).json()
+    assert empty["rows"] == [] and empty["refreshedThrough"] is None
+    assert rollups.refresh() >= 8  # first refresh rebuilds 2024-01 .. this month
+
+    r = await async_client.get("/api/rollups/monthly?from=2024-01&to=2024-02")
+    body = r.json()
+    assert r.status_code == 200 and (body["from"], body["to"]) == ("2024-01", "2024-02")
+    assert body["refreshedThrough"] == (utcnow().date() - timedelta(days=1)).isoformat()
+    rows = {(x["month"], x["provider"], x["make"]): x for x in body["rows"]}
+    assert set(rows) == {("2024-01", "ACME", "Ford"), ("2024-01", "Shield", "VW"),
+                         ("2024-02", "ACME", "Ford"), ("2024-02", "Shield", "VW")}
+    jan = rows[("2024-01", "ACME", "Ford")]
+    assert (jan["insuredCarDays"], jan["claimCount"], jan["claimTotal"]) == (31, 2, "400.00")
+    assert (jan["frequency"], jan["severity"]) == ("23.5484", "200.00")
+    assert rows[("2024-01", "Shield", "VW")]["insuredCarDays"] == 16
+    assert rows[("2024-02", "ACME", "Ford")]["severity"] is None
+
+    uninsured = (await async_client.get("/api/rollups/monthly?from=2024-08&to=2024-08&make=Ford")).json()["rows"]
+    assert [(x["provider"], x["insuredCarDays"], x["claimCount"], x["frequency"]) for x in uninsured] == [(None, 0, 1, None)]
+    assert (await async_client.get("/api/rollups/monthly?from=2024-13")).status_code == 400
+    assert (await async_client.get("/api/rollups/monthly?from=2024-03&to=2024-01")).status_code == 400
+
+async def test_refresh_recomputes_only_changed_months(async_client, car_factory, policy_factory, claim_factory):
+    ford, vw, acme = _seed(car_factory, policy_factory, claim_factory)
+    long_ago = utcnow() - timedelta(days=10)
+    db.session.execute(update(Claim).values(created_at=long_ago))
+    db.session.execute(update(InsurancePolicy).values(updated_at=long_ago))
+    db.session.commit()
+    rollups.rebuild()
+    before = {r.month: r.refreshed_at for r in db.session.scalars(select(MonthlyRollup))}
+
+    await async_client.post(f"/api/claims/car/{vw.id}", json={
+        "claimDate": "2024-03-03", "description": "Hail", "amount": 80, "carId": vw.id})
+    await async_client.delete(f"/api/policies/{acme.id}")
+    current = set(rollups.months_between(rollups.refreshed_through(), date.today()))
+    assert rollups.refresh() == len(current | set(rollups.months_between(date(2024, 1, 1), date(2024, 6, 30))))
+
+    after = {r.month: r.refreshed_at for r in db.session.scalars(select(MonthlyRollup))}
+    assert after[date(2024, 8, 1)] == before[date(2024, 8, 1)]  # untouched month kept
+    cells = _cells(month_from=date(2024, 1, 1), month_to=date(2024, 3, 1))
+    assert ("2024-01", "ACME", "Ford") not in cells
+    assert cells[("2024-01", None, "Ford")]["claimCount"] == 2
+    assert cells[("2024-03", "Shield", "VW")]["claimTotal"] == rollups.CENTS * 8000
+    incremental = _cells()
+    rollups.rebuild()
+    assert _cells() == incremental
+
+def test_refresh_cli_and_scheduled_job(app, car_factory, claim_factory, monkeypatch):
+    claim_factory(car_factory(), date(2024, 5, 5), amount=7)
+    result = app.test_cli_runner().invoke(args=["rollups", "refresh", "--full"])
+    assert result.exit_code == 0 and "Refreshed" in result.output
+    assert _cells()[("2024-05", None, "Ford")]["claimTotal"] == rollups.CENTS * 700
+
+    monkeypatch.setattr(scheduling, "_holder", "worker-a")
+    assert scheduling.monthly_rollup_job(app) >= 1
+    lease = db.session.get(SchedulerLease, scheduling.ROLLUP_JOB_ID)
+    assert lease.holder == "worker-a" and lease.last_run_rows >= 1
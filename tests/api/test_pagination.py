@@ -0,0 +1,45 @@
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_cars_keyset_pages(async_client, car_factory):
+    cars = [car_factory() for _ in range(5)]
+    r1 = await async_client.get("/api/cars/?limit=2")
+    assert r1.status_code == 200
+    assert [c["id"] for c in r1.json()] == [cars[0].id, cars[1].id]
+    assert 'rel="next"' in r1.headers["Link"]
+    cursor = r1.headers["X-Next-Cursor"]
+    r2 = await async_client.get(f"/api/cars/?limit=2&cursor={cursor}")
+    assert [c["id"] for c in r2.json()] == [cars[2].id, cars[3].id]
+    r3 = await async_client.get(f"/api/cars/?limit=2&cursor={r2.headers['X-Next-Cursor']}")
+    assert [c["id"] for c in r3.json()] == [cars[4].id]
+    assert "Link" not in r3.headers
+
+@pytest.mark.asyncio
+async def test_claims_follow_link_header(async_client, claim_factory):
+    claims = [claim_factory() for _ in range(3)]
+    seen = []
+    url = "/api/claims/?limit=1"
+    while url:
+        r = await async_client.get(url)
+        assert r.status_code == 200
+        seen.extend(c["id"] for c in r.json())
+        link = r.headers.get("Link")
+        url = link[1:link.index(">")] if link else None
+    assert seen == [c.id for c in claims]
+
+@pytest.mark.asyncio
+async def test_limit_capped_and_validated(async_client, owner_factory, monkeypatch):
+    from app.core.config import get_settings
+    monkeypatch.setattr(get_settings(), "PAGE_SIZE_MAX", 2)
+    for _ in range(3):
+        owner_factory()
+    r = await async_client.get("/api/owners/?limit=100")
+    assert len(r.json()) == 2 and "X-Next-Cursor" in r.headers
+    bad = await async_client.get("/api/owners/?limit=0")
+    assert bad.status_code == 400
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_rejected(async_client):
+    r = await async_client.get("/api/policies?cursor=not-a-cursor")
+    assert r.status_code == 400
@@ -44,3 +44,41 @@ async def test_policy_non_overlap_allowed(async_client, car_factory):
     }
     r2 = await async_client.post(POLICY_URL, json=p2)
     assert r2.status_code == 201
+
+def test_database_rejects_overlap_and_missing_car(app, car_factory):
+    from sqlalchemy import insert
+    from sqlalchemy.exc import IntegrityError
+    from app.db.base import datab as db
+    from app.db.models import InsurancePolicy, POLICY_CAR_MISSING, POLICY_OVERLAP_CONSTRAINT
+    car = car_factory()
+    row = {"car_id": car.id, "start_date": date(2024, 1, 1), "end_date": date(2024, 6, 30)}
+    db.session.execute(insert(InsurancePolicy).values(**row))
+    for values, constraint in (({**row, "start_date": date(2024, 6, 30), "end_date": date(2024, 7, 1)},
+                                POLICY_OVERLAP_CONSTRAINT),
+                               ({**row, "car_id": car.id + 999}, POLICY_CAR_MISSING)):
+        with pytest.raises(IntegrityError, match=constraint):
+            db.session.execute(insert(InsurancePolicy).values(**values))
+        db.session.rollback()
+
+def test_create_policy_is_a_single_insert(app, car_factory, sql_statements):
+    from app.api.errors import ConflictError, NotFoundError
+    from app.services.coverage_summary_service import rebuild
+    from app.services.policies_service import create_policy, update_policy
+    car = car_factory()
+    car_id = car.id
+    rebuild()
+    sql_statements.clear()
+    first = create_policy("A", date(2024, 1, 1), date(2024, 3, 31), car_id)
+    # INSERT policy + UPDATE car history version, then the coverage summary (SELECT the
+    # car's current policies, UPDATE its row); no existence or overlap SELECTs. The
+    # trailing SELECT is the post-commit refresh of the returned policy.
+    assert [s.split()[0] for s in sql_statements] == ["INSERT", "UPDATE", "SELECT", "UPDATE", "SELECT"]
+    assert "FROM car" not in sql_statements[2] + sql_statements[-1]
+    with pytest.raises(ConflictError):
+        create_policy("B", date(2024, 3, 31), date(2024, 4, 30), car_id)
+    with pytest.raises(NotFoundError):
+        create_policy("B", date(2024, 1, 1), date(2024, 1, 2), car_id + 999)
+    second = create_policy("B", date(2024, 4, 1), date(2024, 4, 30), car_id)
+    with pytest.raises(ConflictError):
+        update_policy(second.id, start_date=date(2024, 3, 15))
+    assert update_policy(first.id, end_date=date(2024, 3, 20)).end_date == date(2024, 3, 20)
@@ -0,0 +1,57 @@
+import contextvars
+import json
+import pytest
+from datetime import date
+
+
+@pytest.mark.asyncio
+async def test_stream_matches_paged_body(async_client, claim_factory):
+    for i in range(3):
+        claim_factory(claim_date=date(2024, 1, i + 1), amount=10 + i)
+    paged = await async_client.get("/api/claims/")
+    streamed = await async_client.get("/api/claims/?stream=true")
+    assert streamed.status_code == 200
+    assert streamed.headers["Content-Type"] == "application/json"
+    assert streamed.content == paged.content
+
+@pytest.mark.asyncio
+async def test_stream_ignores_page_limit(async_client, car_factory):
+    cars = [car_factory() for _ in range(4)]
+    r = await async_client.get("/api/cars/?stream=true&limit=2&include=owner")
+    data = r.json()
+    assert [c["id"] for c in data] == [c.id for c in cars]
+    assert all("owner" in c for c in data)
+    assert "Link" not in r.headers
+
+@pytest.mark.asyncio
+async def test_ndjson_by_accept(async_client, policy_factory):
+    policies = [policy_factory() for _ in range(2)]
+    r = await async_client.get("/api/policies", headers={"Accept": "application/x-ndjson"})
+    assert r.status_code == 200
+    assert r.headers["Content-Type"].startswith("application/x-ndjson")
+    lines = r.text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [p.id for p in policies]
+
+@pytest.mark.asyncio
+async def test_stream_empty_collection(async_client):
+    r = await async_client.get("/api/owners/?stream=1")
+    assert r.json() == []
+    r = await async_client.get("/api/owners/", headers={"Accept": "application/x-ndjson"})
+    assert r.text == ""
+
+def test_stream_over_wsgi_client(app, car_factory, policy_factory):
+    # Flask tears down the view's context (and session) before the body is iterated;
+    # the query must run lazily inside the re-pushed streaming context. A fresh
+    # contextvars.Context keeps the fixture's app context out of the request.
+    car = car_factory()
+    policy_factory(car=car)
+    client = app.test_client()
+
+    def fetch(url):
+        r = client.get(url)
+        return r.status_code, r.get_json()
+
+    for url in ("/api/cars/?stream=true", f"/api/cars/{car.id}/policies", f"/api/history/{car.id}?stream=true"):
+        status, data = contextvars.Context().run(fetch, url)
+        assert status == 200
+        assert len(data) == 1
@@ -0,0 +1,41 @@
+import pytest
+from datetime import date
+
+BATCH_URL = "/api/cars/insurance-valid:batch"
+
+
+@pytest.mark.asyncio
+async def test_validity_batch_in_order(async_client, car_factory, policy_factory, sql_statements):
+    car = car_factory()
+    other = car_factory()
+    policy_factory(car=car, start=date(2025, 1, 1), end=date(2025, 6, 30))
+    items = [
+        {"carId": car.id, "date": "2025-03-01"},
+        {"carId": 999999, "date": "2025-03-01"},
+        {"carId": car.id, "date": "2025-07-01"},
+        {"carId": other.id, "date": "2025-03-01"},
+        {"carId": car.id, "date": "2025-06-30"},
+    ]
+    sql_statements.clear()
+    r = await async_client.post(BATCH_URL, json={"items": items})
+    assert r.status_code == 200, r.text
+    results = r.json()["results"]
+    assert [res["carId"] for res in results] == [i["carId"] for i in items]
+    assert [res.get("valid") for res in results] == [True, None, False, False, True]
+    assert results[1]["status"] == 404
+    assert len(sql_statements) == 1
+
+@pytest.mark.asyncio
+async def test_validity_batch_invalid_item(async_client, car_factory):
+    car = car_factory()
+    r = await async_client.post(BATCH_URL, json={"items": [{"carId": car.id, "date": "2101-01-01"}]})
+    assert r.status_code == 400
+    assert r.json()["errors"]["detail_info"][0]["loc"] == ["items", 0, "date"]
+
+@pytest.mark.asyncio
+async def test_validity_batch_too_large(async_client, monkeypatch):
+    from app.core.config import get_settings
+    monkeypatch.setattr(get_settings(), "VALIDITY_BATCH_MAX", 2)
+    items = [{"carId": 1, "date": "2025-01-01"}] * 3
+    r = await async_client.post(BATCH_URL, json={"items": items})
+    assert r.status_code == 400
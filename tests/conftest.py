@@ -6,6 +6,7 @@ from asgiref.wsgi import WsgiToAsgi
 from datetime import date
 import itertools
 import httpx
+from sqlalchemy import event
 
 from app.main import create_app
 from app.db.base import datab as db
@@ -86,6 +87,35 @@ def claim_factory(car_factory):
         return cl
     return f
 
+@pytest.fixture
+def sql_statements(app):
+    """Record every SQL statement sent to the engine while the test runs."""
+    statements = []
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    engine = db.engine
+    event.listen(engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", _record)
+
+class LogCapture:
+    """Stand-in for a structlog logger that records (event, fields) pairs."""
+    def __init__(self):
+        self.events = []
+    def _record(self, event, **fields):
+        self.events.append((event, fields))
+    debug = info = warning = error = _record
+
+@pytest.fixture
+def log_capture(monkeypatch):
+    """Capture what a module logs: ``log_capture(module)`` swaps its ``log`` for a LogCapture."""
+    def f(module=None):
+        fake = LogCapture()
+        if module is not None:
+            monkeypatch.setattr(module, "log", fake)
+        return fake
+    return f
+
 @pytest.fixture
 def async_client(asgi_app):
     import httpx
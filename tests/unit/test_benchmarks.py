@@ -0,0 +1,17 @@
+from benchmarks.run import compare, percentile, run_backend
+
+def test_percentile_and_regression_threshold():
+    values = [i / 1000 for i in range(1, 101)]
+    assert percentile(values, 50) == 0.05 and percentile(values, 99) == 0.099
+    baseline = {"history@1": {"p95_ms": 10.0, "rps": 100.0}}
+    assert compare({"history@1": {"p95_ms": 11.9, "rps": 81.0}}, baseline, 0.2) == []
+    assert compare({"history@1": {"p95_ms": 12.5, "rps": 70.0}}, baseline, 0.2) == [
+        "history@1: p95 10.0ms -> 12.5ms", "history@1: rps 100.0 -> 70.0",
+    ]
+
+def test_smoke_run_against_sqlite_file(tmp_path):
+    run = run_backend(f"sqlite:///{tmp_path / 'bench.db'}", rows=90, requests=4, levels=[1, 2],
+                      names=["list_cars", "create_policy", "insurance_valid", "history", "list_claims"])
+    assert run["rows"] == 90
+    assert len(run["results"]) == 10
+    assert all(r["errors"] == 0 and r["requests"] == 4 for r in run["results"].values())
@@ -0,0 +1,77 @@
+from datetime import date
+import pytest
+from app.core.config import get_settings
+from app.services import coverage_index as ci
+from app.services.policies_service import create_policy, update_policy, delete_policy
+from app.services.validity_service import check_insurance
+from app.api.errors import ConflictError, NotFoundError
+
+@pytest.fixture
+def index_enabled(monkeypatch):
+    monkeypatch.setattr(get_settings(), "COVERAGE_INDEX_ENABLED", True)
+    ci.reset_coverage_index()
+    yield ci.get_coverage_index()
+    ci.reset_coverage_index()
+
+def test_lookup_and_overlap(index_enabled, car_factory, policy_factory):
+    car = car_factory()
+    p1 = policy_factory(car=car, start=date(2024, 1, 1), end=date(2024, 3, 31))
+    p2 = policy_factory(car=car, start=date(2024, 6, 1), end=date(2024, 6, 30))
+    idx = index_enabled
+    assert idx.covering_policy(car.id, date(2024, 2, 1)) == (True, p1.id)
+    assert idx.covering_policy(car.id, date(2024, 4, 1)) == (True, None)
+    assert idx.covering_policy(car.id, date(2024, 6, 30)) == (True, p2.id)
+    assert idx.covering_policy(999999, date(2024, 6, 30)) == (False, None)
+    assert idx.overlapping_policy(car.id, date(2024, 4, 1), date(2024, 5, 31)) == (True, None)
+    assert idx.overlapping_policy(car.id, date(2024, 3, 31), date(2024, 5, 31)) == (True, p1.id)
+    assert idx.overlapping_policy(car.id, date(2024, 3, 1), date(2024, 6, 15), exclude_id=p2.id) == (True, p1.id)
+
+def test_hits_and_misses(index_enabled, car_factory, policy_factory):
+    car = car_factory()
+    policy_factory(car=car, start=date(2024, 1, 1), end=date(2024, 1, 31))
+    hits, misses = ci.HITS.value(), ci.MISSES.value()
+    assert check_insurance(car.id, date(2024, 1, 15))["valid"] is True
+    assert check_insurance(car.id, date(2024, 2, 15))["valid"] is False
+    assert ci.MISSES.value() - misses == 1
+    assert ci.HITS.value() - hits == 1
+    assert ci.CARS.value() == 1 and ci.INTERVALS.value() == 1
+    with pytest.raises(NotFoundError):
+        check_insurance(999999, date(2024, 1, 15))
+
+def test_writes_keep_index_current(index_enabled, car_factory):
+    car = car_factory()
+    p = create_policy("A", date(2024, 1, 1), date(2024, 1, 31), car.id)
+    assert check_insurance(car.id, date(2024, 1, 10))["valid"] is True
+    with pytest.raises(ConflictError):
+        create_policy("B", date(2024, 1, 20), date(2024, 2, 10), car.id)
+    create_policy("B", date(2024, 2, 1), date(2024, 2, 28), car.id)
+    assert check_insurance(car.id, date(2024, 2, 10))["valid"] is True
+    update_policy(p.id, end_date=date(2024, 1, 15))
+    assert check_insurance(car.id, date(2024, 1, 20))["valid"] is False
+    delete_policy(p.id)
+    assert check_insurance(car.id, date(2024, 1, 10))["valid"] is False
+
+def test_write_during_load_is_not_cached(index_enabled, car_factory, monkeypatch):
+    car = car_factory()
+    idx = index_enabled
+    load = idx._load
+
+    def load_then_write(car_id):
+        entry = load(car_id)  # snapshot taken before the policy below commits
+        create_policy("A", date(2024, 1, 1), date(2024, 1, 31), car_id)
+        return entry
+
+    monkeypatch.setattr(idx, "_load", load_then_write)
+    assert idx.covering_policy(car.id, date(2024, 1, 10)) == (True, None)
+    monkeypatch.setattr(idx, "_load", load)
+    assert idx.size() == (0, 0) and not idx._loading
+    assert check_insurance(car.id, date(2024, 1, 10))["valid"] is True
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_index(async_client, index_enabled, car_factory):
+    car = car_factory()
+    await async_client.get(f"/api/cars/{car.id}/insurance-valid?date=2024-01-01")
+    r = await async_client.get("/metrics")
+    assert r.status_code == 200
+    assert "coverage_index_misses_total" in r.text
+    assert "coverage_index_cars 1" in r.text
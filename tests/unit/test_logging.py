@@ -0,0 +1,58 @@
+import io
+import logging
+import os
+import queue
+import subprocess
+import sys
+from logging.handlers import QueueListener
+from flask import Flask
+from app.core.config import get_settings
+from app.core.logging import LOG_DROPPED, DroppingQueueHandler
+from app.core.request_id import init_request_id
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+def test_full_queue_drops_and_counts_records():
+    log_queue = queue.Queue(maxsize=2)
+    logger = logging.getLogger("test.async_logging")
+    logger.propagate = False
+    logger.addHandler(DroppingQueueHandler(log_queue))
+    dropped = LOG_DROPPED.value()
+    for i in range(5):
+        logger.warning("line %d", i)
+    assert LOG_DROPPED.value() == dropped + 3
+
+    out = io.StringIO()
+    sink = logging.StreamHandler(out)
+    sink.setFormatter(logging.Formatter("%(message)s"))
+    listener = QueueListener(log_queue, sink)
+    listener.start()
+    listener.stop()
+    assert out.getvalue().splitlines() == ["line 0", "line 1"]
+
+def test_request_lines_are_sampled_but_errors_always_logged(monkeypatch, log_capture):
+    monkeypatch.setattr(get_settings(), "LOG_REQUEST_SAMPLE_RATE", 0.0)
+    app = Flask(__name__)
+    fake = log_capture()
+    init_request_id(app, fake)
+    app.add_url_rule("/ok", "ok", lambda: "ok")
+    app.add_url_rule("/boom", "boom", lambda: ("boom", 503))
+    client = app.test_client()
+
+    r = client.get("/ok")
+    assert r.headers["X-Request-ID"]
+    assert fake.events == []
+    client.get("/boom")
+    assert [e for e, _ in fake.events] == ["request.end"]
+
+    monkeypatch.setattr(get_settings(), "LOG_REQUEST_SAMPLE_RATE", 1.0)
+    client.get("/ok")
+    assert [e for e, _ in fake.events] == ["request.end", "request.start", "request.end"]
+
+def test_async_mode_logs_to_stdout(tmp_path):
+    script = ("from app.core.logging import setup_logging, get_logger\n"
+              "setup_logging()\n"
+              "get_logger().info('hello.async')\n")
+    env = dict(os.environ, LOG_ASYNC="true", LOG_TO_FILE="0", APP_ENV="prod")
+    out = subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    assert '"event": "hello.async"' in out.stdout and "hello.async" not in out.stderr
@@ -0,0 +1,71 @@
+import json
+import os
+import pytest
+from app.core import instrumentation as inst
+from app.core.metrics import collect_multiprocess, counter, gauge, render_latest, write_process_snapshot
+
+@pytest.mark.asyncio
+async def test_request_metrics_use_route_template(async_client, car_factory):
+    car = car_factory()
+    endpoint = "/api/cars/<int:car_id>"
+    before = inst.HTTP_REQUESTS.value(method="GET", endpoint=endpoint, status=200)
+    queries_before = inst.DB_QUERIES.value(endpoint=endpoint)
+    latency_before = inst.HTTP_LATENCY.count(method="GET", endpoint=endpoint)
+    r = await async_client.get(f"/api/cars/{car.id}")
+    assert r.status_code == 200
+    assert inst.HTTP_REQUESTS.value(method="GET", endpoint=endpoint, status=200) == before + 1
+    assert inst.HTTP_LATENCY.count(method="GET", endpoint=endpoint) == latency_before + 1
+    assert inst.DB_QUERIES.value(endpoint=endpoint) == queries_before + 1
+    assert inst.HTTP_IN_FLIGHT.value(method="GET", endpoint=endpoint) == 0
+    await async_client.get("/api/cars/999999")
+    body = (await async_client.get("/metrics")).text
+    assert 'http_requests_total{method="GET",endpoint="/api/cars/<int:car_id>",status="404"}' in body
+    assert 'http_request_db_queries_bucket{endpoint="/api/cars/<int:car_id>",le="1.0"}' in body
+
+def test_multiprocess_snapshots_are_merged(tmp_path):
+    total = counter("test_mp_events_total", "test counter")
+    live = gauge("test_mp_live", "test gauge", multiprocess_mode="all")
+    busy = gauge("test_mp_busy", "test gauge", multiprocess_mode="sum")
+    total.inc(3)
+    live.set(7)
+    busy.set(2)
+    write_process_snapshot(str(tmp_path))
+    # A sibling worker (the parent pid is alive) and one that has exited.
+    for pid, events in ((os.getppid(), 4), (2 ** 22 + 12345, 10)):
+        (tmp_path / f"metrics_{pid}.json").write_text(json.dumps({"pid": pid, "metrics": {
+            "test_mp_events_total": {"type": "counter", "doc": "test counter", "labels": [], "mode": None,
+                                     "buckets": [], "values": [[[], events]]},
+            "test_mp_live": {"type": "gauge", "doc": "test gauge", "labels": [], "mode": "all",
+                             "buckets": [], "values": [[[], 1]]},
+            "test_mp_busy": {"type": "gauge", "doc": "test gauge", "labels": [], "mode": "sum",
+                             "buckets": [], "values": [[[], 5]]},
+        }}))
+    merged = {m.name: m for m in collect_multiprocess(str(tmp_path))}
+    assert merged["test_mp_events_total"].value() == 3 + 4 + 10
+    assert merged["test_mp_busy"].value() == 2 + 5
+    assert set(merged["test_mp_live"]._values) == {(str(os.getpid()),), (str(os.getppid()),)}
+    text = render_latest(str(tmp_path))
+    assert f'test_mp_live{{pid="{os.getpid()}"}} 7' in text
+    assert "test_mp_events_total 17" in text
+
+@pytest.mark.asyncio
+async def test_streamed_body_queries_count_for_the_route(async_client, car_factory):
+    car_factory()
+    route, background = inst.DB_QUERIES.value(endpoint="/api/cars/"), inst.DB_QUERIES.value(endpoint=inst.BACKGROUND)
+    r = await async_client.get("/api/cars/?stream=true")
+    assert r.status_code == 200 and len(r.json()) == 1
+    assert inst.DB_QUERIES.value(endpoint="/api/cars/") == route + 1
+    assert inst.DB_QUERIES.value(endpoint=inst.BACKGROUND) == background
+
+def test_reused_pid_folds_the_dead_workers_snapshot(tmp_path):
+    events = counter("test_pid_reuse_total", "test counter")
+    events.inc(2)
+    own = tmp_path / f"metrics_{os.getpid()}.json"
+    own.write_text(json.dumps({"pid": os.getpid(), "token": "exited-worker", "metrics": {
+        "test_pid_reuse_total": {"type": "counter", "doc": "test counter", "labels": [], "mode": None,
+                                 "buckets": [], "values": [[[], 40]]},
+    }}))
+    write_process_snapshot(str(tmp_path))
+    write_process_snapshot(str(tmp_path))
+    merged = {m.name: m for m in collect_multiprocess(str(tmp_path))}
+    assert merged["test_pid_reuse_total"].value() == 42
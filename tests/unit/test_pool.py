@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.core.config import get_settings
+from app.db import pool
+
+def test_engine_options_per_backend(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    assert pool.engine_options(settings, "sqlite:///:memory:") == {"pool_pre_ping": True}
+    options = pool.engine_options(settings, "postgresql+psycopg2://u:p@db/insurance")
+    assert options["poolclass"] is pool.InstrumentedQueuePool
+    assert options["pool_size"] == settings.DB_POOL_SIZE and options["pool_recycle"] == settings.DB_POOL_RECYCLE
+    assert options["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+def test_checkout_metrics_and_timeouts(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=pool.InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    waits, timeouts = pool.POOL_WAIT.count(), pool.POOL_TIMEOUTS.value()
+    in_use = pool.POOL_CHECKED_OUT.value()
+    conn = engine.connect()
+    assert pool.POOL_CHECKED_OUT.value() == in_use + 1
+    with pytest.raises(PoolTimeoutError):
+        engine.connect()
+    assert pool.POOL_TIMEOUTS.value() == timeouts + 1
+    assert pool.POOL_WAIT.count() == waits + 2
+    conn.close()
+    assert pool.POOL_CHECKED_OUT.value() == in_use
+    engine.dispose()
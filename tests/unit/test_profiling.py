@@ -0,0 +1,46 @@
+import pytest
+from app.core import profiling
+from app.core.config import get_settings
+from app.core.profiling import SqlProfile, statement_shape
+
+@pytest.fixture
+def profile_log(monkeypatch, log_capture):
+    monkeypatch.setattr(get_settings(), "PROFILING_TOKEN", "s3cret")
+    return log_capture(profiling)
+
+def test_shape_and_n_plus_one_detection():
+    assert statement_shape("SELECT *\n FROM car WHERE id IN (?, ?, ?)") == statement_shape("SELECT * FROM car WHERE id IN (?)")
+    profile = SqlProfile()
+    for i in range(7):
+        profile.record("SELECT owner.name FROM owner WHERE owner.id = ?", 0.001, -1)
+    profile.record("SELECT car.id FROM car", 0.01, 7)
+    [hit] = profile.n_plus_one(threshold=5)
+    assert hit["count"] == 7 and hit["statement"].startswith("SELECT owner.name")
+    assert profile.n_plus_one(threshold=7) == []
+    assert profile.top(1) == [{"statement": "SELECT car.id FROM car", "ms": 10.0, "rows": 7}]
+
+@pytest.mark.asyncio
+async def test_trusted_header_adds_server_timing(async_client, car_factory, profile_log):
+    car_factory()
+    r = await async_client.get("/api/cars/", headers={"X-Profile": "s3cret"})
+    timing = r.headers["Server-Timing"]
+    assert 'db;dur=' in timing and 'desc="1 queries"' in timing and "serialize;dur=" in timing and "total;dur=" in timing
+    [(event, fields)] = profile_log.events
+    assert event == "request.profile" and fields["queries"] == 1
+    assert "FROM car" in fields["top_statements"][0]["statement"]
+
+@pytest.mark.asyncio
+async def test_untrusted_header_is_ignored(async_client, profile_log):
+    r = await async_client.get("/api/cars/", headers={"X-Profile": "guess"})
+    assert "Server-Timing" not in r.headers
+    assert profile_log.events == []
+
+@pytest.mark.asyncio
+async def test_slow_requests_logged_when_enabled(async_client, car_factory, profile_log, monkeypatch):
+    monkeypatch.setattr(get_settings(), "PROFILING_ENABLED", True)
+    monkeypatch.setattr(get_settings(), "PROFILING_SLOW_REQUEST_MS", 0)
+    car = car_factory()
+    r = await async_client.get(f"/api/history/{car.id}")
+    assert "Server-Timing" in r.headers
+    [(event, fields)] = profile_log.events
+    assert event == "request.slow" and fields["path"] == f"/api/history/{car.id}"
@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import create_engine, insert
+from app.core.config import get_settings
+from app.db import routing
+from app.db.base import datab as db
+from app.db.models import Car, Owner
+from app.main import create_app
+
+@pytest.fixture
+def replicated_app(tmp_path, monkeypatch):
+    replica_url = f"sqlite:///{tmp_path / 'replica.db'}"
+    broken_url = f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"
+    monkeypatch.setattr(routing, "_replicas", None)
+    monkeypatch.setattr(get_settings(), "DATABASE_REPLICA_URLS", f"{broken_url},{replica_url}")
+    app = create_app(db_url=f"sqlite:///{tmp_path / 'primary.db'}")
+    with app.app_context():
+        db.create_all()
+    replica = create_engine(replica_url)
+    db.metadata.create_all(replica)
+    with replica.begin() as conn:
+        conn.execute(insert(Owner).values(id=1, name="Replica Owner"))
+        conn.execute(insert(Car).values(id=1, vin="FROM-REPLICA", owner_id=1))
+    replica.dispose()
+    yield app
+    for engine in routing._replicas.engines:
+        engine.dispose()
+
+def _vins(client, **kwargs):
+    return [c["vin"] for c in client.get("/api/cars/", **kwargs).get_json()]
+
+def test_reads_go_to_healthy_replica_and_writes_pin_client_to_primary(replicated_app):
+    ejections = routing.EJECTIONS.value()
+    reader = replicated_app.test_client()
+    assert _vins(reader) == ["FROM-REPLICA"]
+    assert _vins(reader) == ["FROM-REPLICA"]
+    assert routing.EJECTIONS.value() == ejections + 1
+    assert routing.HEALTHY.value() == 1
+
+    writer = replicated_app.test_client()
+    owner = writer.post("/api/owners/", json={"name": "Ana", "email": "ana@example.com"}).get_json()
+    r = writer.post("/api/cars/", json={"vin": "ON-PRIMARY", "make": "VW", "model": "Golf",
+                                        "yearOfManufacture": 2020, "ownerId": owner["id"]})
+    assert r.status_code == 201 and float(r.headers["X-Read-After"]) > 0
+    assert _vins(writer) == ["ON-PRIMARY"]  # db_read_after cookie keeps the writer on the primary
+    assert _vins(reader) == ["FROM-REPLICA"]
+    assert _vins(reader, headers={"X-Read-After": r.headers["X-Read-After"]}) == ["ON-PRIMARY"]
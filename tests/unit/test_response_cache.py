@@ -0,0 +1,80 @@
+import pytest
+from app.core.config import get_settings
+from app.services import response_cache as rc
+
+@pytest.fixture(params=["memory", "shared"])
+def cache_backend(request, monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_BACKEND", request.param)
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_URL", "local://")
+    rc.reset_response_cache()
+    yield rc.get_response_cache()
+    rc.reset_response_cache()
+
+def _lookups(route):
+    return rc.LOOKUPS.value(route=route, result="hit"), rc.LOOKUPS.value(route=route, result="miss")
+
+@pytest.mark.asyncio
+async def test_hits_and_write_invalidation(cache_backend, async_client, car_factory, sql_statements):
+    car = car_factory()
+    car_id = car.id
+    url = f"/api/history/{car_id}"
+    hits, misses = _lookups("history")
+    first = await async_client.get(url)
+    assert first.headers["X-Cache"] == "MISS"
+    sql_statements.clear()
+    second = await async_client.get(url)
+    assert second.headers["X-Cache"] == "HIT" and sql_statements == []
+    assert second.content == first.content and second.headers["ETag"] == first.headers["ETag"]
+    r = await async_client.get(url, headers={"If-None-Match": first.headers["ETag"]})
+    assert r.status_code == 304 and r.headers["X-Cache"] == "HIT"
+    assert _lookups("history") == (hits + 2, misses + 1)
+
+    await async_client.post(f"/api/cars/{car_id}/policies",
+                            json={"provider": "ACME", "startDate": "2024-01-01", "endDate": "2024-12-31"})
+    after_write = await async_client.get(url)
+    assert after_write.headers["X-Cache"] == "MISS" and len(after_write.json()) == 1
+
+    claim = await async_client.post(f"/api/claims/car/{car_id}",
+                                    json={"claimDate": "2024-03-02", "description": "Dent", "amount": 10, "carId": car_id})
+    assert len((await async_client.get(url)).json()) == 2
+    await async_client.delete(f"/api/claims/{claim.json()['id']}")
+    assert len((await async_client.get(url)).json()) == 1
+
+    await async_client.delete(f"/api/cars/{car_id}")
+    assert (await async_client.get(url)).status_code == 404
+
+@pytest.mark.asyncio
+async def test_routes_opt_in(cache_backend, async_client, car_factory, monkeypatch):
+    monkeypatch.setattr(get_settings(), "RESPONSE_CACHE_ROUTES", "history")
+    car = car_factory()
+    url = f"/api/cars/{car.id}/insurance-valid?date=2024-03-01"
+    await async_client.get(url)
+    r = await async_client.get(url)
+    assert r.status_code == 200 and "X-Cache" not in r.headers
+    other = await async_client.get(f"/api/cars/{car.id}/insurance-valid?date=2024-03-02")
+    assert other.json()["date"].startswith("Sat, 02 Mar 2024")
+
+def test_memory_cache_lru_and_ttl(monkeypatch):
+    cache = rc.MemoryCache(ttl_seconds=10, max_entries=2)
+    clock = [100.0]
+    monkeypatch.setattr(rc.time, "monotonic", lambda: clock[0])
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+    assert cache.get("b") is None and cache.get("a") == b"1"
+    clock[0] += 10
+    assert cache.get("a") is None
+    before = cache.generation(7)
+    cache.invalidate(7)
+    assert cache.generation(7) != before
+
+def test_memory_cache_generations_are_bounded():
+    cache = rc.MemoryCache(ttl_seconds=10, max_entries=2)
+    seen = {cache.generation(1)}
+    for car_id in range(2, 100):
+        cache.invalidate(car_id)
+    assert len(cache._generations) == 2
+    # An evicted car comes back with an unused generation, never an old one
+    assert cache.generation(1) not in seen
@@ -2,7 +2,7 @@ from datetime import datetime, date, time, timedelta
 import pytest
 from app.db.base import datab as db
 from app.db.models import InsurancePolicy
-from app.services.expiry_service import log_today_expiring_policies
+from app.services.expiry_service import log_expiring_policies
 
 class FakeDateTime(datetime):
     _fixed = None
@@ -52,28 +52,116 @@ def test_scheduler_marks_today(monkeypatch, app, policy_today):
     with app.app_context():
         # Inside window (00:30)
         patch_datetime(monkeypatch, datetime.combine(date.today(), time(0, 30)))
-        count = log_today_expiring_policies()
+        count = log_expiring_policies()
         updated = InsurancePolicy.query.get(policy_today.id)
         assert count == 1
         assert updated.logged_expiry_at is not None
 
         # Second run same window: should not relog (idempotent)
-        count2 = log_today_expiring_policies()
+        count2 = log_expiring_policies()
         assert count2 == 0
 
 def test_scheduler_skips_non_today(monkeypatch, app, policy_tomorrow):
     with app.app_context():
         patch_datetime(monkeypatch, datetime.combine(date.today(), time(0, 30)))
-        count = log_today_expiring_policies()
+        count = log_expiring_policies()
         updated = InsurancePolicy.query.get(policy_tomorrow.id)
         assert count == 0
         assert updated.logged_expiry_at is None
 
 def test_scheduler_outside_window(monkeypatch, app, policy_today):
     with app.app_context():
-        # Outside midnight window (e.g. 02:15)
+        # No midnight window any more: a run at 02:15 still logs today's expiries
         patch_datetime(monkeypatch, datetime.combine(date.today(), time(2, 15)))
-        count = log_today_expiring_policies()
+        count = log_expiring_policies()
         updated = InsurancePolicy.query.get(policy_today.id)
-        assert count == 0
-        assert updated.logged_expiry_at is None
\ No newline at end of file
+        assert count == 1
+        assert updated.logged_expiry_at is not None
+
+def test_scheduler_catches_up_from_watermark(monkeypatch, app, car_factory):
+    from app.services.expiry_service import WATERMARK
+    from app.services.watermark_service import get_watermark, set_watermark
+    today = date.today()
+    car, other = car_factory(), car_factory()
+    ends = [today - timedelta(days=n) for n in (9, 6, 3, 3, 1, 0)]
+    # Policies of one car may not overlap: the second policy ending 3 days ago belongs to another car.
+    policies = [InsurancePolicy(car_id=(other if i == 3 else car).id, provider="Sched", start_date=end, end_date=end)
+                for i, end in enumerate(ends)]
+    db.session.add_all(policies)
+    set_watermark(WATERMARK, today - timedelta(days=7))
+    db.session.commit()
+    patch_datetime(monkeypatch, datetime.combine(today, time(15, 0)))
+    assert log_expiring_policies(chunk_size=2) == 5
+    assert policies[0].logged_expiry_at is None  # before the floor (logging started at the watermark)
+    assert all(p.logged_expiry_at is not None for p in policies[1:])
+    assert get_watermark(WATERMARK) == today - timedelta(days=1)
+    # Today stays open: a policy ending later today is still picked up
+    late = InsurancePolicy(car_id=other.id, provider="Late", start_date=today, end_date=today)
+    db.session.add(late)
+    db.session.commit()
+    assert log_expiring_policies() == 1
+
+def test_first_run_uses_lookback(monkeypatch, app, car_factory):
+    from app.services.expiry_service import WATERMARK
+    from app.services.watermark_service import get_watermark
+    today = date.today()
+    car = car_factory()
+    db.session.add_all([
+        InsurancePolicy(car_id=car.id, provider="Old", start_date=today - timedelta(days=30), end_date=today - timedelta(days=30)),
+        InsurancePolicy(car_id=car.id, provider="Yday", start_date=today - timedelta(days=1), end_date=today - timedelta(days=1)),
+    ])
+    db.session.commit()
+    patch_datetime(monkeypatch, datetime.combine(today, time(9, 0)))
+    assert log_expiring_policies() == 1
+    assert get_watermark(WATERMARK) == today - timedelta(days=1)
+
+def test_late_policies_behind_watermark_are_logged(monkeypatch, app, car_factory):
+    from app.services.expiry_service import FLOOR, WATERMARK
+    from app.services.watermark_service import get_watermark
+    today = date.today()
+    car = car_factory()
+    patch_datetime(monkeypatch, datetime.combine(today, time(9, 0)))
+    log_expiring_policies()
+    assert get_watermark(FLOOR) == today - timedelta(days=2) and get_watermark(WATERMARK) == today - timedelta(days=1)
+    # Imported after the run, already ended: behind the watermark but after the floor
+    late = InsurancePolicy(car_id=car.id, provider="Import", start_date=today - timedelta(days=3), end_date=today - timedelta(days=1))
+    db.session.add(late)
+    db.session.commit()
+    assert log_expiring_policies() == 1
+    assert late.logged_expiry_at is not None
+
+def test_chunk_is_logged_before_it_commits(monkeypatch, app, policy_today, log_capture):
+    from app.services import expiry_service as svc
+    from app.services.lease_service import LeaseLost
+    events = log_capture(svc).events
+    patch_datetime(monkeypatch, datetime.combine(date.today(), time(9, 0)))
+    def lost():
+        raise LeaseLost()
+    with pytest.raises(LeaseLost):
+        log_expiring_policies(heartbeat=lost)
+    db.session.rollback()
+    assert [e for e, _ in events] == ["policy.expiry"]
+    assert log_expiring_policies() == 1
+    assert [e for e, _ in events] == ["policy.expiry", "policy.expiry", "policy.expiry.run"]
+
+def test_scheduler_marks_in_chunks(monkeypatch, app, car_factory, sql_statements):
+    from app.services.expiry_service import EXPIRY_CHUNK_SECONDS, EXPIRY_ROWS
+    from app.core.metrics import render_latest
+    today = date.today()
+    cars = [car_factory() for _ in range(5)]
+    db.session.add_all([
+        InsurancePolicy(car_id=c.id, provider="Sched", start_date=today, end_date=today) for c in cars
+    ])
+    db.session.commit()
+    patch_datetime(monkeypatch, datetime.combine(today, time(0, 30)))
+    chunks_before, rows_before = EXPIRY_CHUNK_SECONDS.count(), EXPIRY_ROWS.value()
+    sql_statements.clear()
+    assert log_expiring_policies(chunk_size=2) == 5
+    updates = [s for s in sql_statements if s.startswith("UPDATE insurance_policy")]
+    assert len(updates) == 3 and all("RETURNING" in s for s in updates)
+    assert EXPIRY_CHUNK_SECONDS.count() - chunks_before == 3
+    assert EXPIRY_ROWS.value() - rows_before == 5
+    assert InsurancePolicy.query.filter(InsurancePolicy.logged_expiry_at.is_(None)).count() == 0
+    body = render_latest()
+    assert 'policy_expiry_chunk_seconds_bucket{le="+Inf"}' in body
+    assert "policy_expiry_rows_per_second" in body
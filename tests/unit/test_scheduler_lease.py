@@ -0,0 +1,76 @@
+from datetime import date, timedelta
+import pytest
+from app import main
+from app.core import scheduling
+from app.core.config import get_settings
+from app.db.models import SchedulerLease
+from app.db.base import datab as db
+from sqlalchemy import update
+from app.services.lease_service import renew, try_acquire, release, utcnow
+from app.services.watermark_service import get_watermark, set_watermark
+
+def test_lease_is_exclusive_until_expiry():
+    now = utcnow()
+    assert try_acquire("job", "w1", 60, now=now)
+    assert not try_acquire("job", "w2", 60, now=now)
+    assert try_acquire("job", "w1", 60, now=now + timedelta(seconds=30))  # renewal
+    assert not try_acquire("job", "w2", 60, now=now + timedelta(seconds=80))
+    # w1 died: its renewed lease ran out, w2 takes over
+    assert try_acquire("job", "w2", 60, now=now + timedelta(seconds=91))
+    assert not try_acquire("job", "w1", 60, now=now + timedelta(seconds=92))
+
+def test_release_hands_over_immediately():
+    assert try_acquire("job", "w1", 600)
+    release("job", "w1")
+    assert try_acquire("job", "w2", 600)
+
+def test_renew_only_extends_own_lease():
+    now = utcnow()
+    assert try_acquire("job", "w1", 60, now=now)
+    assert renew("job", "w1", 60, now=now + timedelta(seconds=50))
+    db.session.commit()
+    assert not try_acquire("job", "w2", 60, now=now + timedelta(seconds=70))  # renewed past the first expiry
+    assert not renew("job", "w2", 60)
+
+def test_job_stops_without_committing_when_lease_taken_over(app, monkeypatch):
+    monkeypatch.setattr(scheduling, "_holder", "worker-a")
+    monkeypatch.setattr(get_settings(), "SCHEDULER_LEASE_TTL_SECONDS", 0)  # renew on every heartbeat
+
+    def work(heartbeat):
+        set_watermark("lease-test", date(2024, 1, 1))
+        # Another worker took the lease while this one was busy
+        db.session.execute(update(SchedulerLease).values(holder="worker-b"))
+        heartbeat()
+        return 1
+
+    lost = scheduling.JOB_RUNS.value(job="lease-test", outcome="lost")
+    assert scheduling._run_leased("lease-test", app, work) is None
+    assert scheduling.JOB_RUNS.value(job="lease-test", outcome="lost") == lost + 1
+    assert get_watermark("lease-test") is None
+
+@pytest.mark.asyncio
+async def test_only_leader_runs_job(app, monkeypatch, async_client):
+    monkeypatch.setattr(scheduling, "_holder", "worker-a")
+    assert scheduling.policy_expiry_job(app) == 0
+    monkeypatch.setattr(scheduling, "_holder", "worker-b")
+    assert scheduling.policy_expiry_job(app) is None
+    lease = db.session.get(SchedulerLease, scheduling.JOB_ID)
+    db.session.refresh(lease)
+    assert lease.holder == "worker-a"
+    assert lease.last_run_at is not None and lease.last_run_seconds is not None
+    assert scheduling.JOB_RUNS.value(job=scheduling.JOB_ID, outcome="skipped") >= 1
+    r = await async_client.get("/api/scheduler/jobs")
+    assert r.status_code == 200
+    [job] = r.json()
+    assert job["job"] == scheduling.JOB_ID and job["leader"] == "worker-a"
+    assert job["lastRunAt"].endswith("Z") and job["lastRunRows"] == 0
+
+def test_scheduler_starts_only_in_server_processes(monkeypatch):
+    started = []
+    monkeypatch.setattr(get_settings(), "SCHEDULER_ENABLED", True)
+    monkeypatch.setattr(main, "start_expiry_scheduler", started.append)
+    monkeypatch.setattr(main.atexit, "register", lambda fn: None)
+    main.create_app(db_url="sqlite:///:memory:")  # CLI, migrations, benchmarks
+    assert started == []
+    app = main.create_app(db_url="sqlite:///:memory:", start_scheduler=True)
+    assert started == [app]
@@ -0,0 +1,37 @@
+from datetime import date
+from flask import current_app
+from sqlalchemy import select
+from app.db.base import datab as db
+from app.db.models import Car
+from app.api.schemas import ClaimOut, OwnerOut, PolicyOut
+from app.api.serializers import CAR_ITEM, CAR_LIST_WITH_OWNER, CLAIM, OWNER, POLICY
+
+def _dumps(obj):
+    return current_app.json.dumps(obj)
+
+def _row(mapper, model, obj_id):
+    return db.session.execute(select(*mapper.columns).where(model.id == obj_id)).one()
+
+def test_mappers_match_pydantic_output(claim_factory, policy_factory):
+    claim = claim_factory(claim_date=date(2024, 2, 29), amount=12.5)
+    policy = policy_factory(car=claim.car)
+    owner = claim.car.owner
+    cases = [
+        (CLAIM, claim, ClaimOut.model_validate(claim, from_attributes=True).model_dump(by_alias=False)),
+        (POLICY, policy, PolicyOut.model_validate(policy, from_attributes=True).model_dump(by_alias=False)),
+        (OWNER, owner, OwnerOut.model_validate(owner, from_attributes=True).model_dump(by_alias=True)),
+    ]
+    for mapper, obj, expected in cases:
+        assert _dumps(mapper.from_object(obj)) == _dumps(expected)
+        assert _dumps(mapper(_row(mapper, type(obj), obj.id))) == _dumps(expected)
+
+def test_nested_owner_from_row_and_object(car_factory):
+    car = car_factory()
+    row = db.session.execute(
+        select(*CAR_LIST_WITH_OWNER.columns).join(Car.owner).where(Car.id == car.id)
+    ).one()
+    data = CAR_LIST_WITH_OWNER(row)
+    assert data == CAR_LIST_WITH_OWNER.from_object(car)
+    assert data["owner"] == {"id": car.owner.id, "name": car.owner.name, "email": car.owner.email}
+    assert data["year_of_manufacture"] == car.year_of_manufacture
+    assert CAR_ITEM.from_object(car)["yearOfManufacture"] == car.year_of_manufacture